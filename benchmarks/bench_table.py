@@ -0,0 +1,250 @@
+"""表格热点操作的无界面性能测试
+
+在 QT_QPA_PLATFORM=offscreen 下构建 ModernTableApp，用不同规模的合成数据
+统计导入、导出、保存/加载进度、排序、复制粘贴、撤回和增删行的耗时，
+结果写入JSON文件，并可与保存的基准结果对比。
+
+用法：
+    python benchmarks/bench_table.py                         # 默认 1k,10k,100k,1M 行
+    python benchmarks/bench_table.py --sizes 1000,10000 --repeat 5
+    python benchmarks/bench_table.py --update-baseline       # 将本次结果保存为基准
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("HSGUI_METRICS", "0")  # 避免性能记录本身影响结果
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_DIR = os.path.join(BENCH_DIR, "..", "code")
+sys.path.insert(0, CODE_DIR)
+
+import pandas as pd  # noqa: E402
+from PyQt5.QtCore import QT_VERSION_STR  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QTableWidgetSelectionRange  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+XLSX_MAX_ROWS = 100_000  # 超过该规模只测CSV导入，xlsx写入本身过慢
+PASTE_MAX_ROWS = 1_000  # 复制粘贴区域的最大行数
+
+
+def make_rows(size, schools, seed=0):
+    """生成合成表格数据：序号、学院、财务金额、是否补交"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        supplement = f"补交{rng.randint(1, 12)}月" if rng.random() < 0.1 else ""
+        rows.append([str(i + 1), rng.choice(schools), f"{rng.uniform(10, 5000):.2f}", supplement])
+    return rows
+
+
+def timeit(func, repeat):
+    """执行多次并返回每次的耗时（毫秒）"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return runs
+
+
+class TableBenchmark:
+    def __init__(self, window, work_dir, repeat):
+        self.window = window
+        self.work_dir = work_dir
+        self.repeat = repeat
+        self.results = []
+
+    def record(self, op, size, func, setup=None, repeat=None):
+        """执行一项测试；setup 在每次计时前调用且不计入耗时"""
+        runs = []
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+            runs.extend(timeit(func, 1))
+        result = {
+            "op": op,
+            "rows": size,
+            "runs_ms": [round(r, 3) for r in runs],
+            "median_ms": round(statistics.median(runs), 3),
+            "min_ms": round(min(runs), 3),
+        }
+        self.results.append(result)
+        print(f"  {op:<16} {size:>9} 行  中位数 {result['median_ms']:>12.3f} ms")
+        return result
+
+    def run_size(self, size):
+        window = self.window
+        rows = make_rows(size, window.schools)
+        progress_file = os.path.join(self.work_dir, f"progress_{size}.json")
+        with open(progress_file, "w", encoding="utf-8") as f:
+            json.dump({"table_data": rows, "options_data": {"year": "2025", "month": "3", "day": "2025年3月31日"}},
+                      f, ensure_ascii=False)
+
+        def reset():
+            window.read_progress(progress_file)
+            window.undo_stack.clear()
+            window.save_state()
+
+        # 导入进度（同时作为后续各项测试的初始数据）
+        self.record("load_progress", size, lambda: window.read_progress(progress_file))
+        reset()
+
+        # 保存进度
+        out_progress = os.path.join(self.work_dir, f"saved_{size}.json")
+        self.record("save_progress", size, lambda: window.write_progress(out_progress))
+
+        # 导入 CSV / Excel
+        columns = ["序号", "学院", "财务金额", "是否补交"]
+        df = pd.DataFrame(rows, columns=columns)
+        csv_file = os.path.join(self.work_dir, f"import_{size}.csv")
+        df.to_csv(csv_file, index=False)
+        self.record("import_csv", size, lambda: window.import_table_file(csv_file))
+        if size <= XLSX_MAX_ROWS:
+            xlsx_file = os.path.join(self.work_dir, f"import_{size}.xlsx")
+            df.to_excel(xlsx_file, index=False)
+            self.record("import_xlsx", size, lambda: window.import_table_file(xlsx_file))
+
+        # 导出Excel
+        if size <= XLSX_MAX_ROWS:
+            reset()
+            export_file = os.path.join(self.work_dir, f"export_{size}.xlsx")
+            self.record("export_xlsx", size, lambda: window.export_to_excel(export_file))
+
+        # 排序：打乱序号后按序号排序
+        reset()
+
+        def shuffle_numbers():
+            numbers = list(range(1, size + 1))
+            random.Random(1).shuffle(numbers)
+            for row, number in enumerate(numbers):
+                window.table.item(row, 0).setText(str(number))
+        self.record("sort_by_index", size, window.sort_by_index, setup=shuffle_numbers)
+
+        # 复制粘贴
+        reset()
+        paste_rows = min(size, PASTE_MAX_ROWS)
+
+        def select_block():
+            window.table.clearSelection()
+            window.table.setRangeSelected(QTableWidgetSelectionRange(0, 1, paste_rows - 1, 3), True)
+
+        self.record("copy_selection", size, window.copy_selection, setup=select_block)
+
+        def prepare_paste():
+            window.table.setCurrentCell(size // 2, 1)
+        self.record("paste_to_selection", size, window.paste_to_selection, setup=prepare_paste)
+
+        # 撤回：每次计时前先做一次粘贴，保证有可撤回的状态
+        def prepare_undo():
+            prepare_paste()
+            window.paste_to_selection()
+        self.record("undo_last_action", size, window.undo_last_action, setup=prepare_undo)
+
+        # 增删行
+        reset()
+
+        def select_middle():
+            window.table.setCurrentCell(size // 2, 1)
+        self.record("add_row", size, window.add_row, setup=select_middle)
+        self.record("delete_row", size, window.delete_row, setup=select_middle)
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    """与基准结果对比，返回超出容差的退化项"""
+    if not os.path.exists(baseline_path):
+        print(f"未找到基准文件：{baseline_path}，跳过对比")
+        return []
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    baseline_map = {(r["op"], r["rows"]): r for r in baseline.get("results", [])}
+
+    regressions = []
+    print(f"\n与基准对比（容差 {tolerance:.0%}）：")
+    for result in results:
+        base = baseline_map.get((result["op"], result["rows"]))
+        if not base:
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        flag = "退化" if ratio > 1 + tolerance else ""
+        print(f"  {result['op']:<16} {result['rows']:>9} 行  {base['median_ms']:>12.3f} -> "
+              f"{result['median_ms']:>12.3f} ms  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append({**result, "baseline_ms": base["median_ms"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="表格热点操作性能测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="逗号分隔的数据行数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测试的重复次数")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="结果JSON文件路径")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基准结果JSON文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的耗时增长比例")
+    parser.add_argument("--update-baseline", action="store_true", help="将本次结果保存为基准")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    from main import ModernTableApp
+
+    start = time.perf_counter()
+    window = ModernTableApp()
+    startup_ms = (time.perf_counter() - start) * 1000
+    print(f"窗口构建耗时 {startup_ms:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        bench = TableBenchmark(window, work_dir, args.repeat)
+        bench.results.append({"op": "startup", "rows": 0, "runs_ms": [round(startup_ms, 3)],
+                              "median_ms": round(startup_ms, 3), "min_ms": round(startup_ms, 3)})
+        for size in sizes:
+            print(f"\n=== {size} 行 ===")
+            bench.run_size(size)
+            app.processEvents()
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt": QT_VERSION_STR,
+            "pandas": pd.__version__,
+            "repeat": args.repeat,
+        },
+        "results": bench.results,
+    }
+    output["regressions"] = compare_with_baseline(bench.results, args.baseline, args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=4)
+    print(f"\n结果已写入：{args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": output["meta"], "results": bench.results}, f, ensure_ascii=False, indent=4)
+        print(f"基准已更新：{args.baseline}")
+
+    window.close()
+    return 1 if output["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""导入文件的列对应关系
+
+按表头名称识别导入文件中的 序号/学院/财务金额/是否补交 列（支持常见的同义列名），
+不再要求这几列按固定顺序排在最前面。用户确认过的对应关系按表头指纹（规范化后表头的哈希）
+保存，之后导入表头相同的文件（如同一银行或部门导出的表）时直接使用，不再询问。
+第一行是数据而不是表头的文件（见 is_headerless）按原来的列顺序对应。
+"""
+import re
+import json
+import time
+import hashlib
+import logging
+import unicodedata
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QComboBox, QCheckBox, QDialogButtonBox, QLabel
+)
+from plugin_registry import write_json_atomic
+
+
+TABLE_COLUMNS = ["序号", "学院", "财务金额", "是否补交"]
+REQUIRED_COLUMNS = ["学院", "财务金额"]
+
+# 各列可识别的列名（规范化后比较，见 normalize_header）
+SYNONYMS = {
+    "序号": ["序号", "编号", "行号", "no", "no.", "number", "index", "id"],
+    "学院": ["学院", "学院名称", "单位", "单位名称", "院系", "院系名称", "部门", "部门名称", "基层团委",
+             "团委", "缴费单位", "school", "college", "department"],
+    "财务金额": ["财务金额", "金额", "团费", "团费金额", "缴费金额", "实缴金额", "应缴金额", "合计", "合计金额",
+                 "amount", "total"],
+    "是否补交": ["是否补交", "补交", "补缴", "是否补缴", "补交情况", "supplement"],
+}
+
+# 规范化时去掉的金额单位和字符（空白、括号、常见标点），全角字符已先转为半角
+_UNIT = re.compile(r"\((?:元|人民币)\)")
+_STRIP = re.compile(r"[\s()\[\]{}【】:_\-/\\、,.。·*]")
+_CJK = re.compile(r"[\u4e00-\u9fff]")
+
+
+def normalize_header(name):
+    """规范化列名：全角转半角、去掉空白和标点、英文转小写"""
+    text = unicodedata.normalize("NFKC", str(name)).strip().lower()
+    return _STRIP.sub("", _UNIT.sub("", text))
+
+
+# 规范化后的同义列名 -> 表格列，识别时每个表头只查一次字典
+_LOOKUP = {normalize_header(alias): column for column, aliases in SYNONYMS.items() for alias in aliases}
+# 包含关系匹配只用两个字以上的中文列名，英文缩写（如 "no" "id"）会误匹配 "Notes" "Paid Amount"
+_PARTIAL = {column: [normalize_header(alias) for alias in aliases if len(alias) > 1 and _CJK.search(alias)]
+            for column, aliases in SYNONYMS.items()}
+
+
+def header_fingerprint(headers):
+    """表头指纹：规范化后的列名（含顺序）的哈希"""
+    return hashlib.sha1("\x1f".join(normalize_header(h) for h in headers).encode("utf-8")).hexdigest()
+
+
+def detect_mapping(headers):
+    """按列名识别对应关系，返回 ({表格列: 导入文件中的列号或 None}, 是否全部按列名精确识别)
+
+    先按列名精确匹配（表格列名本身优先于同义列名），未匹配的列再按包含关系匹配
+    （如"学院名称（全称）"），每个导入列只对应一个表格列。
+    """
+    normalized = [normalize_header(h) for h in headers]
+    mapping = {column: None for column in TABLE_COLUMNS}
+    used = set()
+    canonical = {normalize_header(column): column for column in TABLE_COLUMNS}
+    for lookup in (canonical, _LOOKUP):
+        for index, name in enumerate(normalized):
+            column = lookup.get(name)
+            if column is not None and mapping[column] is None and index not in used:
+                mapping[column] = index
+                used.add(index)
+    exact = all(mapping[column] is not None for column in TABLE_COLUMNS)
+
+    for column in TABLE_COLUMNS:
+        if mapping[column] is not None:
+            continue
+        for index, name in enumerate(normalized):
+            if index in used or not name:
+                continue
+            if any(alias in name for alias in _PARTIAL[column]):
+                mapping[column] = index
+                used.add(index)
+                break
+    return mapping, exact
+
+
+def is_headerless(headers):
+    """第一行是否为数据而不是表头：没有一个列名能精确识别，并且有数字（如序号、金额）"""
+    if any(normalize_header(h) in _LOOKUP for h in headers):
+        return False
+    for header in headers:
+        try:
+            float(str(header).replace(",", ""))
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+def positional_mapping(column_count):
+    """没有表头的文件按原来的列顺序对应"""
+    return {column: (i if i < column_count else None) for i, column in enumerate(TABLE_COLUMNS)}
+
+
+def is_complete(mapping):
+    return all(mapping.get(column) is not None for column in REQUIRED_COLUMNS)
+
+
+class MappingProfiles:
+    """用户确认过的列对应关系，按表头指纹保存在 JSON 文件中"""
+
+    def __init__(self, path):
+        self.path = path
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                with open(self.path, "r", encoding='utf-8') as f:
+                    self._profiles = json.load(f)
+            except FileNotFoundError:
+                self._profiles = {}
+            except (OSError, ValueError) as e:
+                logging.warning(f"读取列对应关系失败，将重新识别: {e}")
+                self._profiles = {}
+        return self._profiles
+
+    def get(self, headers):
+        """返回保存的对应关系（表格列 -> 列号），表头不同或列号越界时返回 None"""
+        profile = self._load().get(header_fingerprint(headers))
+        if profile is None:
+            return None
+        mapping = {column: profile["mapping"].get(column) for column in TABLE_COLUMNS}
+        if any(index is not None and index >= len(headers) for index in mapping.values()):
+            return None
+        return mapping
+
+    def save(self, headers, mapping):
+        profiles = self._load()
+        profiles[header_fingerprint(headers)] = {
+            "headers": [str(h) for h in headers],
+            "mapping": {column: mapping.get(column) for column in TABLE_COLUMNS},
+            "updated": time.time(),
+        }
+        try:
+            write_json_atomic(self.path, profiles)
+        except OSError as e:
+            logging.error(f"保存列对应关系失败: {e}")
+
+
+class ColumnMappingDialog(QDialog):
+    """确认导入文件各列与表格列的对应关系"""
+
+    NONE_LABEL = "（无）"
+
+    def __init__(self, headers, mapping, file_name="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("选择导入的列")
+        self.headers = [str(h) for h in headers]
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"请确认 {file_name} 中与表格各列对应的列：" if file_name else "请确认与表格各列对应的列："))
+        form = QFormLayout()
+        self.combos = {}
+        for column in TABLE_COLUMNS:
+            combo = QComboBox(self)
+            combo.addItem(self.NONE_LABEL, None)
+            for index, header in enumerate(self.headers):
+                combo.addItem(header, index)
+            index = mapping.get(column)
+            combo.setCurrentIndex(index + 1 if index is not None else 0)
+            combo.currentIndexChanged.connect(self.update_ok_button)
+            self.combos[column] = combo
+            label = column + ("（必选）" if column in REQUIRED_COLUMNS else "")
+            form.addRow(label, combo)
+        layout.addLayout(form)
+
+        self.remember_check = QCheckBox("记住此表头的对应关系，下次自动使用", self)
+        self.remember_check.setChecked(True)
+        layout.addWidget(self.remember_check)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+        self.update_ok_button()
+
+    def mapping(self):
+        return {column: combo.currentData() for column, combo in self.combos.items()}
+
+    def update_ok_button(self):
+        self.buttons.button(QDialogButtonBox.Ok).setEnabled(is_complete(self.mapping()))
+
+    def remember(self):
+        return self.remember_check.isChecked()
+
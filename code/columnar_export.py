@@ -0,0 +1,160 @@
+"""表格数据的列式导出，供外部插件直接内存映射读取
+
+插件运行前，插件页把当前表格（与 input/data.xlsx 相同的列）写入列式文件，
+并通过环境变量告知插件：
+
+    HSGUI_TABLE_PATH    列式文件的绝对路径
+    HSGUI_TABLE_FORMAT  "arrow"（Feather V2，未压缩）或 "hsgc"（下述定长布局）
+    HSGUI_TABLE_XLSX    input/data.xlsx 的路径（旧插件的后备方式，需先"输出为Excel"）
+
+安装了 pyarrow 时写 Arrow 文件，可用 pyarrow.feather.read_table(path, memory_map=True)
+零拷贝读取；否则写 hsgc 文件。hsgc 布局（小端序，所有段按8字节对齐）：
+
+    文件头   magic "HSGC"(4) | version uint16 | 保留 uint16 | 行数 uint64 | 列数 uint32 | 保留 uint32
+    列名表   每列：名称字节数 uint32 | UTF-8 名称（补齐到8字节）
+    列数据   每列：偏移数组 uint64[行数+1] | UTF-8 数据区（补齐到8字节）
+
+第 i 行的值为数据区 [offsets[i], offsets[i+1]) 的字节，与 Arrow 的字符串列布局一致。
+本模块的 ColumnarFile 是 hsgc 的参考读取实现。
+"""
+import os
+import mmap
+import struct
+from array import array
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+MAGIC = b"HSGC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQII")
+ARROW_FORMAT = "arrow"
+HSGC_FORMAT = "hsgc"
+
+
+def _padding(size):
+    return (-size) % 8
+
+
+def write_columnar(path_without_ext, headers, columns, prefer_arrow=True):
+    """写入列式文件，返回 (实际路径, 格式)。先写临时文件再替换，避免插件读到半个文件"""
+    if prefer_arrow and HAS_PYARROW:
+        path = path_without_ext + ".arrow"
+        table = pa.table({header: pa.array(values, type=pa.string()) for header, values in zip(headers, columns)})
+        tmp_path = path + ".tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        return path, ARROW_FORMAT
+
+    path = path_without_ext + ".hsgc"
+    tmp_path = path + ".tmp"
+    row_count = len(columns[0]) if columns else 0
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, row_count, len(headers), 0))
+        for header in headers:
+            name = header.encode("utf-8")
+            f.write(struct.pack("<I", len(name)))
+            f.write(name)
+            f.write(b"\0" * _padding(4 + len(name)))
+        for values in columns:
+            encoded = [str(v).encode("utf-8") for v in values]
+            offsets = array("Q", [0])
+            total = 0
+            for value in encoded:
+                total += len(value)
+                offsets.append(total)
+            if offsets.itemsize != 8:  # 保证在所有平台上都是 uint64
+                raise RuntimeError("当前平台不支持64位无符号整数数组")
+            if struct.pack("=H", 1) != struct.pack("<H", 1):
+                offsets.byteswap()
+            offsets.tofile(f)
+            f.write(b"".join(encoded))
+            f.write(b"\0" * _padding(total))
+    os.replace(tmp_path, path)
+    return path, HSGC_FORMAT
+
+
+class StringColumn:
+    """hsgc 文件中的一列，按需从内存映射中解码，不复制整列数据"""
+
+    def __init__(self, buffer, offsets, data_start, row_count):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._data_start = data_start
+        self._row_count = row_count
+
+    def __len__(self):
+        return self._row_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._row_count))]
+        if index < 0:
+            index += self._row_count
+        if not 0 <= index < self._row_count:
+            raise IndexError(index)
+        start = self._data_start + self._offsets[index]
+        end = self._data_start + self._offsets[index + 1]
+        return bytes(self._buffer[start:end]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._row_count):
+            yield self[i]
+
+
+class ColumnarFile:
+    """hsgc 文件的内存映射读取"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        self._buffer = buffer
+
+        magic, version, _, row_count, col_count, _ = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是有效的 hsgc 文件：{path}")
+        self.row_count = row_count
+
+        pos = HEADER.size
+        self.headers = []
+        for _ in range(col_count):
+            (name_len,) = struct.unpack_from("<I", buffer, pos)
+            self.headers.append(bytes(buffer[pos + 4:pos + 4 + name_len]).decode("utf-8"))
+            pos += 4 + name_len + _padding(4 + name_len)
+
+        self.columns = {}
+        self._views = []
+        for header in self.headers:
+            offsets_size = (row_count + 1) * 8
+            offsets = buffer[pos:pos + offsets_size].cast("Q")
+            self._views.append(offsets)
+            data_start = pos + offsets_size
+            data_size = offsets[row_count]
+            self.columns[header] = StringColumn(buffer, offsets, data_start, row_count)
+            pos = data_start + data_size + _padding(data_size)
+
+    def __getitem__(self, header):
+        return self.columns[header]
+
+    def __len__(self):
+        return self.row_count
+
+    def close(self):
+        self.columns = {}
+        for view in self._views:
+            view.release()
+        self._buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,90 @@
+"""CSV 快速读取
+
+银行系统导出的 CSV 多为 GBK/GB18030 编码，按 UTF-8 读取会直接失败。
+read_csv 先从文件开头取样判断编码，再用多线程的 pyarrow 解析器读取（未安装 pyarrow 时用 pandas 的 C 解析器），
+各列直接得到数值、文本等类型。取样部分是 UTF-8（如只有英文表头）而后面的内容不是时改用 GB18030 重新读取，
+仍然无法解码时个别字符替换为 "�"，不会导致导入失败。
+"""
+import os
+import time
+import codecs
+import logging
+import pandas as pd
+
+try:
+    import pyarrow  # pandas 的 pyarrow 解析器需要
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+SAMPLE_SIZE = 64 * 1024
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+# 没有 BOM 时按顺序尝试的编码：GB18030 兼容 GBK 和 GB2312
+CANDIDATE_ENCODINGS = ["utf-8", "gb18030"]
+
+
+def _decodes(sample, encoding, truncated):
+    """样本能否按该编码解码；样本截断时允许末尾有不完整的多字节字符"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(sample, final=not truncated)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detect_encoding(path, sample_size=SAMPLE_SIZE):
+    """从文件开头取样判断编码"""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+        truncated = bool(f.read(1))
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in CANDIDATE_ENCODINGS:
+        if _decodes(sample, encoding, truncated):
+            return encoding
+    # 都无法完整解码时按 GB18030 读取，无法解码的字符会被替换
+    return "gb18030"
+
+
+def _read_c(path, encoding, header):
+    """用 C 解析器读取，返回 (DataFrame, 实际使用的编码)
+
+    先严格按判断的编码读取，UTF-8 失败时再试 GB18030，都失败才替换无法解码的字符。
+    """
+    candidates = [encoding, "gb18030"] if encoding == "utf-8" else [encoding]
+    for candidate in candidates:
+        try:
+            return pd.read_csv(path, encoding=candidate, header=header, low_memory=False), candidate
+        except UnicodeDecodeError as e:
+            logging.info(f"按 {candidate} 读取 CSV 失败: {e}")
+    df = pd.read_csv(path, encoding=encoding, header=header, encoding_errors="replace", low_memory=False)
+    logging.warning(f"{os.path.basename(path)} 中有无法按 {encoding} 解码的字符，已替换为 �")
+    return df, encoding
+
+
+def read_csv(path, header=0):
+    """读取 CSV 文件为 DataFrame，自动判断编码；header=None 时第一行也作为数据"""
+    start = time.perf_counter()
+    encoding = detect_encoding(path)
+    df = None
+    engine = "c"
+    if HAS_PYARROW:
+        try:
+            df = pd.read_csv(path, encoding=encoding, header=header, engine="pyarrow")
+            engine = "pyarrow"
+        except (ValueError, UnicodeDecodeError) as e:
+            # 取样之后的内容无法按该编码解码，或 pyarrow 不支持该文件的格式
+            logging.info(f"pyarrow 读取 CSV 失败，改用 C 解析器: {e}")
+    if df is None:
+        df, encoding = _read_c(path, encoding, header)
+    logging.info(f"读取 {os.path.basename(path)}（{encoding}，{engine}），共 {len(df)} 行，"
+                 f"耗时 {time.perf_counter() - start:.3f} 秒")
+    return df
@@ -0,0 +1,189 @@
+import os
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QCheckBox, QFileDialog, QMessageBox, QAbstractItemView
+)
+from metrics import metrics
+from run_history import format_time
+
+
+class DiagnosticsPage(QWidget):
+    """性能诊断页：查看各项操作的耗时记录并导出，以及插件运行历史"""
+
+    RECORD_HEADERS = ["时间", "操作", "耗时(ms)", "行数", "内存峰值(KB)", "结果"]
+    SUMMARY_HEADERS = ["操作", "次数", "平均耗时(ms)", "最大耗时(ms)", "总耗时(ms)"]
+    TREND_HEADERS = ["插件", "次数", "最近耗时(秒)", "此前中位数(秒)", "变化", "最近行数", "最近运行"]
+    SLOWEST_HEADERS = ["开始时间", "插件", "耗时(秒)", "结果", "退出码", "内存峰值(MB)", "读取(MB)", "写入(MB)", "行数", "输入哈希"]
+
+    # 最近一次耗时超过此前中位数的倍数时标记为变慢
+    SLOWDOWN_RATIO = 1.5
+
+    def __init__(self, parent=None, history=None):
+        super().__init__(parent)
+        self.history = history  # 插件运行历史（RunHistory），为空时不显示相关表格
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(10)
+
+        header_label = QLabel("性能诊断")
+        header_label.setStyleSheet("font-size: 28px; font-weight: bold; padding: 15px;")
+        header_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(header_label)
+
+        # 开关与操作按钮
+        controls = QHBoxLayout()
+        self.enabled_check = QCheckBox("启用性能记录")
+        self.enabled_check.setChecked(metrics.enabled)
+        self.enabled_check.toggled.connect(self.on_enabled_toggled)
+        controls.addWidget(self.enabled_check)
+
+        self.memory_check = QCheckBox("记录内存峰值（开销较大）")
+        self.memory_check.setChecked(metrics.trace_memory)
+        self.memory_check.setToolTip("默认关闭。开启后记录每项操作期间 Python 分配的内存比开始时多出的最大值（KB），"
+                                     "不含 Qt 部分；也可用环境变量 HSGUI_METRICS=memory 开启")
+        self.memory_check.toggled.connect(self.on_memory_toggled)
+        controls.addWidget(self.memory_check)
+        controls.addStretch(1)
+
+        self.refresh_btn = QPushButton("刷新")
+        self.refresh_btn.clicked.connect(self.refresh)
+        controls.addWidget(self.refresh_btn)
+
+        self.clear_btn = QPushButton("清空记录")
+        self.clear_btn.clicked.connect(self.clear_records)
+        controls.addWidget(self.clear_btn)
+
+        self.export_btn = QPushButton("导出JSON")
+        self.export_btn.clicked.connect(self.export_records)
+        controls.addWidget(self.export_btn)
+        layout.addLayout(controls)
+
+        # 汇总表
+        summary_label = QLabel("操作汇总:")
+        summary_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 5px 0;")
+        layout.addWidget(summary_label)
+        self.summary_table = self.create_table(self.SUMMARY_HEADERS)
+        layout.addWidget(self.summary_table, 1)
+
+        # 明细表
+        records_label = QLabel("最近操作:")
+        records_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 5px 0;")
+        layout.addWidget(records_label)
+        self.records_table = self.create_table(self.RECORD_HEADERS)
+        layout.addWidget(self.records_table, 2)
+
+        if self.history is not None:
+            # 插件耗时趋势
+            trend_label = QLabel("插件耗时趋势:")
+            trend_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 5px 0;")
+            layout.addWidget(trend_label)
+            self.trend_table = self.create_table(self.TREND_HEADERS)
+            layout.addWidget(self.trend_table, 1)
+
+            # 最慢的插件运行
+            slowest_label = QLabel("最慢的插件运行:")
+            slowest_label.setStyleSheet("font-size: 16px; font-weight: bold; margin: 5px 0;")
+            layout.addWidget(slowest_label)
+            self.slowest_table = self.create_table(self.SLOWEST_HEADERS)
+            layout.addWidget(self.slowest_table, 1)
+
+    def create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def showEvent(self, event):
+        """切换到诊断页时自动刷新"""
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        """用记录器中的最新数据填充表格"""
+        summary = metrics.summary()
+        self.summary_table.setRowCount(len(summary))
+        ordered = sorted(summary.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+        for row, (name, item) in enumerate(ordered):
+            values = [name, item["count"], item["avg_ms"], item["max_ms"], item["total_ms"]]
+            for col, value in enumerate(values):
+                self.summary_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+        # 最新的记录显示在最上方
+        records = metrics.snapshot()[::-1]
+        self.records_table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            values = [
+                record["start"], record["name"], record["duration_ms"],
+                "" if record["rows"] is None else record["rows"],
+                "" if record["peak_kb"] is None else record["peak_kb"],
+                "成功" if record["ok"] else "失败",
+            ]
+            for col, value in enumerate(values):
+                self.records_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+        if self.history is not None:
+            self.refresh_history()
+
+    def refresh_history(self):
+        """显示插件运行历史：每个插件的耗时趋势和最慢的运行"""
+        def number(value, scale=1, digits=2):
+            return "" if value is None else f"{value / scale:.{digits}f}"
+
+        trends = self.history.trends()
+        self.trend_table.setRowCount(len(trends))
+        for row, item in enumerate(trends):
+            ratio = item["ratio"]
+            change = "" if ratio is None else f"{ratio:.2f}x"
+            if ratio is not None and ratio >= self.SLOWDOWN_RATIO:
+                change += " 变慢"
+            values = [
+                item["plugin"], item["count"], number(item["last_duration"]), number(item["median_duration"]),
+                change, "" if item["last_rows"] is None else item["last_rows"], format_time(item["last_started_at"]),
+            ]
+            for col, value in enumerate(values):
+                cell = QTableWidgetItem(str(value))
+                if col == 4 and ratio is not None and ratio >= self.SLOWDOWN_RATIO:
+                    cell.setForeground(Qt.red)
+                self.trend_table.setItem(row, col, cell)
+
+        runs = self.history.slowest()
+        self.slowest_table.setRowCount(len(runs))
+        for row, run in enumerate(runs):
+            values = [
+                format_time(run["started_at"]), run["plugin"], number(run["duration"]),
+                "成功" if run["state"] == "done" else run["state"] or "",
+                "" if run["exit_code"] is None else run["exit_code"],
+                number(run["peak_rss_kb"], 1024, 1), number(run["read_bytes"], 1024 * 1024, 1),
+                number(run["write_bytes"], 1024 * 1024, 1), "" if run["rows"] is None else run["rows"],
+                (run["input_hash"] or "")[:12],
+            ]
+            for col, value in enumerate(values):
+                self.slowest_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+    def on_enabled_toggled(self, checked):
+        metrics.enabled = checked
+
+    def on_memory_toggled(self, checked):
+        metrics.trace_memory = checked
+
+    def clear_records(self):
+        metrics.clear()
+        self.refresh()
+
+    def export_records(self):
+        """导出所有记录为JSON文件"""
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出性能记录", "metrics.json", "JSON 文件 (*.json)", options=options)
+        if not file_path:
+            return
+        try:
+            metrics.export_json(file_path)
+            QMessageBox.information(self, "成功", f"性能记录已导出：{os.path.basename(file_path)}")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"导出性能记录时发生错误: {str(e)}")
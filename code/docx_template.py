@@ -0,0 +1,228 @@
+"""预编译的 docx 模板
+
+模板中的 word/document.xml 只解析一次，按 {{字段}} 占位符切分为字节片段和编号的插槽；
+生成每份文档时只需把转义后的字段值拼接进去。其他部件（样式、字体、图片、
+docxcompose 使用的 docProps/custom.xml 等）预先压缩并生成 zip 记录，每份文档直接复用，
+只有 document.xml 需要压缩。合并大量文档时可用 write_stream 边生成正文边压缩写入，
+不在内存中保留整个文档。
+
+Word 编辑模板时可能把一个占位符拆成多个文本块（如 "{{" 与 "学院}}" 分属不同的 <w:r>），
+编译时会先合并被拆开的占位符。
+"""
+import re
+import time
+import hashlib
+import itertools
+import zlib
+import struct
+import os
+import zipfile
+import logging
+from xml.sax.saxutils import escape
+
+
+DOCUMENT_PART = "word/document.xml"
+CUSTOM_PART = "docProps/custom.xml"
+
+# 与 docxcompose/templates/custom.xml 相同的空自定义属性部件
+CUSTOM_PROPERTIES_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/custom-properties" '
+    b'xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"></Properties>'
+)
+CUSTOM_CONTENT_TYPE = (
+    b'<Override PartName="/docProps/custom.xml" '
+    b'ContentType="application/vnd.openxmlformats-officedocument.custom-properties+xml"/>'
+)
+CUSTOM_RELATIONSHIP = (
+    b'<Relationship Id="rIdCustomProps" '
+    b'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/custom-properties" '
+    b'Target="docProps/custom.xml"/>'
+)
+
+# 占位符，允许中间夹有 XML 标签（被 Word 拆分的情况）
+TAG = r'(?:<[^>]+>)*'
+SPLIT_PLACEHOLDER = re.compile(r'\{' + TAG + r'\{((?:[^{}<]|<[^>]+>)+?)\}' + TAG + r'\}')
+PLACEHOLDER = re.compile(r'\{\{([^{}<>]+)\}\}')
+XML_TAG = re.compile(r'<[^>]+>')
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+DATA_DESCRIPTOR = struct.Struct("<IIII")
+UTF8_FLAG = 0x0800
+DESCRIPTOR_FLAG = 0x0008  # 压缩前不知道大小和 CRC，写在数据之后
+ZIP32_LIMIT = 0xFFFFFFFF
+
+
+def _dos_time(timestamp):
+    t = time.localtime(timestamp)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class ZipEntry:
+    """预先压缩好的 zip 成员，可以直接写入任意多个压缩包"""
+
+    def __init__(self, name, data, dos_time):
+        self.name = name.encode("utf-8")
+        self.crc = zlib.crc32(data)
+        self.size = len(data)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        self.compressed = compressor.compress(data) + compressor.flush()
+        self.time, self.date = dos_time
+
+    def local_record(self):
+        header = LOCAL_HEADER.pack(0x04034b50, 20, UTF8_FLAG, zipfile.ZIP_DEFLATED, self.time, self.date,
+                                   self.crc, len(self.compressed), self.size, len(self.name), 0)
+        return header + self.name + self.compressed
+
+    def central_record(self, offset):
+        header = CENTRAL_HEADER.pack(0x02014b50, 20, 20, UTF8_FLAG, zipfile.ZIP_DEFLATED, self.time, self.date,
+                                     self.crc, len(self.compressed), self.size, len(self.name), 0, 0, 0, 0, 0, offset)
+        return header + self.name
+
+
+def merge_split_placeholders(xml):
+    """把被拆分到多个文本块中的占位符合并为连续的 {{字段}}"""
+    def join(match):
+        inner = match.group(0)
+        if XML_TAG.search(inner) is None:
+            return inner
+        name = XML_TAG.sub("", match.group(1))
+        return "{{" + name + "}}"
+    return SPLIT_PLACEHOLDER.sub(join, xml)
+
+
+def add_custom_properties(parts):
+    """模板中没有自定义属性部件时补上（与 docxcompose 合并后的文档结构一致）"""
+    if CUSTOM_PART in parts:
+        return
+    parts[CUSTOM_PART] = CUSTOM_PROPERTIES_XML
+    content_types = parts.get("[Content_Types].xml", b"")
+    if b"</Types>" in content_types and b"/docProps/custom.xml" not in content_types:
+        parts["[Content_Types].xml"] = content_types.replace(b"</Types>", CUSTOM_CONTENT_TYPE + b"</Types>")
+    rels = parts.get("_rels/.rels", b"")
+    if b"</Relationships>" in rels and b"docProps/custom.xml" not in rels:
+        parts["_rels/.rels"] = rels.replace(b"</Relationships>", CUSTOM_RELATIONSHIP + b"</Relationships>")
+
+
+class CompiledTemplate:
+    """编译后的 docx 模板"""
+
+    def __init__(self, parts):
+        parts = dict(parts)
+        add_custom_properties(parts)
+        xml = merge_split_placeholders(parts.pop(DOCUMENT_PART).decode("utf-8"))
+
+        # 文档头（到 <w:body> 为止）、正文和结尾（分节属性及之后），合并文档时共用头尾
+        body_start = xml.index("<w:body>") + len("<w:body>")
+        body_end = xml.rfind("<w:sectPr")
+        if body_end < body_start:
+            body_end = xml.rindex("</w:body>")
+        self.head = xml[:body_start].encode("utf-8")
+        self.tail = xml[body_end:].encode("utf-8")
+
+        # 正文切分为文本片段和插槽：segments[0] slot[0] segments[1] slot[1] ... segments[-1]
+        self.segments = []
+        self.slots = []
+        pos = 0
+        body = xml[body_start:body_end]
+        for match in PLACEHOLDER.finditer(body):
+            self.segments.append(body[pos:match.start()].encode("utf-8"))
+            self.slots.append(match.group(1).strip())
+            pos = match.end()
+        self.segments.append(body[pos:].encode("utf-8"))
+        self.fields = sorted(set(self.slots))
+
+        # 模板指纹：模板内容变化时，之前生成的文档需要重新生成
+        digest = hashlib.sha1(self.head + self.tail)
+        for segment, slot in zip(self.segments, self.slots + [""]):
+            digest.update(segment + b"\0" + slot.encode("utf-8") + b"\0")
+        for name in sorted(parts):
+            digest.update(name.encode("utf-8") + b"\0" + parts[name])
+        self.fingerprint = digest.hexdigest()
+
+        # 其他部件预先压缩，并拼好本地记录
+        dos_time = _dos_time(time.time())
+        self.dos_time = dos_time
+        self.shared = [ZipEntry(name, data, dos_time) for name, data in parts.items()]
+        self.prefix = b""
+        self.shared_central = b""
+        for entry in self.shared:
+            self.shared_central += entry.central_record(len(self.prefix))
+            self.prefix += entry.local_record()
+
+    @classmethod
+    def from_docx(cls, path):
+        with zipfile.ZipFile(path) as package:
+            parts = {info.filename: package.read(info) for info in package.infolist() if not info.is_dir()}
+        if DOCUMENT_PART not in parts:
+            raise ValueError(f"模板中没有 {DOCUMENT_PART}：{path}")
+        template = cls(parts)
+        logging.info(f"已编译模板 {path}，占位符：{', '.join(template.fields) or '无'}")
+        return template
+
+    def render_body(self, fields):
+        """按字段值生成正文（字节），缺少的字段填空"""
+        out = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            out.append(escape(str(fields.get(slot, ""))).encode("utf-8"))
+            out.append(segment)
+        return b"".join(out)
+
+    def package(self, document_xml):
+        """用给定的 document.xml 生成完整的 docx 文件内容"""
+        document = ZipEntry(DOCUMENT_PART, document_xml, self.dos_time)
+        central = self.shared_central + document.central_record(len(self.prefix))
+        body = self.prefix + document.local_record()
+        count = len(self.shared) + 1
+        end = END_RECORD.pack(0x06054b50, 0, 0, count, count, len(central), len(body), 0)
+        return body + central + end
+
+    def render(self, fields):
+        """生成一份文档的 docx 文件内容"""
+        return self.package(self.head + self.render_body(fields) + self.tail)
+
+    def write_stream(self, path, bodies):
+        """把依次生成的正文片段（字节）写成一个 docx 文件，document.xml 边压缩边写入
+
+        内存占用只与单个片段的大小有关；先写入临时文件，完成后替换目标文件。
+        """
+        name = DOCUMENT_PART.encode("utf-8")
+        time_, date = self.dos_time
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(self.prefix)
+                offset = len(self.prefix)
+                f.write(LOCAL_HEADER.pack(0x04034b50, 20, UTF8_FLAG | DESCRIPTOR_FLAG, zipfile.ZIP_DEFLATED,
+                                          time_, date, 0, 0, 0, len(name), 0) + name)
+
+                compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+                crc = 0
+                size = 0
+                compressed_size = 0
+                for data in itertools.chain([self.head], bodies, [self.tail]):
+                    crc = zlib.crc32(data, crc)
+                    size += len(data)
+                    block = compressor.compress(data)
+                    compressed_size += len(block)
+                    f.write(block)
+                block = compressor.flush()
+                compressed_size += len(block)
+                f.write(block)
+                if size > ZIP32_LIMIT or compressed_size > ZIP32_LIMIT:
+                    raise ValueError("合并后的文档超过 4GB，无法写入")
+                f.write(DATA_DESCRIPTOR.pack(0x08074b50, crc, compressed_size, size))
+
+                central = self.shared_central + CENTRAL_HEADER.pack(
+                    0x02014b50, 20, 20, UTF8_FLAG | DESCRIPTOR_FLAG, zipfile.ZIP_DEFLATED, time_, date,
+                    crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, offset) + name
+                central_offset = f.tell()
+                count = len(self.shared) + 1
+                f.write(central + END_RECORD.pack(0x06054b50, 0, 0, count, count, len(central), central_offset, 0))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,105 @@
+import os
+import json
+import queue
+import atexit
+import logging
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+_listener = None
+_pending_warnings = []  # 日志配置完成之前产生的警告，配置后写入日志
+
+
+def env_int(name, default, minimum=None):
+    """读取整数环境变量，未设置时使用默认值；不是整数或小于 minimum 时也使用默认值并记录警告"""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        result = int(value)
+    except ValueError:
+        result = None
+    if result is not None and (minimum is None or result >= minimum):
+        return result
+    message = f"环境变量 {name}={value!r} 无效，使用默认值 {default}"
+    if _listener is None:
+        _pending_warnings.append(message)
+    else:
+        logging.warning(message)
+    return default
+
+
+# 日志配置，可通过环境变量覆盖
+LOG_DIR = 'logs'
+LOG_FILE = 'run.log'
+LOG_LEVEL = os.environ.get('HSGUI_LOG_LEVEL', 'DEBUG')
+LOG_MAX_BYTES = env_int('HSGUI_LOG_MAX_BYTES', 5 * 1024 * 1024, minimum=0)  # 单个文件最大5MB
+LOG_BACKUP_COUNT = env_int('HSGUI_LOG_BACKUP_COUNT', 5, minimum=0)  # 最多保留5个历史文件
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """将日志记录格式化为一行JSON，便于后续检索和统计"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        # 通过 extra={"data": {...}} 传入的结构化字段
+        data = getattr(record, 'data', None)
+        if data is not None:
+            entry["data"] = data
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=None, log_dir=LOG_DIR, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """配置异步日志：调用方只把记录放入内存队列，由后台线程写入按大小轮转的文件"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = level or LOG_LEVEL
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.DEBUG
+
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, LOG_FILE),
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding='utf-8',
+        delay=True
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    # SimpleQueue 无上限，put 永不阻塞，GUI线程不会等待磁盘
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    for message in _pending_warnings:
+        logging.warning(message)
+    _pending_warnings.clear()
+    return _listener
+
+
+def shutdown_logging():
+    """停止后台写日志线程，并写完队列中剩余的记录"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
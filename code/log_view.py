@@ -0,0 +1,132 @@
+from collections import deque
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QComboBox, QLineEdit, QPushButton, QLabel
+from log_config import env_int
+
+
+# 日志区域最多保留的行数，可通过环境变量 HSGUI_LOG_VIEW_LINES 设置
+MAX_LINES = env_int('HSGUI_LOG_VIEW_LINES', 5000, minimum=1)
+
+# 日志级别及其在筛选框中的名称，按严重程度排列
+LEVELS = ["info", "warning", "error"]
+LEVEL_FILTERS = [
+    ("全部", "info"),
+    ("警告及以上", "warning"),
+    ("仅错误", "error"),
+]
+LEVEL_TAGS = {"info": "", "warning": "[警告] ", "error": "[错误] "}
+
+
+class LogView(QWidget):
+    """有上限的日志显示区域
+
+    日志保存在定长的环形缓冲区中，超出上限时丢弃最早的行；
+    新日志先放入待显示队列，由定时器每隔 flush_ms 毫秒合并成一次追加，
+    避免插件大量输出时每行都刷新界面。支持按级别筛选和关键字搜索。
+    """
+
+    def __init__(self, max_lines=MAX_LINES, flush_ms=50, parent=None):
+        super().__init__(parent)
+        self.max_lines = max(1, max_lines)
+        self.lines = deque(maxlen=self.max_lines)  # (级别, 内容)
+        self.pending = deque(maxlen=self.max_lines)
+        self.dropped = 0  # 因超出上限被丢弃的行数
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(flush_ms)
+        self.flush_timer.timeout.connect(self.flush)
+
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        toolbar = QHBoxLayout()
+        self.level_filter = QComboBox()
+        for label, level in LEVEL_FILTERS:
+            self.level_filter.addItem(label, level)
+        self.level_filter.currentIndexChanged.connect(self.rebuild)
+        toolbar.addWidget(self.level_filter)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索日志...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.rebuild)
+        toolbar.addWidget(self.search_input, 1)
+
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: #7f8c8d;")
+        toolbar.addWidget(self.count_label)
+
+        clear_button = QPushButton("清空")
+        clear_button.clicked.connect(self.clear)
+        toolbar.addWidget(clear_button)
+        layout.addLayout(toolbar)
+
+        self.text_area = QPlainTextEdit()
+        self.text_area.setReadOnly(True)
+        self.text_area.setUndoRedoEnabled(False)
+        self.text_area.setMaximumBlockCount(self.max_lines)
+        layout.addWidget(self.text_area)
+
+        self.update_count()
+
+    def append(self, message, level="info"):
+        """添加一条日志，实际显示在下一次定时刷新时进行"""
+        if len(self.lines) == self.max_lines:
+            self.dropped += 1
+        entry = (level, str(message))
+        self.lines.append(entry)
+        self.pending.append(entry)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def matches(self, entry):
+        level, text = entry
+        min_level = self.level_filter.currentData() or "info"
+        if LEVELS.index(level if level in LEVELS else "info") < LEVELS.index(min_level):
+            return False
+        keyword = self.search_input.text().strip().lower()
+        return not keyword or keyword in text.lower()
+
+    @staticmethod
+    def format_entry(entry):
+        level, text = entry
+        return LEVEL_TAGS.get(level, "") + text
+
+    def flush(self):
+        """把待显示的日志一次性追加到文本区域"""
+        if not self.pending:
+            return
+        batch = [self.format_entry(e) for e in self.pending if self.matches(e)]
+        self.pending.clear()
+        if batch:
+            self.text_area.appendPlainText("\n".join(batch))
+        self.update_count()
+
+    def rebuild(self):
+        """筛选条件变化时，按缓冲区内容重新显示"""
+        self.pending.clear()
+        self.flush_timer.stop()
+        shown = [self.format_entry(e) for e in self.lines if self.matches(e)]
+        self.text_area.setPlainText("\n".join(shown))
+        scrollbar = self.text_area.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+        self.update_count()
+
+    def clear(self):
+        self.lines.clear()
+        self.pending.clear()
+        self.dropped = 0
+        self.text_area.clear()
+        self.update_count()
+
+    def update_count(self):
+        text = f"{len(self.lines)}/{self.max_lines} 行"
+        if self.dropped:
+            text += f"（已丢弃 {self.dropped} 行）"
+        self.count_label.setText(text)
+
@@ -1,48 +1,58 @@
 import sys
+import multiprocessing
+
+if __name__ == "__main__":
+    # 打包后的程序中，导入表格和内置三联表生成使用的子进程会重新运行本程序：
+    # 必须在导入 PyQt5/pandas 和配置日志之前交给 multiprocessing 处理，子进程不执行后面的代码
+    multiprocessing.freeze_support()
+
 import os
 import json
 import logging
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QVBoxLayout,
     QPushButton, QWidget, QHBoxLayout, QAbstractItemView, QFileDialog, QMessageBox,
-    QLineEdit, QStackedWidget, QLabel, QHeaderView, QAction, QFrame, QMenu, QStyle
+    QLineEdit, QStackedWidget, QLabel, QHeaderView, QAction, QFrame, QMenu, QStyle, QInputDialog
 )
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QFont, QKeySequence
+from PyQt5.QtGui import QFont, QKeySequence, QColor
 from qt_material import apply_stylesheet
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from plugin_page import PluginPage  # 导入 PluginPage 类
+from resource_manager import ResourceManager
+from log_config import setup_logging
+from metrics import metrics, timed
+from diagnostics_page import DiagnosticsPage
+from stall_watchdog import StallWatchdog
+from school_names import SchoolIndex
+from column_mapping import (
+    TABLE_COLUMNS, MappingProfiles, ColumnMappingDialog, detect_mapping, is_complete, is_headerless,
+    positional_mapping
+)
+from table_merge import POLICY_SUM, POLICY_NAMES, merge_tables
+from csv_reader import read_csv
+from sheet_reader import SOURCE_SHEET_COLUMN, list_sheets, read_sheet, read_sheets
+from sheet_picker import SheetPickerDialog
 import ctypes
 
-# 设置明确的Windows应用ID (这会强制Windows使用新图标)
-try:
-    # 注意：这个ID必须唯一且保持一致，不要随意更改
-    app_id = u'HUST.TeamFeeSystem.HGUI.2025'
-    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(app_id)
-except Exception as e:
-    print(f"设置应用ID出错: {e}")
-
-# 添加资源路径解析函数
-def get_resource_path(relative_path):
-    """获取资源的绝对路径，适用于开发环境和PyInstaller打包环境"""
-    # PyInstaller会创建临时文件夹并将路径存储在_MEIPASS中
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))
 
-    return os.path.join(base_path, relative_path)
+# 主页面按钮配色：objectName -> (颜色, 是否带下拉菜单)
+MAIN_BUTTONS = {
+    "add_row_btn": ("#4caf50", False),
+    "del_row_btn": ("#e57373", False),
+    "undo_btn": ("#ba68c8", False),
+    "sort_btn": ("#64b5f6", False),
+    "file_btn": ("#ff9800", True),
+    "save_btn": ("#9c27b0", False),
+    "output_btn": ("#81c784", False),
+}
 
 
-# 配置日志记录（可选）
-os.makedirs('logs', exist_ok=True)
-logging.basicConfig(
-    filename='logs/run.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+def table_row_count(window):
+    """性能记录中使用的行数统计"""
+    return window.table.rowCount()
 
 
 
@@ -66,6 +76,13 @@ class ModernTableApp(QMainWindow):
         self.undo_stack = []
         self.max_undo_steps = 60  # 最多保存60步操作
 
+        app = QApplication.instance()
+
+        # 图标和样式表在创建任何控件之前统一加载一次
+        self.resources = ResourceManager()
+        self.resources.load()
+        app.setStyleSheet(self.resources.build_app_stylesheet(MAIN_BUTTONS))
+
         # 1) 全局字体
         font = QFont("Roboto", 12)
         font.setStyleHint(QFont.SansSerif)
@@ -77,9 +94,8 @@ class ModernTableApp(QMainWindow):
         self.setWindowFlags(Qt.Window | Qt.WindowTitleHint | Qt.WindowMinMaxButtonsHint | Qt.WindowCloseButtonHint)
 
         # 设置图标（可选）
-        icon_path = get_resource_path(os.path.join("image", "pic.ico"))
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
+        if self.resources.has_icon("pic.ico"):
+            self.setWindowIcon(self.resources.icon("pic.ico"))
 
         # 2) 中央布局：左侧导航(窄) + 右侧StackedWidget
         central_widget = QWidget()
@@ -90,11 +106,30 @@ class ModernTableApp(QMainWindow):
         # 左侧导航栏(更窄)
         self.nav_widget = QWidget()
         self.nav_widget.setFixedWidth(60)  # 仅容纳图标
+        # 4) QSS: 透明默认背景 + 悬浮/按下显示灰色, 让图标有焦点反馈
+        #    并保持按钮区域小, padding: 8px, 这样鼠标点击范围大些
+        #    按钮规则写在导航栏样式表中，三个按钮共享一次解析
         self.nav_widget.setStyleSheet("""
             QWidget {
                 background-color: #f5f5f5; 
                 border-right: 1px solid #e0e0e0;
             }
+            QPushButton {
+                background-color: transparent; 
+                border: none;
+                padding: 8px; 
+                margin: 0px;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+            QPushButton:pressed {
+                background-color: #cccccc;
+            }
+            QPushButton:focus {
+                outline: none;
+                border: none;
+            }
         """)
         self.nav_layout = QVBoxLayout(self.nav_widget)
         self.nav_layout.setContentsMargins(0,10,0,10)
@@ -104,33 +139,27 @@ class ModernTableApp(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.main_page = QWidget(self)
         self.option_page = QWidget(self)
-        self.plugin_page = PluginPage(main_page=self.main_page, stacked_widget=self.stacked_widget)
+        self.plugin_page = PluginPage(main_page=self.main_page, stacked_widget=self.stacked_widget, data_source=self)
+        self.diagnostics_page = DiagnosticsPage(self, history=self.plugin_page.history)
+        # 用户确认过的导入列对应关系，按表头指纹保存
+        self.column_profiles = MappingProfiles(os.path.join(self.plugin_page.app_path, "column_mappings.json"))
+        # 学院名称索引，学院列表和别名可在 schools.json 中配置
+        self.school_index = SchoolIndex.from_config(os.path.join(self.plugin_page.app_path, "schools.json"))
 
         self.stacked_widget.addWidget(self.main_page)
         self.stacked_widget.addWidget(self.option_page)
         self.stacked_widget.addWidget(self.plugin_page)
+        self.stacked_widget.addWidget(self.diagnostics_page)
         self.stacked_widget.setCurrentWidget(self.main_page)
 
         main_layout.addWidget(self.nav_widget)
         main_layout.addWidget(self.stacked_widget)
 
         # ========== 导航栏按钮(纯图标) ==========
-        # 3) 加载图标(黑色线条),你可用 home_black.svg/settings_black.svg/plugin_black.svg
-        # 加载图标，使用异常处理
-        try:
-            # 3) 加载图标(黑色线条)，使用resource_path确保在打包环境中可用
-            icon_home = QIcon(get_resource_path(os.path.join("image", "home.svg")))
-            icon_settings = QIcon(get_resource_path(os.path.join("image", "settings.svg")))
-            icon_plugin = QIcon(get_resource_path(os.path.join("image", "plugin.svg")))
-
-            # 记录日志
-            logging.debug(f"导航图标加载成功")
-        except Exception as e:
-            logging.error(f"加载导航图标时发生错误: {e}")
-            # 使用空图标作为后备
-            icon_home = QIcon()
-            icon_settings = QIcon()
-            icon_plugin = QIcon()
+        # 3) 加载图标(黑色线条)，从资源缓存中读取，缺失时为空图标
+        icon_home = self.resources.icon("home.svg")
+        icon_settings = self.resources.icon("settings.svg")
+        icon_plugin = self.resources.icon("plugin.svg")
 
         self.btn_go_main = QPushButton()
         self.btn_go_main.setIcon(icon_home)
@@ -147,38 +176,22 @@ class ModernTableApp(QMainWindow):
         self.btn_go_plugin.setIconSize(QSize(24,24))
         self.btn_go_plugin.setToolTip("插件管理")
 
-        # 4) QSS: 透明默认背景 + 悬浮/按下显示灰色, 让图标有焦点反馈
-        #    并保持按钮区域小, padding: 8px, 这样鼠标点击范围大些
-        btn_style = """
-            QPushButton {
-                background-color: transparent; 
-                border: none;
-                padding: 8px; 
-                margin: 0px;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:pressed {
-                background-color: #cccccc;
-            }
-            QPushButton:focus {
-                outline: none;
-                border: none;
-            }
-        """
-        for btn in [self.btn_go_main, self.btn_go_option, self.btn_go_plugin]:
-            btn.setStyleSheet(btn_style)
+        self.btn_go_diagnostics = QPushButton()
+        self.btn_go_diagnostics.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogInfoView))
+        self.btn_go_diagnostics.setIconSize(QSize(24,24))
+        self.btn_go_diagnostics.setToolTip("性能诊断")
 
         # 5) 点击事件切换页面
         self.btn_go_main.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.main_page))
         self.btn_go_option.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.option_page))
         self.btn_go_plugin.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.plugin_page))
+        self.btn_go_diagnostics.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.diagnostics_page))
 
         # 加入左侧布局
         self.nav_layout.addWidget(self.btn_go_main)
         self.nav_layout.addWidget(self.btn_go_option)
         self.nav_layout.addWidget(self.btn_go_plugin)
+        self.nav_layout.addWidget(self.btn_go_diagnostics)
         self.nav_layout.addStretch(1)
 
         # 初始化三个页面 + 菜单
@@ -199,15 +212,7 @@ class ModernTableApp(QMainWindow):
         file_menu = menubar.addMenu("文件")
 
         save_action = QAction("保存进度", self)
-        try:
-            save_menu_icon_path = get_resource_path(os.path.join("image", "save.svg"))
-            if os.path.exists(save_menu_icon_path):
-                save_action.setIcon(QIcon(save_menu_icon_path))
-            else:
-                save_action.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogSaveButton))
-        except Exception as e:
-            logging.error(f"加载菜单保存图标时发生错误: {e}")
-            save_action.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogSaveButton))
+        save_action.setIcon(self.resources.icon("save.svg", QStyle.SP_DialogSaveButton))
         save_action.triggered.connect(self.save_progress)
         save_action.setShortcut(QKeySequence.Save)  # Ctrl+S
         file_menu.addAction(save_action)
@@ -381,16 +386,7 @@ class ModernTableApp(QMainWindow):
 
         self.table.selectionModel().selectionChanged.connect(self.update_buttons_state)
         # 填充学院数据
-        self.schools = [
-            "社会学院", "网络空间安全学院", "光学与电子信息学院", "人文学院", "未来技术学院", "机械科学与工程学院",
-            "土木与水利工程学院", "马克思主义学院", "口腔医学院", "能源与动力工程学院", "外国语学院", "护理学院",
-            "化学与化工学院", "新闻与信息传播学院", "生命科学与技术学院", "电子信息与通信学院", "法学院", "哲学学院",
-            "航空航天学院", "人工智能与自动化学院", "医药卫生管理学院", "物理学院", "管理学院", "环境科学与工程学院",
-            "公共管理学院", "第一临床学院", "计算机科学与技术学院", "艺术学院", "法医学系", "数学与统计学院",
-            "第二临床学院", "电气与电子工程学院", "经济学院", "集成电路学院", "药学院", "公共卫生学院", "基础医学院",
-            "材料科学与工程学院", "建筑与城市规划学院", "船舶与海洋工程学院", "武汉光电国家研究中心", "体育学院",
-            "教育科学研究院", "生殖健康研究所", "软件学院"
-        ]
+        self.schools = self.school_index.schools
         for i, school in enumerate(self.schools):
             self.table.insertRow(i)
             seq_item = NumericTableWidgetItem(str(i + 1))
@@ -400,290 +396,37 @@ class ModernTableApp(QMainWindow):
             self.table.setItem(i, 3, QTableWidgetItem(""))
 
         # 创建底部按钮组，使用图标和更现代的设计
-        base_path = os.path.dirname(os.path.abspath(__file__))
-
-        # "添加行"按钮
-        self.add_row_btn = QPushButton("添加行")
-        try:
-            add_row_icon_path = get_resource_path(os.path.join("image", "add_row.svg"))
-            if os.path.exists(add_row_icon_path):
-                self.add_row_btn.setIcon(QIcon(add_row_icon_path))
-                self.add_row_btn.setIconSize(QSize(20, 20))
-            else:
-                self.add_row_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogNewFolder))
-        except Exception as e:
-            logging.error(f"加载添加行图标时发生错误: {e}")
-            self.add_row_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogNewFolder))
-
-        self.add_row_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4caf50; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #4caf50ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #4caf50cc;  /* 使用透明度创建按下效果 */
-            }
-        """)
-
-        # "删除行"按钮
-        self.del_row_btn = QPushButton("删除行")
-        try:
-            delete_row_icon_path = get_resource_path(os.path.join("image", "delete_row.svg"))
-            if os.path.exists(delete_row_icon_path):
-                self.del_row_btn.setIcon(QIcon(delete_row_icon_path))
-                self.del_row_btn.setIconSize(QSize(20, 20))
-            else:
-                self.del_row_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_TrashIcon))
-        except Exception as e:
-            logging.error(f"加载删除行图标时发生错误: {e}")
-            self.del_row_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_TrashIcon))
-
-        self.del_row_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #e57373; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #e57373ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #e57373cc;  /* 使用透明度创建按下效果 */
-            }
-        """)
-
-        # "按序号排序"按钮
-        self.sort_btn = QPushButton("按序号排序")
-
-        try:
-            sort_icon_path = get_resource_path(os.path.join("image", "sort.svg"))
-            if os.path.exists(sort_icon_path):
-                self.sort_btn.setIcon(QIcon(sort_icon_path))
-                self.sort_btn.setIconSize(QSize(20, 20))
-            else:
-                self.sort_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_ArrowDown))
-        except Exception as e:
-            logging.error(f"加载排序图标时发生错误: {e}")
-            self.sort_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_ArrowDown))
-        self.sort_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #64b5f6; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #64b5f6ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #64b5f6cc;  /* 使用透明度创建按下效果 */
-            }
-        """)
+        # 样式统一由应用级样式表按 objectName 提供，图标来自资源缓存
+        self.add_row_btn = self.create_button("添加行", "add_row_btn", "add_row.svg", QStyle.SP_FileDialogNewFolder)
+        self.del_row_btn = self.create_button("删除行", "del_row_btn", "delete_row.svg", QStyle.SP_TrashIcon)
+        self.sort_btn = self.create_button("按序号排序", "sort_btn", "sort.svg", QStyle.SP_ArrowDown)
 
         # 创建带下拉菜单的文件按钮
-        self.file_btn = QPushButton("打开文件")
-        try:
-            open_file_icon_path = get_resource_path(os.path.join("image", "open_file.svg"))
-            if os.path.exists(open_file_icon_path):
-                self.file_btn.setIcon(QIcon(open_file_icon_path))
-                self.file_btn.setIconSize(QSize(20, 20))
-            else:
-                self.file_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogOpenButton))
-        except Exception as e:
-            logging.error(f"加载打开文件图标时发生错误: {e}")
-            self.file_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogOpenButton))
-
-        self.file_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #ff9800; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-                text-align: left;
-                padding-right: 15px;
-            }
-            QPushButton:hover {
-                background-color: #ff9800ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #ff9800cc;  /* 使用透明度创建按下效果 */
-            }
-            QPushButton::menu-indicator {
-                subcontrol-position: right center;
-                subcontrol-origin: padding;
-                right: 8px;
-            }
-        """)
+        self.file_btn = self.create_button("打开文件", "file_btn", "open_file.svg", QStyle.SP_DialogOpenButton)
 
         # 创建下拉菜单
         file_menu = QMenu(self)
-        file_menu.setStyleSheet("""
-            QMenu {
-                background-color: white;
-                border: 1px solid #cccccc;
-                padding: 5px;
-                border-radius: 3px;
-            }
-            QMenu::item {
-                padding: 6px 25px 6px 20px;
-                border-radius: 3px;
-            }
-            QMenu::item:selected {
-                background-color: #f0f0f0;
-            }
-        """)
+        file_menu.setObjectName("file_menu")
 
         open_excel_action = file_menu.addAction("打开Excel文件")
-        try:
-            open_excel_icon_path = get_resource_path(os.path.join("image", "excel_dark.svg"))
-            if os.path.exists(open_excel_icon_path):
-                open_excel_action.setIcon(QIcon(open_excel_icon_path))
-            else:
-                open_excel_action.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogDetailedView))
-        except Exception as e:
-            logging.error(f"加载打开Excel菜单图标时发生错误: {e}")
-            open_excel_action.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogDetailedView))
+        open_excel_action.setIcon(self.resources.icon("excel_dark.svg", QStyle.SP_FileDialogDetailedView))
+
+        merge_files_action = file_menu.addAction("合并多个文件")
+        merge_files_action.setIcon(self.resources.icon("excel_dark.svg", QStyle.SP_FileDialogDetailedView))
 
         load_progress_action = file_menu.addAction("加载已保存进度")
-        try:
-            load_icon_path = get_resource_path(os.path.join("image", "load.svg"))
-            if os.path.exists(load_icon_path):
-                load_progress_action.setIcon(QIcon(load_icon_path))
-            else:
-                load_progress_action.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogContentsView))
-        except Exception as e:
-            logging.error(f"加载进度加载图标时发生错误: {e}")
-            load_progress_action.setIcon(QApplication.style().standardIcon(QStyle.SP_FileDialogContentsView))
+        load_progress_action.setIcon(self.resources.icon("load.svg", QStyle.SP_FileDialogContentsView))
 
         self.file_btn.setMenu(file_menu)
 
         # 创建保存进度按钮
-        self.save_btn = QPushButton("保存进度")
-        # 详细的图标和路径调试
-        logging.debug("调试：保存按钮图标加载")
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        logging.debug(f"当前脚本路径: {base_path}")
-
-        try:
-            # 使用新的resource path获取方法
-            save_icon_path = get_resource_path(os.path.join("image", "save.svg"))
-            logging.debug(f"尝试加载图标路径: {save_icon_path}")
-            logging.debug(f"文件是否存在: {os.path.exists(save_icon_path)}")
-
-            if os.path.exists(save_icon_path):
-                icon = QIcon(save_icon_path)
-                if not icon.isNull():
-                    self.save_btn.setIcon(icon)
-                    self.save_btn.setIconSize(QSize(20, 20))
-                    logging.debug("成功加载自定义图标")
-                else:
-                    logging.warning("警告：图标加载失败（QIcon为空）")
-                    self.save_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogSaveButton))
-            else:
-                logging.warning(f"未找到图标文件: {save_icon_path}")
-                self.save_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogSaveButton))
-        except Exception as e:
-            logging.error(f"加载图标时发生错误: {e}")
-            self.save_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_DialogSaveButton))
-
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #9c27b0; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #9c27b0ee;
-            }
-            QPushButton:pressed {
-                background-color: #9c27b0cc;
-            }
-        """)
+        self.save_btn = self.create_button("保存进度", "save_btn", "save.svg", QStyle.SP_DialogSaveButton)
 
         # 创建输出Excel按钮
-        self.output_btn = QPushButton("输出为Excel")
-
-        try:
-            excel_icon_path = get_resource_path(os.path.join("image", "excel.svg"))
-            if os.path.exists(excel_icon_path):
-                self.output_btn.setIcon(QIcon(excel_icon_path))
-                self.output_btn.setIconSize(QSize(20, 20))
-            else:
-                self.output_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_FileIcon))
-        except Exception as e:
-            logging.error(f"加载Excel图标时发生错误: {e}")
-            self.output_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_FileIcon))
-
-        self.output_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #81c784; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #81c784ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #81c784cc;  /* 使用透明度创建按下效果 */
-            }
-        """)
+        self.output_btn = self.create_button("输出为Excel", "output_btn", "excel.svg", QStyle.SP_FileIcon)
 
         # 撤回按钮
-        self.undo_btn = QPushButton("撤回操作")
-
-        try:
-            undo_icon_path = get_resource_path(os.path.join("image", "undo.svg"))
-            if os.path.exists(undo_icon_path):
-                self.undo_btn.setIcon(QIcon(undo_icon_path))
-                self.undo_btn.setIconSize(QSize(20, 20))
-            else:
-                self.undo_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_BrowserReload))
-        except Exception as e:
-            logging.error(f"加载撤回图标时发生错误: {e}")
-            self.undo_btn.setIcon(QApplication.style().standardIcon(QStyle.SP_BrowserReload))
-        self.undo_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #ba68c8; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #ba68c8ee;  /* 使用透明度创建悬停效果 */
-            }
-            QPushButton:pressed {
-                background-color: #ba68c8cc;  /* 使用透明度创建按下效果 */
-            }
-        """)
+        self.undo_btn = self.create_button("撤回操作", "undo_btn", "undo.svg", QStyle.SP_BrowserReload)
 
         # 初始时禁用添加和删除按钮，直到有选择
         self.add_row_btn.setEnabled(False)
@@ -737,6 +480,7 @@ class ModernTableApp(QMainWindow):
 
         # 连接文件菜单动作
         open_excel_action.triggered.connect(self.open_excel)
+        merge_files_action.triggered.connect(self.merge_files)
         load_progress_action.triggered.connect(self.load_progress)
 
     def setup_keyboard_shortcuts(self):
@@ -847,6 +591,7 @@ class ModernTableApp(QMainWindow):
         # 设置到剪贴板
         QApplication.clipboard().setText(text)
 
+    @timed("paste_to_selection", rows=table_row_count)
     def paste_to_selection(self):
         """从剪贴板粘贴到表格（优化撤回功能）"""
         # 获取剪贴板内容
@@ -1018,67 +763,264 @@ class ModernTableApp(QMainWindow):
             options=options
         )
 
-        self.save_state()
-
         if not file_path:
             return
 
         try:
-            # 根据文件类型选择读取方式
-            if file_path.lower().endswith('.csv'):
-                df = pd.read_csv(file_path)
+            if not self.import_table_file(file_path):
+                QMessageBox.warning(self, "警告", "未导入：已取消，或未找到学院和财务金额对应的列！")
+                return
+
+            # 显示成功消息
+            QMessageBox.information(self, "成功", f"已成功导入Excel文件：{os.path.basename(file_path)}")
+
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"导入Excel文件时发生错误：{str(e)}")
+
+    def resolve_column_mapping(self, headers, file_path):
+        """确定导入文件各列与表格列的对应关系，取消或缺少必选列时返回 None
+
+        表头相同的文件使用保存的对应关系；按列名能完整识别时直接使用，否则请用户确认。
+        """
+        mapping = self.column_profiles.get(headers)
+        if mapping is not None:
+            logging.info(f"使用保存的列对应关系导入 {os.path.basename(file_path)}")
+            return mapping
+
+        mapping, exact = detect_mapping(headers)
+        if exact:
+            return mapping
+
+        dialog = ColumnMappingDialog(headers, mapping, os.path.basename(file_path), self)
+        if dialog.exec_() != ColumnMappingDialog.Accepted:
+            return None
+        mapping = dialog.mapping()
+        if dialog.remember():
+            self.column_profiles.save(headers, mapping)
+        return mapping if is_complete(mapping) else None
+
+    def choose_sheets(self, file_path):
+        """列出工作簿中的工作表，有多个时请用户选择，取消时返回 None"""
+        sheet_names = list_sheets(file_path)
+        if len(sheet_names) <= 1:
+            return sheet_names[:1] or [0]
+        dialog = SheetPickerDialog(sheet_names, os.path.basename(file_path), self)
+        if dialog.exec_() != SheetPickerDialog.Accepted:
+            return None
+        return dialog.selected_sheets()
+
+    @timed("read_table_file")
+    def read_table_frames(self, file_path, sheet_names=None):
+        """读取CSV文件（sheet_names 为 None）或Excel文件中的工作表，返回 [(工作表名称, DataFrame, 是否没有表头)]
+
+        第一行是数据而不是表头时（见 is_headerless）重新读取，不把第一行当作表头。
+        """
+        if sheet_names is None:
+            frames = [(None, read_csv(file_path))]
+        else:
+            frames = read_sheets(file_path, sheet_names)
+
+        result = []
+        for sheet_name, df in frames:
+            headerless = is_headerless([str(header) for header in df.columns])
+            if headerless:
+                logging.info(f"{os.path.basename(file_path)} 没有表头，按列顺序导入")
+                if sheet_name is None:
+                    df = read_csv(file_path, header=None)
+                else:
+                    df = read_sheet(file_path, sheet_name, header=None)
+            result.append((sheet_name, df, headerless))
+        return result
+
+    def read_table_file(self, file_path):
+        """读取Excel/CSV文件并确定各列的对应关系，返回 [(工作表名称, DataFrame, {表格列: 列号})]
+
+        有多个工作表时请用户选择，列名不能完整识别时请用户确认（对话框不计入性能记录）。
+        取消或未找到学院和财务金额列时返回 None。
+        """
+        if file_path.lower().endswith('.csv'):
+            sheet_names = None
+        else:
+            sheet_names = self.choose_sheets(file_path)
+            if not sheet_names:
+                return None
+
+        frames = []
+        for sheet_name, df, headerless in self.read_table_frames(file_path, sheet_names):
+            if headerless:
+                # 没有表头，按原来的列顺序对应
+                mapping = positional_mapping(len(df.columns))
+                if not is_complete(mapping):
+                    return None
             else:
-                df = pd.read_excel(file_path)
+                mapping = self.resolve_column_mapping([str(header) for header in df.columns], file_path)
+                if mapping is None:
+                    return None
+            frames.append((sheet_name, df, mapping))
+        return frames
 
-            # 清空当前表格
-            self.table.setRowCount(0)
+    def table_values(self, frames):
+        """按列对应关系取出表格各列并规范学院名称
 
-            # 获取列名
-            headers = df.columns.tolist()
+        有多个工作表时依次拼接，增加"来源工作表"列。
+        返回 ({列名: 值列表}, {行号: 需要核对的学院匹配结果})
+        """
+        values = {column: [] for column in TABLE_COLUMNS}
+        if len(frames) > 1:
+            values[SOURCE_SHEET_COLUMN] = []
+        for sheet_name, df, mapping in frames:
+            # 按列取值，空单元格为空字符串
+            for column in TABLE_COLUMNS:
+                index = mapping.get(column)
+                if index is None:
+                    values[column].extend([""] * len(df))
+                else:
+                    # 整列转换为文本，不逐个单元格处理
+                    series = df.iloc[:, index]
+                    values[column].extend(series.astype(object).where(series.notna(), "").astype(str).tolist())
+            if SOURCE_SHEET_COLUMN in values:
+                values[SOURCE_SHEET_COLUMN].extend([str(sheet_name)] * len(df))
+        # 没有序号的行按行号编号
+        values["序号"] = [value or str(i + 1) for i, value in enumerate(values["序号"])]
+        # 学院名称统一为标准名称，无法确定的保留原文并标记
+        values["学院"], review = self.school_index.normalize_column(values["学院"])
+        return values, review
+
+    def fill_table(self, values, review):
+        """用各列的值替换表格内容，学院名称需要核对的单元格标黄"""
+        # 暂时断开信号连接，避免每个单元格都保存一次撤回状态
+        try:
+            self.table.itemChanged.disconnect(self.on_item_changed)
+        except TypeError:
+            pass  # 如果信号未连接，忽略错误
 
-            # 检查是否有足够的列
-            if len(headers) < 3:
-                QMessageBox.warning(self, "警告", "Excel文件至少需要3列内容（序号、学院、财务金额）！")
-                return
+        # 清空当前表格并填入数据
+        row_count = len(values["学院"])
+        self.table.setRowCount(0)
+        self.table.setRowCount(row_count)
+        for row in range(row_count):
+            self.table.setItem(row, 0, NumericTableWidgetItem(values["序号"][row]))
+            self.table.setItem(row, 1, QTableWidgetItem(values["学院"][row]))
+            self.table.setItem(row, 2, QTableWidgetItem(values["财务金额"][row]))
+            self.table.setItem(row, 3, QTableWidgetItem(values["是否补交"][row]))
+
+        # 其他列（如"来源工作表"）写入同名列，没有时追加
+        headers, _ = self.table_columns()
+        for header, column_values in values.items():
+            if header in TABLE_COLUMNS:
+                continue
+            if header in headers:
+                col = headers.index(header)
+            else:
+                col = self.table.columnCount()
+                self.table.insertColumn(col)
+                self.table.setHorizontalHeaderItem(col, QTableWidgetItem(header))
+                headers.append(header)
+            for row, text in enumerate(column_values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+        for row, match in review.items():
+            item = self.table.item(row, 1)
+            item.setBackground(QColor("#fff59d"))
+            if match.candidates:
+                item.setToolTip("可能是：" + "、".join(match.candidates))
+            else:
+                item.setToolTip("不在学院列表中")
 
-            # 添加数据到表格
-            for idx, row in df.iterrows():
-                table_row = self.table.rowCount()
-                self.table.insertRow(table_row)
-
-                # 序号
-                seq_num = str(idx + 1)
-                if len(headers) > 0 and not pd.isna(row[0]):
-                    seq_num = str(row[0])
-                self.table.setItem(table_row, 0, NumericTableWidgetItem(seq_num))
-
-                # 学院名称
-                school_name = ""
-                if len(headers) > 1 and not pd.isna(row[1]):
-                    school_name = str(row[1])
-                self.table.setItem(table_row, 1, QTableWidgetItem(school_name))
-
-                # 财务金额
-                finance_amount = ""
-                if len(headers) > 2 and not pd.isna(row[2]):
-                    finance_amount = str(row[2])
-                self.table.setItem(table_row, 2, QTableWidgetItem(finance_amount))
-
-                # 是否补交 (如果有)
-                supplement = ""
-                if len(headers) > 3 and not pd.isna(row[3]):
-                    supplement = str(row[3])
-                self.table.setItem(table_row, 3, QTableWidgetItem(supplement))
-
-            # 更新序号并排序
-            self.update_row_numbers()
-            self.sort_by_index()
+        # 重新连接信号
+        self.table.itemChanged.connect(self.on_item_changed)
 
-            # 显示成功消息
-            QMessageBox.information(self, "成功", f"已成功导入Excel文件：{os.path.basename(file_path)}")
+        # 更新序号并排序
+        self.update_row_numbers()
+        self.sort_by_index()
+
+        if review:
+            logging.warning(f"有 {len(review)} 行学院名称无法确定，已标黄: "
+                            + "、".join(sorted({values['学院'][row] for row in review})))
+            self.statusBar().showMessage(f"有 {len(review)} 行学院名称无法确定，已标黄，请核对")
+
+    def import_table_file(self, file_path):
+        """读取Excel/CSV文件并按列名填充到表格，取消或未找到学院和财务金额列时返回False"""
+        frames = self.read_table_file(file_path)
+        if frames is None:
+            return False
+        self.import_table_frames(frames)
+        return True
+
+    @timed("open_excel", rows=table_row_count)
+    def import_table_frames(self, frames):
+        """用读取的各工作表替换表格内容（作为一次可撤回的操作）"""
+        values, review = self.table_values(frames)
+        self.save_state()
+        self.fill_table(values, review)
+        # 保存导入后的状态，便于撤回整个导入
+        self.save_state()
 
+    def merge_files(self):
+        """选择多个文件，按学院合并到当前表格"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "选择要合并的文件",
+            "",
+            "Excel Files (*.xlsx *.xls *.csv);;All Files (*)"
+        )
+        if not file_paths:
+            return
+
+        policies = list(POLICY_NAMES)
+        label, ok = QInputDialog.getItem(self, "合并方式", "同一学院的财务金额：",
+                                         [POLICY_NAMES[p] for p in policies], 0, False)
+        if not ok:
+            return
+        policy = policies[[POLICY_NAMES[p] for p in policies].index(label)]
+
+        try:
+            conflicts = self.merge_table_files(file_paths, policy)
         except Exception as e:
-            QMessageBox.critical(self, "错误", f"导入Excel文件时发生错误：{str(e)}")
+            QMessageBox.critical(self, "错误", f"合并文件时发生错误：{str(e)}")
+            return
+        if conflicts is None:
+            return
+
+        message = f"已合并 {len(file_paths)} 个文件，共 {self.table.rowCount()} 行"
+        if not conflicts:
+            QMessageBox.information(self, "成功", message)
+            return
+        box = QMessageBox(QMessageBox.Warning, "合并完成", f"{message}，有 {len(conflicts)} 处需要核对（见详细信息）", parent=self)
+        box.setDetailedText("\n".join(str(conflict) for conflict in conflicts))
+        box.exec_()
+
+    def merge_table_files(self, file_paths, policy=POLICY_SUM):
+        """读取多个文件并与当前表格按学院合并（作为一次可撤回的操作），返回冲突列表
+
+        某个文件未找到学院和财务金额列（或取消选择列）时不修改表格，返回 None。
+        """
+        files = []
+        for file_path in file_paths:
+            frames = self.read_table_file(file_path)
+            if frames is None:
+                QMessageBox.warning(self, "警告", f"{os.path.basename(file_path)} 中未找到学院和财务金额对应的列，未合并！")
+                return None
+            files.append((os.path.basename(file_path), frames))
+        return self.merge_table_frames(files, policy)
+
+    @timed("merge_files", rows=table_row_count)
+    def merge_table_frames(self, files, policy=POLICY_SUM):
+        """把读取的各文件 [(文件名, 各工作表)] 与当前表格合并，返回冲突列表"""
+        sources = [(name, *self.table_values(frames)) for name, frames in files]
+
+        # 其他列（插件追加的列、来源工作表等）一并传入，合并后保留
+        headers, columns = self.table_columns()
+        base = dict(zip(TABLE_COLUMNS + headers[len(TABLE_COLUMNS):], columns))
+        merged, review, conflicts = merge_tables(base, sources, policy)
+
+        self.save_state()
+        self.fill_table(merged, review)
+        # 保存合并后的状态，便于一次撤回整个合并
+        self.save_state()
+        for conflict in conflicts:
+            logging.warning(f"合并冲突: {conflict}")
+        logging.info(f"已合并 {len(files)} 个文件（{POLICY_NAMES[policy]}），{len(conflicts)} 处冲突")
+        return conflicts
 
     def init_option_page(self):
         self.year_input = QLineEdit(self)
@@ -1105,36 +1047,19 @@ class ModernTableApp(QMainWindow):
         input_layout.addWidget(self.day_input)
         option_layout.addLayout(input_layout)
 
-    # 修改create_button方法支持图标
-    def create_button(self, text, color, icon_file=None, base_path=None):
-        """创建美观的按钮，支持图标"""
+    def create_button(self, text, object_name, icon_name=None, fallback=None):
+        """创建美观的按钮，支持图标
+
+        样式来自应用级样式表中 QPushButton#object_name 的规则（见 MAIN_BUTTONS），
+        按钮本身不再单独设置样式表。
+        """
         btn = QPushButton(text)
+        btn.setObjectName(object_name)
 
-        # 设置图标（如果存在）
-        if icon_file and base_path:
-            icon_path = os.path.join(base_path, icon_file)
-            if os.path.exists(icon_path):
-                btn.setIcon(QIcon(icon_path))
-                btn.setIconSize(QSize(20, 20))
-
-        # 应用现代按钮样式
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {color}; 
-                color: white; 
-                padding: 10px; 
-                font-size: 16px;
-                border-radius: 4px;
-                min-width: 120px;
-                font-weight: 500;
-            }}
-            QPushButton:hover {{
-                background-color: {color}ee;  /* 使用透明度创建悬停效果 */
-            }}
-            QPushButton:pressed {{
-                background-color: {color}cc;  /* 使用透明度创建按下效果 */
-            }}
-        """)
+        # 设置图标（缺失时使用系统标准图标）
+        if icon_name:
+            btn.setIcon(self.resources.icon(icon_name, fallback))
+            btn.setIconSize(QSize(20, 20))
 
         return btn
 
@@ -1220,10 +1145,27 @@ class ModernTableApp(QMainWindow):
         # 更新状态栏
         self.statusBar().showMessage(f"已删除第 {current_row + 1} 行")
 
+    @timed("sort_by_index", rows=table_row_count)
     def sort_by_index(self):
         self.table.sortItems(0, Qt.AscendingOrder)
 
     def output_to_excel(self):
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        save_dir = os.path.join(base_path, "../input")
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        file_path = os.path.join(save_dir, "data.xlsx")
+
+        try:
+            self.export_to_excel(file_path)
+            QMessageBox.information(self, "成功", "文件已成功保存！")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存文件时发生错误: {str(e)}")
+
+    @timed("build_export_rows", rows=table_row_count)
+    def build_export_rows(self):
+        """按 input/data.xlsx 的列整理表格数据，返回 (列名, 行列表)"""
         row_count = self.table.rowCount()
         data = []
         for row in range(row_count):
@@ -1244,37 +1186,49 @@ class ModernTableApp(QMainWindow):
             row_data.extend([month_value, year_value, day_value])
             data.append(row_data)
 
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        save_dir = os.path.join(base_path, "../input")
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-
-        file_path = os.path.join(save_dir, "data.xlsx")
-
-        try:
-            columns = ["序号", "学院", "财务金额", "团费月份", "团费年份", "落款日期"]
-            df = pd.DataFrame(data, columns=columns)
-            df.to_excel(file_path, index=False)
-
-            workbook = load_workbook(file_path)
-            worksheet = workbook.active
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2) * 1.2
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            workbook.save(file_path)
-
-            QMessageBox.information(self, "成功", "文件已成功保存！")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存文件时发生错误: {str(e)}")
+        columns = ["序号", "学院", "财务金额", "团费月份", "团费年份", "落款日期"]
+        return columns, data
+
+    def export_columns(self):
+        """按 input/data.xlsx 的列返回列式数据 (列名, 各列值)，供外部插件使用"""
+        headers, data = self.build_export_rows()
+        columns = [list(values) for values in zip(*data)] if data else [[] for _ in headers]
+        return headers, columns
+
+    @timed("output_to_excel", rows=table_row_count)
+    def export_to_excel(self, file_path):
+        """将表格数据和选项写入Excel文件，并自动调整列宽"""
+        columns, data = self.build_export_rows()
+        df = pd.DataFrame(data, columns=columns)
+        df.to_excel(file_path, index=False)
+
+        workbook = load_workbook(file_path)
+        worksheet = workbook.active
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = get_column_letter(column[0].column)
+            for cell in column:
+                try:
+                    max_length = max(max_length, len(str(cell.value)))
+                except:
+                    pass
+            adjusted_width = (max_length + 2) * 1.2
+            worksheet.column_dimensions[column_letter].width = adjusted_width
+        workbook.save(file_path)
 
     def save_progress(self):
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getSaveFileName(self, "保存进度", "", "JSON 文件 (*.json)", options=options)
+        if file_path:
+            try:
+                self.write_progress(file_path)
+                QMessageBox.information(self, "成功", "进度已成功保存！")
+            except Exception as e:
+                QMessageBox.critical(self, "错误", f"保存进度时发生错误: {str(e)}")
+
+    @timed("save_progress", rows=table_row_count)
+    def write_progress(self, file_path):
+        """将表格数据和选项保存为JSON进度文件"""
         row_count = self.table.rowCount()
         data = []
         for row in range(row_count):
@@ -1296,41 +1250,103 @@ class ModernTableApp(QMainWindow):
             "options_data": options_data
         }
 
-        options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getSaveFileName(self, "保存进度", "", "JSON 文件 (*.json)", options=options)
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=4)
-                QMessageBox.information(self, "成功", "进度已成功保存！")
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"保存进度时发生错误: {str(e)}")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(save_data, f, ensure_ascii=False, indent=4)
 
     def load_progress(self):
         options = QFileDialog.Options()
         file_path, _ = QFileDialog.getOpenFileName(self, "导入进度", "", "JSON 文件 (*.json)", options=options)
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    load_data = json.load(f)
+                self.read_progress(file_path)
+                QMessageBox.information(self, "成功", "进度已成功导入！")
+            except Exception as e:
+                QMessageBox.critical(self, "错误", f"导入进度时发生错误: {str(e)}")
 
-                self.table.setRowCount(0)
-                for row_data in load_data["table_data"]:
-                    current_row = self.table.rowCount()
-                    self.table.insertRow(current_row)
+    @timed("load_progress", rows=table_row_count)
+    def read_progress(self, file_path):
+        """从JSON进度文件恢复表格数据和选项（作为一次可撤回的操作）"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            load_data = json.load(f)
 
-                    numeric_item = NumericTableWidgetItem(row_data[0])
-                    self.table.setItem(current_row, 0, numeric_item)
-                    for col in range(1, 4):
-                        self.table.setItem(current_row, col, QTableWidgetItem(row_data[col]))
+        self.save_state()
+        # 暂时断开信号连接，避免每个单元格都保存一次撤回状态
+        try:
+            self.table.itemChanged.disconnect(self.on_item_changed)
+        except TypeError:
+            pass  # 如果信号未连接，忽略错误
 
-                self.year_input.setText(load_data["options_data"]["year"])
-                self.month_input.setText(load_data["options_data"]["month"])
-                self.day_input.setText(load_data["options_data"]["day"])
+        self.table.setRowCount(0)
+        for row_data in load_data["table_data"]:
+            current_row = self.table.rowCount()
+            self.table.insertRow(current_row)
 
-                QMessageBox.information(self, "成功", "进度已成功导入！")
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"导入进度时发生错误: {str(e)}")
+            numeric_item = NumericTableWidgetItem(row_data[0])
+            self.table.setItem(current_row, 0, numeric_item)
+            for col in range(1, 4):
+                self.table.setItem(current_row, col, QTableWidgetItem(row_data[col]))
+
+        # 重新连接信号
+        self.table.itemChanged.connect(self.on_item_changed)
+        # 保存导入进度后的状态，便于撤回整个导入
+        self.save_state()
+
+        self.year_input.setText(load_data["options_data"]["year"])
+        self.month_input.setText(load_data["options_data"]["month"])
+        self.day_input.setText(load_data["options_data"]["day"])
+
+    def table_columns(self):
+        """以列的形式返回表格数据：(表头列表, 各列的值列表)"""
+        headers = []
+        for col in range(self.table.columnCount()):
+            header_item = self.table.horizontalHeaderItem(col)
+            headers.append(header_item.text() if header_item else str(col))
+
+        columns = [[] for _ in headers]
+        for row in range(self.table.rowCount()):
+            for col, values in enumerate(columns):
+                item = self.table.item(row, col)
+                values.append(item.text() if item else "")
+        return headers, columns
+
+    def table_options(self):
+        """选项页中的年份、月份和落款日期"""
+        return {
+            "year": self.year_input.text(),
+            "month": self.month_input.text(),
+            "day": self.day_input.text()
+        }
+
+    def apply_plugin_columns(self, columns):
+        """将插件返回的列写回表格（作为一次可撤回的操作），同名列覆盖，新列追加"""
+        self.save_state()
+
+        # 暂时断开信号连接
+        try:
+            self.table.itemChanged.disconnect(self.on_item_changed)
+        except TypeError:
+            pass  # 如果信号未连接，忽略错误
+
+        headers, _ = self.table_columns()
+        for header, values in columns.items():
+            if header == "序号":  # 保护序号列
+                continue
+            if header in headers:
+                col = headers.index(header)
+            else:
+                col = self.table.columnCount()
+                self.table.insertColumn(col)
+                self.table.setHorizontalHeaderItem(col, QTableWidgetItem(header))
+                headers.append(header)
+            for row, text in enumerate(values[:self.table.rowCount()]):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+        # 重新连接信号
+        self.table.itemChanged.connect(self.on_item_changed)
+
+        # 保存修改后的状态，便于撤回到插件运行之前
+        self.save_state()
+        self.statusBar().showMessage(f"插件已更新 {len(columns)} 列数据")
 
     def update_buttons_state(self):
         """根据当前选择状态更新按钮的启用/禁用状态"""
@@ -1359,6 +1375,7 @@ class ModernTableApp(QMainWindow):
         # 重新连接信号
         self.table.itemChanged.connect(self.on_item_changed)
 
+    @timed("save_state", rows=table_row_count)
     def save_state(self):
         """保存当前表格状态到撤回历史"""
         # 获取当前表格数据
@@ -1390,6 +1407,7 @@ class ModernTableApp(QMainWindow):
             if hasattr(self, 'undo_btn'):
                 self.undo_btn.setEnabled(False)
 
+    @timed("undo_last_action", rows=table_row_count)
     def undo_last_action(self):
         """改进的撤回功能，支持多步撤回和保持选中位置"""
         if len(self.undo_stack) <= 1:
@@ -1429,6 +1447,10 @@ class ModernTableApp(QMainWindow):
             while self.table.rowCount() < row_count_after:
                 self.table.insertRow(self.table.rowCount())
 
+        # 插件可能追加了列，撤回时恢复列数
+        if previous_state and len(previous_state[0]) != self.table.columnCount():
+            self.table.setColumnCount(len(previous_state[0]))
+
         # 恢复单元格数据
         for row in range(row_count_after):
             for col in range(min(len(previous_state[row]), self.table.columnCount())):
@@ -1484,6 +1506,21 @@ class ModernTableApp(QMainWindow):
 
 
 if __name__ == "__main__":
+    # 以下只在主进程中执行：未打包运行时，子进程以 __mp_main__ 的名称导入本模块，
+    # 不应再设置应用ID或重复添加日志处理器（多个进程轮转同一个 logs/run.log 会出错）
+
+    # 设置明确的Windows应用ID (这会强制Windows使用新图标)
+    try:
+        # 注意：这个ID必须唯一且保持一致，不要随意更改
+        app_id = u'HUST.TeamFeeSystem.HGUI.2025'
+        ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(app_id)
+    except Exception as e:
+        print(f"设置应用ID出错: {e}")
+
+    # 配置日志记录：异步写入 logs/run.log（JSON行格式，按大小轮转）
+    # 日志级别可通过环境变量 HSGUI_LOG_LEVEL 设置
+    setup_logging()
+
     # 设置全局异常处理器来显示详细错误
     import traceback
 
@@ -1503,6 +1540,13 @@ if __name__ == "__main__":
     try:
         window = ModernTableApp()
         window.show()
+
+        # 监测GUI线程卡顿，退出时输出汇总
+        watchdog = StallWatchdog()
+        watchdog.start()
+        app.aboutToQuit.connect(watchdog.stop)
+        app.aboutToQuit.connect(window.plugin_page.scheduler.shutdown)
+
         sys.exit(app.exec_())
     except Exception as e:
         print(f"启动失败: {e}")
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import logging
+import functools
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class MetricsRecorder:
+    """记录各项操作的耗时、行数和内存峰值，保存在固定容量的环形缓冲区中
+
+    内存峰值需要另外开启（HSGUI_METRICS=memory 或诊断页的"记录内存峰值"），关闭时记录为 None。
+    记录的是操作期间 Python 分配的内存比操作开始时多出的最大值（tracemalloc 统计，KB），
+    不包括 Qt 等 C++ 部分的内存；嵌套的操作分别统计，外层的峰值包含内层的峰值。
+    """
+
+    def __init__(self, capacity=500, enabled=True, trace_memory=False):
+        self.records = deque(maxlen=capacity)
+        self.enabled = enabled
+        # 内存峰值依赖 tracemalloc，开销明显高于计时，默认关闭
+        self.trace_memory = trace_memory
+        self._peaks = []  # 进行中的各层测量到目前为止的内存峰值（字节），内层开始时重置 tracemalloc 的峰值
+
+    @contextmanager
+    def measure(self, name, rows=None):
+        """统计一段代码的执行情况
+
+        rows 可以是整数，也可以是无参函数（在操作完成后调用以获取行数）。
+        """
+        if not self.enabled:
+            yield
+            return
+
+        owns_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            owns_tracing = True
+        # reset_peak 需要 Python 3.9 及以上，更早的版本不记录内存峰值
+        tracing = self.trace_memory and tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak")
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                # 外层测量到目前为止的峰值先保存下来，内层结束后合并
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(current)
+            start_memory = current
+
+        started_at = time.time()
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+
+            peak_kb = None
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                peak_kb = round((peak - start_memory) / 1024, 1)
+                if owns_tracing:
+                    tracemalloc.stop()
+
+            row_count = rows
+            if callable(rows):
+                try:
+                    row_count = rows()
+                except Exception:
+                    row_count = None
+
+            self.add(name, started_at, duration, row_count, peak_kb, ok)
+
+    def add(self, name, started_at, duration_ms, rows=None, peak_kb=None, ok=True):
+        """直接添加一条记录，用于插件进程等异步完成的操作"""
+        if not self.enabled:
+            return
+        self.records.append({
+            "name": name,
+            "start": datetime.fromtimestamp(started_at).isoformat(timespec='milliseconds'),
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "peak_kb": peak_kb,
+            "ok": ok,
+        })
+
+    def snapshot(self):
+        """返回当前缓冲区中所有记录的副本（按时间先后）"""
+        return list(self.records)
+
+    def summary(self):
+        """按操作名汇总：次数、总耗时、平均耗时、最大耗时"""
+        result = {}
+        for record in self.records:
+            item = result.setdefault(record["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            item["count"] += 1
+            item["total_ms"] += record["duration_ms"]
+            item["max_ms"] = max(item["max_ms"], record["duration_ms"])
+        for item in result.values():
+            item["avg_ms"] = round(item["total_ms"] / item["count"], 3)
+            item["total_ms"] = round(item["total_ms"], 3)
+        return result
+
+    def clear(self):
+        self.records.clear()
+
+    def export_json(self, file_path):
+        """将记录和汇总导出为JSON文件"""
+        data = {
+            "exported_at": datetime.now().isoformat(timespec='seconds'),
+            "records": self.snapshot(),
+            "summary": self.summary(),
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        logging.info(f"性能记录已导出到: {file_path}")
+
+
+# 全局记录器，可通过环境变量 HSGUI_METRICS=0 关闭，HSGUI_METRICS=memory 同时记录内存峰值
+_metrics_env = os.environ.get('HSGUI_METRICS', '1').lower()
+metrics = MetricsRecorder(
+    enabled=_metrics_env not in ('0', 'off', 'false'),
+    trace_memory=_metrics_env == 'memory'
+)
+
+
+def timed(name, rows=None):
+    """方法装饰器：记录操作耗时
+
+    rows 为接收 self 的函数，在操作完成后调用以获取行数。
+    """
+    def decorator(func):
+        code = func.__code__
+        # Qt 信号（如 clicked(bool)）会传入多余参数，按原函数的参数个数截断
+        max_args = None if code.co_flags & 0x04 else code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            row_getter = (lambda: rows(args[0])) if rows and args else None
+            with metrics.measure(name, row_getter):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
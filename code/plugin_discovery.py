@@ -0,0 +1,135 @@
+"""extension 目录中外部插件的自动发现
+
+递归扫描 extension 目录下的可执行文件（*.exe），无需逐个通过"添加插件"添加。
+插件目录中可以放一个 plugin.json 说明文件（可选）：
+
+    {
+        "name": "三联表生成",          # 显示名称，默认为文件名
+        "version": "1.2.0",
+        "entry": "combine_docx.exe",   # 说明文件对应的程序，默认为同目录下的所有 .exe
+        "inputs": ["../../input/data.xlsx"],
+        "outputs": ["../../input/word_data", "../../output"],
+        "concurrency": "exclusive",    # 并发类型，见 plugin_scheduler
+        "worker": true,                # 支持常驻进程模式，见 plugin_worker
+        "cache": false                 # 不缓存运行结果，见 result_cache
+    }
+
+inputs / outputs 为相对插件程序所在目录的路径。扫描结果保存在索引文件中，
+以路径、修改时间、大小和文件哈希为键；再次启动时只需检查文件状态，
+未变化的插件不再读取说明文件和计算哈希。以 "_" 或 "." 开头的目录（如打包程序的 _internal）不扫描。
+"""
+import os
+import json
+import hashlib
+import logging
+from plugin_registry import write_json_atomic
+
+
+MANIFEST_NAME = "plugin.json"
+PLUGIN_EXTENSIONS = (".exe",)
+INDEX_VERSION = 1
+MANIFEST_FIELDS = ("name", "version", "inputs", "outputs", "concurrency", "worker", "worker_args", "cache")
+
+
+def file_hash(path, chunk_size=1024 * 1024, algorithm="sha1"):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(path):
+    """(修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class PluginIndex:
+    """extension 目录的插件索引，缓存在 JSON 文件中"""
+
+    def __init__(self, extension_path, index_path):
+        self.extension_path = extension_path
+        self.index_path = index_path
+        self.entries = {}  # 插件路径 -> 索引项
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"插件索引文件无法读取，将重新扫描: {e}")
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("plugins", {})
+
+    def _save(self):
+        try:
+            write_json_atomic(self.index_path, {"version": INDEX_VERSION, "plugins": self.entries})
+        except OSError as e:
+            logging.warning(f"保存插件索引失败: {e}")
+
+    def _walk(self):
+        """递归列出候选插件程序及其说明文件路径"""
+        for root, dirs, files in os.walk(self.extension_path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(("_", ".")))
+            manifest_path = os.path.join(root, MANIFEST_NAME) if MANIFEST_NAME in files else None
+            for name in sorted(files):
+                if name.lower().endswith(PLUGIN_EXTENSIONS):
+                    yield os.path.join(root, name), manifest_path
+
+    def _read_manifest(self, manifest_path, plugin_path):
+        """读取说明文件中适用于该插件的字段"""
+        if manifest_path is None:
+            return {}
+        try:
+            with open(manifest_path, "r", encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"插件说明文件格式错误: {manifest_path} - {e}")
+            return {}
+        entry = manifest.get("entry")
+        if entry and os.path.normcase(os.path.join(os.path.dirname(manifest_path), entry)) != os.path.normcase(plugin_path):
+            return {}
+        return {key: manifest[key] for key in MANIFEST_FIELDS if key in manifest}
+
+    def scan(self):
+        """扫描 extension 目录，返回插件信息列表；只有新增或变化的插件会重新读取"""
+        found = {}
+        changed = False
+        for plugin_path, manifest_path in self._walk():
+            stamp = file_stamp(plugin_path)
+            manifest_stamp = file_stamp(manifest_path) if manifest_path else None
+            entry = self.entries.get(plugin_path)
+            if entry and entry["stamp"] == stamp and entry["manifest_stamp"] == manifest_stamp:
+                found[plugin_path] = entry
+                continue
+
+            try:
+                sha1 = file_hash(plugin_path)
+            except OSError as e:
+                logging.warning(f"读取插件失败: {plugin_path} - {e}")
+                continue
+            filename = os.path.basename(plugin_path)
+            info = {
+                'name': os.path.splitext(filename)[0],
+                'path': plugin_path,
+                'filename': filename,
+                'discovered': True,
+            }
+            info.update(self._read_manifest(manifest_path, plugin_path))
+            info['hash'] = sha1
+            found[plugin_path] = {"stamp": stamp, "manifest_stamp": manifest_stamp, "info": info}
+            changed = True
+            logging.info(f"发现插件: {plugin_path}（{info.get('version', '未标注版本')}）")
+
+        if changed or set(found) != set(self.entries):
+            self.entries = found
+            self._save()
+        return [dict(entry["info"]) for entry in found.values()]
@@ -0,0 +1,232 @@
+import os
+from PyQt5.QtCore import Qt, QSize, QRect, QRectF, QEvent, QModelIndex, QAbstractListModel, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPainterPath, QLinearGradient
+from PyQt5.QtWidgets import QStyledItemDelegate, QListView, QAbstractItemView, QApplication, QStyle
+from python_plugins import PLUGIN_TYPE
+
+
+# 插件信息字典所在的数据角色
+PluginInfoRole = Qt.UserRole + 1
+
+ITEM_HEIGHT = 90
+ICON_SIZE = 48
+BUTTON_WIDTH = 80
+BUTTON_HEIGHT = 34
+BUTTON_SPACING = 8
+PADDING = 12
+
+# 按钮颜色：(名称, 普通渐变, 悬停渐变, 按下渐变)
+BUTTONS = [
+    ("运行", ("#4CAF50", "#388E3C"), ("#66BB6A", "#43A047"), ("#388E3C", "#2E7D32")),
+    ("删除", ("#F44336", "#D32F2F"), ("#EF5350", "#E53935"), ("#D32F2F", "#C62828")),
+]
+RUN_BUTTON, DELETE_BUTTON = 0, 1
+
+
+class PluginListModel(QAbstractListModel):
+    """插件列表数据，增删时只通知变化的行"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.plugins = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.plugins)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.plugins):
+            return None
+        plugin_info = self.plugins[index.row()]
+        if role == Qt.DisplayRole:
+            name = plugin_info.get('name') or os.path.splitext(plugin_info.get('filename', ''))[0]
+            if plugin_info.get('version'):
+                name += f"  v{plugin_info['version']}"
+            return name
+        if role == Qt.ToolTipRole:
+            return plugin_info.get('path', '')
+        if role == PluginInfoRole:
+            return plugin_info
+        return None
+
+    def set_plugins(self, plugins):
+        self.beginResetModel()
+        self.plugins = list(plugins)
+        self.endResetModel()
+
+    def add_plugin(self, plugin_info):
+        row = len(self.plugins)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.plugins.append(plugin_info)
+        self.endInsertRows()
+
+    def remove_plugin(self, plugin_path):
+        """按路径删除插件，返回是否找到"""
+        for row, plugin_info in enumerate(self.plugins):
+            if plugin_info.get('path') == plugin_path:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.plugins[row]
+                self.endRemoveRows()
+                return True
+        return False
+
+
+class PluginItemDelegate(QStyledItemDelegate):
+    """直接绘制插件卡片（图标、名称、路径、运行和删除按钮），并处理按钮点击
+
+    代替每个插件一个 QWidget 的做法，列表只绘制可见的行。
+    """
+
+    run_clicked = pyqtSignal(object)
+    delete_clicked = pyqtSignal(object)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.hover = None  # (行号, 按钮) 鼠标所在的按钮
+        self.pressed = None  # (行号, 按钮) 按下的按钮
+        self.icon = QApplication.style().standardIcon(QStyle.SP_FileIcon)
+
+        self.name_font = QFont()
+        self.name_font.setPixelSize(18)
+        self.name_font.setBold(True)
+        self.path_font = QFont()
+        self.path_font.setPixelSize(12)
+        self.button_font = QFont()
+        self.button_font.setPixelSize(14)
+
+    def sizeHint(self, option, index):
+        # 卡片宽度跟随列表宽度，列表缩放时由 ResizeMode.Adjust 重新布局
+        width = self.view.viewport().width() - 2 * self.view.spacing()
+        return QSize(max(width, 0), ITEM_HEIGHT)
+
+    @staticmethod
+    def button_rects(rect):
+        """卡片右侧两个按钮的位置，按 BUTTONS 的顺序"""
+        top = rect.top() + (rect.height() - BUTTON_HEIGHT) // 2
+        delete_left = rect.right() - PADDING - BUTTON_WIDTH
+        run_left = delete_left - BUTTON_SPACING - BUTTON_WIDTH
+        return [
+            QRect(run_left, top, BUTTON_WIDTH, BUTTON_HEIGHT),
+            QRect(delete_left, top, BUTTON_WIDTH, BUTTON_HEIGHT),
+        ]
+
+    def paint(self, painter, option, index):
+        plugin_info = index.data(PluginInfoRole) or {}
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # 卡片背景
+        card = QPainterPath()
+        card.addRoundedRect(QRectF(rect.adjusted(0, 0, -1, -1)), 6, 6)
+        painter.fillPath(card, QColor("#ffffff"))
+
+        # 图标
+        icon_rect = QRect(rect.left() + PADDING, rect.top() + (rect.height() - ICON_SIZE) // 2, ICON_SIZE, ICON_SIZE)
+        self.icon.paint(painter, icon_rect)
+
+        # 名称和路径
+        buttons = self.button_rects(rect)
+        text_left = icon_rect.right() + PADDING
+        text_width = max(0, buttons[0].left() - PADDING - text_left)
+        name_rect = QRect(text_left, rect.top() + PADDING, text_width, 28)
+        path_rect = QRect(text_left, name_rect.bottom() + 4, text_width, rect.bottom() - name_rect.bottom() - PADDING)
+
+        painter.setFont(self.name_font)
+        painter.setPen(QColor("#2c3e50"))
+        name = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole) or "", Qt.ElideRight, text_width)
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        path = plugin_info.get('path', '')
+        if plugin_info.get('type') == PLUGIN_TYPE:
+            path = f"Python插件 · {path}"
+        painter.setFont(self.path_font)
+        painter.setPen(QColor("#7f8c8d"))
+        path = painter.fontMetrics().elidedText(path, Qt.ElideMiddle, text_width)
+        painter.drawText(path_rect, Qt.AlignLeft | Qt.AlignTop, path)
+
+        # 按钮
+        painter.setFont(self.button_font)
+        for button, button_rect in enumerate(buttons):
+            label, normal, hover, pressed = BUTTONS[button]
+            colors = normal
+            if self.pressed == (index.row(), button):
+                colors = pressed
+            elif self.hover == (index.row(), button):
+                colors = hover
+            gradient = QLinearGradient(0, button_rect.top(), 0, button_rect.bottom())
+            gradient.setColorAt(0, QColor(colors[0]))
+            gradient.setColorAt(1, QColor(colors[1]))
+            button_path = QPainterPath()
+            button_path.addRoundedRect(QRectF(button_rect), 4, 4)
+            painter.fillPath(button_path, gradient)
+            painter.setPen(QColor("white"))
+            painter.drawText(button_rect, Qt.AlignCenter, label)
+
+        painter.restore()
+
+    def button_at(self, rect, pos):
+        for button, button_rect in enumerate(self.button_rects(rect)):
+            if button_rect.contains(pos):
+                return button
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        """按钮的悬停、按下和点击"""
+        event_type = event.type()
+        if event_type not in (QEvent.MouseMove, QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+
+        button = self.button_at(option.rect, event.pos())
+        target = (index.row(), button) if button is not None else None
+
+        if event_type == QEvent.MouseMove:
+            if target != self.hover:
+                self.hover = target
+                self.view.viewport().update()
+            return False
+
+        if event.button() != Qt.LeftButton:
+            return False
+
+        if event_type == QEvent.MouseButtonPress:
+            self.pressed = target
+            self.view.viewport().update()
+            return target is not None
+
+        clicked = target is not None and target == self.pressed
+        self.pressed = None
+        self.view.viewport().update()
+        if not clicked:
+            return False
+        plugin_info = index.data(PluginInfoRole)
+        if button == RUN_BUTTON:
+            self.run_clicked.emit(plugin_info)
+        else:
+            self.delete_clicked.emit(plugin_info)
+        return True
+
+    def clear_hover(self):
+        """鼠标离开列表时清除悬停效果"""
+        if self.hover is not None or self.pressed is not None:
+            self.hover = None
+            self.pressed = None
+            self.view.viewport().update()
+
+
+class PluginListView(QListView):
+    """插件列表，所有行高度相同，只布局和绘制可见的行"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.delegate = PluginItemDelegate(self)
+        self.setItemDelegate(self.delegate)
+
+    def leaveEvent(self, event):
+        self.delegate.clear_hover()
+        super().leaveEvent(event)
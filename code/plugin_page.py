@@ -1,134 +1,30 @@
 import logging
-import json
 import os
-import subprocess
 import ctypes
 import sys
-from PyQt5.QtCore import Qt, QSize
+import time
+from PyQt5.QtCore import Qt, QThreadPool
 from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QPixmap
 from PyQt5.QtWidgets import (
-    QHBoxLayout, QPushButton, QListWidgetItem, QWidget, QFileDialog, QTextEdit,
-    QListWidget, QLabel, QVBoxLayout, QProgressDialog, QMessageBox, QFrame,
-    QScrollArea, QSplitter, QApplication, QStyle
+    QHBoxLayout, QPushButton, QWidget, QFileDialog,
+    QLabel, QVBoxLayout, QProgressDialog, QMessageBox, QFrame,
+    QScrollArea, QSplitter, QApplication, QStyle, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
 )
-
-
-class PluginItem(QWidget):
-    """自定义插件列表项组件"""
-
-    def __init__(self, plugin_info, parent=None, run_callback=None, delete_callback=None):
-        super().__init__(parent)
-        self.plugin_info = plugin_info
-        self.run_callback = run_callback
-        self.delete_callback = delete_callback
-
-        self.init_ui()
-
-    def init_ui(self):
-        # 创建水平布局
-        layout = QHBoxLayout()
-
-        # 创建左侧图标
-        icon_label = QLabel()
-        icon = QApplication.style().standardIcon(QStyle.SP_FileIcon)
-        pixmap = icon.pixmap(QSize(48, 48))
-        icon_label.setPixmap(pixmap)
-        icon_label.setFixedSize(48, 48)
-        layout.addWidget(icon_label)
-
-        # 创建中间信息部分（垂直布局）
-        info_layout = QVBoxLayout()
-
-        # 插件名称（大字体，粗体）
-        filename = self.plugin_info.get('filename', '')
-        name_label = QLabel(os.path.splitext(filename)[0])
-        name_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #2c3e50;")
-        info_layout.addWidget(name_label)
-
-        # 插件路径（小字体，灰色）
-        path_label = QLabel(self.plugin_info.get('path', ''))
-        path_label.setStyleSheet("font-size: 12px; color: #7f8c8d;")
-        path_label.setWordWrap(True)
-        info_layout.addWidget(path_label)
-
-        # 将信息布局添加到主布局
-        layout.addLayout(info_layout, 1)  # 占据所有可用空间
-
-        # 创建右侧按钮区域
-        buttons_layout = QHBoxLayout()
-
-        # 运行按钮 - 使用渐变背景
-        self.run_btn = QPushButton("运行")
-        self.run_btn.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #4CAF50, stop:1 #388E3C);
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 4px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #66BB6A, stop:1 #43A047);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #388E3C, stop:1 #2E7D32);
-            }
-        """)
-        self.run_btn.clicked.connect(self.on_run)
-        buttons_layout.addWidget(self.run_btn)
-
-        # 删除按钮 - 使用渐变背景
-        self.delete_btn = QPushButton("删除")
-        self.delete_btn.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #F44336, stop:1 #D32F2F);
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                font-size: 14px;
-                border-radius: 4px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #EF5350, stop:1 #E53935);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #D32F2F, stop:1 #C62828);
-            }
-        """)
-        self.delete_btn.clicked.connect(self.on_delete)
-        buttons_layout.addWidget(self.delete_btn)
-
-        layout.addLayout(buttons_layout)
-
-        # 应用主布局到组件
-        self.setLayout(layout)
-
-        # 设置组件样式
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #ffffff;
-                border-radius: 6px;
-                padding: 10px;
-            }
-        """)
-
-        # 设置固定高度
-        self.setMinimumHeight(90)
-
-    def on_run(self):
-        if self.run_callback:
-            self.run_callback(self.plugin_info)
-
-    def on_delete(self):
-        if self.delete_callback:
-            self.delete_callback(self.plugin_info)
+from metrics import metrics
+from plugin_registry import PluginRegistry, PluginRegistryError
+from plugin_discovery import PluginIndex
+from run_history import RunHistory, ProcessMonitor, data_hash
+from result_cache import ResultCache, CacheTask
+from log_view import LogView
+from plugin_list import PluginListModel, PluginListView
+from columnar_export import write_columnar
+from plugin_scheduler import PluginScheduler, RUNNING, DONE, FAILED, CANCELLED
+from python_plugins import PLUGIN_TYPE, TableView, discover_python_plugins
 
 
 class PluginPage(QWidget):
-    def __init__(self, main_page=None, stacked_widget=None):
+    def __init__(self, main_page=None, stacked_widget=None, data_source=None):
         super().__init__()
 
         # 设置日志配置
@@ -143,10 +39,41 @@ class PluginPage(QWidget):
 
         self.main_page = main_page  # 用于返回主页面
         self.stacked_widget = stacked_widget  # 传递 stacked_widget
-        self.loaded_plugins = []  # 内存中缓存插件数据
+        self.registry = PluginRegistry(self.plugin_data_file)  # 已添加的插件，读写 plugins.json
+        self.loaded_plugins = []  # 当前显示的已添加插件
+        self.python_plugins = []  # 从 extension 目录自动发现的Python插件
+        self.extension_plugins = []  # 从 extension 目录自动发现的外部程序插件
+
+        # 提供表格数据的对象（主窗口），需实现 table_columns / table_options / apply_plugin_columns
+        self.data_source = data_source
+
+        # 插件的输入输出目录（与主程序 output_to_excel 使用的 input 目录一致）
+        self.data_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+        # 插件任务调度器：未声明输出目录的插件都视为写入 input/word_data 和 output，依次运行
+        self.scheduler = PluginScheduler(
+            default_outputs=[os.path.join(self.data_root, "input", "word_data"), os.path.join(self.data_root, "output")],
+            parent=self
+        )
+        self.scheduler.job_added.connect(self.on_job_added)
+        self.scheduler.job_changed.connect(self.on_job_changed)
+        self.scheduler.job_output.connect(self.on_job_output)
+        self.job_rows = {}  # 任务ID -> 任务表格行号
+        self.monitors = {}  # 任务ID -> 进程资源采样
+        self.result_cache = ResultCache(os.path.join(self.app_path, "plugin_cache"))
+        self.cache_keys = {}  # 任务ID -> 结果缓存键
+        self.cache_tasks = set()  # 线程池中正在保存或恢复的缓存任务，保持引用直到完成
+
+        # 插件运行历史（耗时、资源占用、输入数据哈希）
+        try:
+            self.history = RunHistory(os.path.join(self.app_path, "plugin_history.db"))
+        except Exception as e:
+            logging.error(f"打开插件运行历史失败: {e}")
+            self.history = None
 
         # 确保extension文件夹存在
         self.extension_path = self.ensure_extension_folder()
+        self.plugin_index = PluginIndex(self.extension_path, os.path.join(self.app_path, "plugin_index.json"))
 
         self.init_plugin_page()
 
@@ -191,9 +118,9 @@ class PluginPage(QWidget):
         elif level == "warning":
             logging.warning(message)
 
-        # 在UI中显示
+        # 在UI中显示（批量刷新，不逐行重绘）
         if hasattr(self, 'log_area'):
-            self.log_area.append(message)
+            self.log_area.append(message, level)
 
     def init_plugin_page(self):
         """初始化插件页内容"""
@@ -206,7 +133,7 @@ class PluginPage(QWidget):
             QLabel {
                 color: #2c3e50;
             }
-            QTextEdit {
+            QTextEdit, QPlainTextEdit {
                 background-color: #ffffff;
                 border: 1px solid #e0e0e0;
                 border-radius: 4px;
@@ -291,6 +218,14 @@ class PluginPage(QWidget):
         self.add_plugin_button.clicked.connect(self.add_plugin)
         top_layout.addWidget(self.add_plugin_button)
 
+        # 创建 "刷新" 按钮，重新扫描 extension 文件夹
+        self.rescan_button = QPushButton(" 刷新")
+        self.rescan_button.setIcon(QApplication.style().standardIcon(QStyle.SP_BrowserReload))
+        self.rescan_button.setToolTip("重新扫描 extension 文件夹中的插件")
+        self.rescan_button.setStyleSheet(self.add_plugin_button.styleSheet().replace("min-width: 130px", "min-width: 80px"))
+        self.rescan_button.clicked.connect(self.load_plugins)
+        top_layout.addWidget(self.rescan_button)
+
         main_layout.addLayout(top_layout)
 
         # 添加分隔线
@@ -308,19 +243,19 @@ class PluginPage(QWidget):
         info_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #34495e; margin: 5px 0;")
         plugin_section.addWidget(info_label)
 
-        # 创建插件列表 - 使用QListWidget
-        self.plugin_list = QListWidget()
+        # 创建插件列表 - 由委托直接绘制每个插件，不为每个插件创建控件
+        self.plugin_model = PluginListModel(self)
+        self.plugin_list = PluginListView()
+        self.plugin_list.setModel(self.plugin_model)
         self.plugin_list.setSpacing(10)  # 设置列表项之间的间距
         self.plugin_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: transparent;
                 border: none;
             }
-            QListWidget::item {
-                background-color: transparent;
-                padding: 5px 0;
-            }
         """)
+        self.plugin_list.delegate.run_clicked.connect(self.run_plugin)
+        self.plugin_list.delegate.delete_clicked.connect(self.delete_plugin)
         plugin_section.addWidget(self.plugin_list)
 
         # 空状态提示
@@ -339,6 +274,63 @@ class PluginPage(QWidget):
 
         main_layout.addLayout(plugin_section, 1)  # 插件列表占用更多垂直空间
 
+        # 任务队列区域 - 显示排队、运行中和历史任务
+        job_section = QVBoxLayout()
+
+        job_header = QHBoxLayout()
+        job_label = QLabel("任务队列:")
+        job_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #34495e; margin: 5px 0;")
+        job_header.addWidget(job_label)
+        job_header.addStretch(1)
+
+        self.cancel_job_button = QPushButton("取消任务")
+        self.cancel_job_button.clicked.connect(self.cancel_selected_job)
+        job_header.addWidget(self.cancel_job_button)
+
+        self.kill_job_button = QPushButton("强制结束")
+        self.kill_job_button.clicked.connect(self.kill_selected_job)
+        job_header.addWidget(self.kill_job_button)
+
+        self.clear_jobs_button = QPushButton("清除历史")
+        self.clear_jobs_button.clicked.connect(self.clear_job_history)
+        job_header.addWidget(self.clear_jobs_button)
+
+        for button in (self.cancel_job_button, self.kill_job_button, self.clear_jobs_button):
+            button.setStyleSheet("""
+                QPushButton {
+                    background-color: #95a5a6;
+                    color: white;
+                    border: none;
+                    padding: 4px 12px;
+                    font-size: 13px;
+                    border-radius: 4px;
+                }
+                QPushButton:hover {
+                    background-color: #7f8c8d;
+                }
+            """)
+        job_section.addLayout(job_header)
+
+        self.job_table = QTableWidget(0, 5)
+        self.job_table.setHorizontalHeaderLabels(["插件", "状态", "提交时间", "耗时(秒)", "退出码"])
+        self.job_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.job_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.job_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #ffffff;
+                border: 1px solid #e0e0e0;
+                border-radius: 4px;
+                font-size: 13px;
+                max-height: 150px;
+            }
+        """)
+        job_section.addWidget(self.job_table)
+
+        main_layout.addLayout(job_section)
+
         # 创建日志区域 - 带标题和清晰边框
         log_section = QVBoxLayout()
 
@@ -347,11 +339,10 @@ class PluginPage(QWidget):
         log_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #34495e; margin: 5px 0;")
         log_section.addWidget(log_label)
 
-        # 创建一个带有样式的文本编辑框用于显示日志信息
-        self.log_area = QTextEdit()
-        self.log_area.setReadOnly(True)
-        self.log_area.setStyleSheet("""
-            QTextEdit {
+        # 日志显示区域：有行数上限，定时批量追加，可筛选和搜索
+        self.log_area = LogView()
+        self.log_area.text_area.setStyleSheet("""
+            QPlainTextEdit {
                 background-color: #ffffff;
                 border: 1px solid #e0e0e0;
                 border-radius: 4px;
@@ -370,7 +361,8 @@ class PluginPage(QWidget):
         main_layout.setStretch(0, 0)  # 顶部区域不伸缩
         main_layout.setStretch(1, 0)  # 分隔线不伸缩
         main_layout.setStretch(2, 3)  # 插件列表占用更多空间
-        main_layout.setStretch(3, 1)  # 日志区域占用较少空间
+        main_layout.setStretch(3, 1)  # 任务队列占用较少空间
+        main_layout.setStretch(4, 1)  # 日志区域占用较少空间
 
         # 加载已保存的插件
         self.load_plugins()
@@ -380,7 +372,7 @@ class PluginPage(QWidget):
 
     def update_empty_state(self):
         """根据是否有插件来更新空状态显示"""
-        if self.plugin_list.count() == 0:
+        if self.plugin_model.rowCount() == 0:
             self.empty_label.show()
         else:
             self.empty_label.hide()
@@ -415,13 +407,10 @@ class PluginPage(QWidget):
         # 获取文件的名称（不包含路径）
         exe_name = os.path.basename(file_path)
 
-        # 检查是否已存在相同路径的插件
-        existing_plugins = self.load_plugins_data()
-        for plugin in existing_plugins:
-            if plugin.get('path') == file_path:
-                self.log_message(f"插件已存在：{exe_name}")
-                QMessageBox.information(self, "插件已存在", f"插件 '{exe_name}' 已在列表中。")
-                return
+        # extension 文件夹中的插件已自动加载，无需添加
+        if any(os.path.normcase(p['path']) == os.path.normcase(os.path.abspath(file_path)) for p in self.extension_plugins):
+            QMessageBox.information(self, "插件已存在", f"插件 '{exe_name}' 位于 extension 文件夹，已自动加载。")
+            return
 
         # 添加插件信息
         plugin_info = {
@@ -430,8 +419,18 @@ class PluginPage(QWidget):
             'filename': exe_name
         }
 
-        # 保存到配置文件
-        self.save_plugin(plugin_info)
+        # 保存到配置文件，已存在相同路径的插件时不重复添加
+        try:
+            added = self.registry.add(plugin_info)
+        except (PluginRegistryError, OSError) as e:
+            self.log_message(f"保存插件信息失败：{str(e)}", level="error")
+            QMessageBox.critical(self, "错误", f"保存插件信息时发生错误：{str(e)}")
+            return
+        if not added:
+            self.log_message(f"插件已存在：{exe_name}")
+            QMessageBox.information(self, "插件已存在", f"插件 '{exe_name}' 已在列表中。")
+            return
+        self.loaded_plugins.append(plugin_info)
 
         # 更新插件列表显示
         self.add_plugin_to_list(plugin_info)
@@ -443,98 +442,301 @@ class PluginPage(QWidget):
 
     def add_plugin_to_list(self, plugin_info):
         """将插件添加到插件列表"""
-        # 创建自定义列表项组件
-        plugin_item = PluginItem(
-            plugin_info,
-            self,
-            run_callback=self.run_plugin,
-            delete_callback=self.delete_plugin
-        )
-
-        # 创建列表项
-        item = QListWidgetItem(self.plugin_list)
-
-        # 设置项目大小
-        item.setSizeHint(plugin_item.sizeHint())
-
-        # 将自定义组件添加到列表项
-        self.plugin_list.addItem(item)
-        self.plugin_list.setItemWidget(item, plugin_item)
+        self.plugin_model.add_plugin(plugin_info)
 
     def run_plugin(self, plugin_info):
-        """运行选中的插件（.exe文件）"""
+        """将插件加入任务队列，由调度器按并发上限和输出目录冲突情况启动"""
+        if plugin_info.get('type') == PLUGIN_TYPE:
+            self.run_python_plugin(plugin_info)
+            return
+
         plugin_path = plugin_info.get('path', '')
         if not os.path.exists(plugin_path):
             self.log_message(f"插件文件不存在：{plugin_path}", level="error")
             QMessageBox.warning(self, "文件不存在", f"插件文件 '{plugin_path}' 不存在或无法访问。")
             return
 
-        self.log_message(f"正在运行插件: {plugin_path}")
-
-        # 显示进度对话框
-        progress_dialog = QProgressDialog("正在启动插件...", "取消", 0, 100, self)
-        progress_dialog.setWindowModality(Qt.WindowModal)
-        progress_dialog.setValue(0)
-        progress_dialog.setStyleSheet("""
-            QProgressDialog {
-                background-color: #ffffff;
-                border-radius: 5px;
-            }
-            QProgressBar {
-                border: 1px solid #e0e0e0;
-                border-radius: 3px;
-                background-color: #f5f5f5;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #3498db;
-                width: 10px;
-                margin: 0.5px;
-            }
-        """)
-        progress_dialog.show()
-
+        environment = self.prepare_table_handoff()
+        cache_key = self.result_cache.key_for(plugin_info, environment.get("HSGUI_TABLE_HASH"),
+                                              input_files=[environment["HSGUI_TABLE_XLSX"]])
+        outputs = self.scheduler.outputs_for(plugin_info)
+        entry = self.result_cache.lookup(cache_key, outputs)
+        # 有任务正在写同一输出目录时不恢复，按正常流程排队
+        if entry is not None and not self.scheduler.outputs_busy(outputs):
+            self.restore_cached_result(plugin_info, cache_key, entry, environment)
+            return
+        self.submit_plugin_job(plugin_info, cache_key, environment)
+
+    def submit_plugin_job(self, plugin_info, cache_key, environment):
+        """把外部插件交给调度器运行，成功后按 cache_key 保存结果"""
+        job = self.scheduler.submit(plugin_info, environment=environment)
+        if cache_key:
+            self.cache_keys[job.id] = cache_key
+        if job.state != RUNNING:
+            self.log_message(f"插件已加入队列：{os.path.basename(plugin_info.get('path', ''))}（任务 #{job.id}）")
+
+    def start_cache_task(self, task, on_finished, on_failed):
+        """在线程池中执行缓存任务，完成前保持引用"""
+        task.setAutoDelete(False)
+        self.cache_tasks.add(task)
+
+        def done(callback, value):
+            self.cache_tasks.discard(task)
+            callback(value)
+
+        task.signals.finished.connect(lambda result: done(on_finished, result))
+        task.signals.failed.connect(lambda error: done(on_failed, error))
+        QThreadPool.globalInstance().start(task)
+
+    def prepare_table_handoff(self):
+        """把当前表格写入列式文件，返回告知插件文件位置的环境变量
+
+        每个任务使用单独的文件，避免排队中的任务读到之后修改的数据，任务结束后删除。
+        写入失败时只传 data.xlsx 的路径，插件仍可按旧方式读取。
+        """
+        environment = {"HSGUI_TABLE_XLSX": os.path.join(self.data_root, "input", "data.xlsx")}
+        if self.data_source is None:
+            return environment
+
+        handoff_dir = os.path.join(self.data_root, "input", "handoff")
         try:
-            # 获取插件所在目录
-            plugin_dir = os.path.dirname(os.path.abspath(plugin_path))
-            self.log_message(f"插件工作目录: {plugin_dir}")
-
-            # 使用 subprocess.Popen 运行插件，并设置工作目录为插件所在目录
-            process = subprocess.Popen(
-                plugin_path,
-                cwd=plugin_dir,  # 设置工作目录为插件所在目录
-                shell=True,  # 使用shell运行，解决某些权限问题
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            os.makedirs(handoff_dir, exist_ok=True)
+            headers, columns = self.data_source.export_columns()
+            environment["HSGUI_TABLE_HASH"] = data_hash(headers, columns)
+            environment["HSGUI_TABLE_ROWS"] = len(columns[0]) if columns else 0
+            base_path = os.path.join(handoff_dir, f"table_{os.getpid()}_{time.time_ns()}")
+            path, table_format = write_columnar(base_path, headers, columns)
+        except Exception as e:
+            self.log_message(f"写入插件数据文件失败，插件将只能读取 data.xlsx: {e}", level="warning")
+            return environment
+
+        environment["HSGUI_TABLE_PATH"] = path
+        environment["HSGUI_TABLE_FORMAT"] = table_format
+        return environment
+
+    def restore_cached_result(self, plugin_info, cache_key, entry, environment):
+        """输入与之前某次运行完全相同时，在线程池中恢复那次生成的文件，失败时正常运行插件
+
+        恢复期间占用插件的输出目录，调度器不会启动写这些目录的任务。
+        """
+        outputs = self.scheduler.reserve(self.scheduler.outputs_for(plugin_info))
+        started_at = time.time()
+        start = time.perf_counter()
+
+        def finished(restored):
+            self.scheduler.release(outputs)
+            self.on_cache_restored(plugin_info, environment, restored, started_at, time.perf_counter() - start)
+
+        def failed(error):
+            self.scheduler.release(outputs)
+            # 数据文件保留给接下来正常运行的任务使用
+            self.log_message(f"从缓存恢复插件结果失败，将重新运行: {error}", level="warning")
+            self.submit_plugin_job(plugin_info, cache_key, environment)
+
+        self.start_cache_task(CacheTask(self.result_cache.restore, cache_key, entry, outputs), finished, failed)
+
+    def on_cache_restored(self, plugin_info, environment, restored, started_at, duration):
+        """从缓存恢复完成：删除数据文件，记录日志和运行历史"""
+        table_path = environment.get("HSGUI_TABLE_PATH")
+        if table_path and os.path.exists(table_path):
+            try:
+                os.remove(table_path)
+            except OSError as e:
+                logging.warning(f"删除插件数据文件失败: {table_path} - {e}")
+
+        plugin_name = plugin_info.get('name', '')
+        self.log_message(f"插件 {plugin_name} 的输入未变化，已从缓存恢复 {len(restored)} 个文件，耗时 {duration:.3f} 秒")
+        metrics.add(f"plugin:{plugin_name}", started_at, duration * 1000, rows=environment.get("HSGUI_TABLE_ROWS"))
+        if self.history is not None:
+            self.history.record(
+                plugin=plugin_name, plugin_hash=plugin_info.get('hash'), started_at=started_at,
+                duration=duration, exit_code=0, state="cached",
+                input_hash=environment.get("HSGUI_TABLE_HASH"), rows=environment.get("HSGUI_TABLE_ROWS"),
             )
 
-            # 设置进度对话框为50%表示启动成功
-            progress_dialog.setValue(50)
+    def store_cached_result(self, job):
+        """运行成功后在线程池中把本次生成的文件存入缓存，保存期间占用输出目录"""
+        cache_key = self.cache_keys.pop(job.id, None)
+        if cache_key is None or job.state != DONE:
+            return
+        outputs = self.scheduler.reserve(job.outputs)
+        name = job.name
+
+        def finished(entry):
+            self.scheduler.release(outputs)
+            if entry is not None:
+                self.log_message(f"已缓存插件 {name} 生成的 {len(entry['files'])} 个文件")
 
-            # 等待进程完成，最多等待1秒以避免界面卡死
+        def failed(error):
+            self.scheduler.release(outputs)
+            self.log_message(f"保存插件结果缓存失败: {error}", level="warning")
+
+        self.start_cache_task(CacheTask(self.result_cache.store, cache_key, outputs), finished, failed)
+
+    def remove_table_handoff(self, job):
+        """删除任务使用的列式数据文件"""
+        path = job.process_options.get("environment", {}).get("HSGUI_TABLE_PATH")
+        if path and os.path.exists(path):
             try:
-                stdout, stderr = process.communicate(timeout=1)
-                progress_dialog.setValue(100)
-                self.log_message(f"插件启动成功：{os.path.basename(plugin_path)}")
-                if stdout:
-                    self.log_message(f"输出：\n{stdout}")
-            except subprocess.TimeoutExpired:
-                # 如果超时，说明插件可能是长时间运行的程序
-                progress_dialog.setValue(100)
-                self.log_message(f"插件正在运行中：{os.path.basename(plugin_path)}")
-                # 不终止进程，让它继续在后台运行
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"删除插件数据文件失败: {path} - {e}")
+
+    def run_python_plugin(self, plugin_info):
+        """Python插件同样交给调度器排队，直接传入内存中的表格数据"""
+        if self.data_source is None:
+            self.log_message("没有可用的表格数据，无法运行Python插件", level="error")
+            return
 
-        except Exception as e:
-            progress_dialog.setValue(100)
-            self.log_message(f"运行插件时出错: {str(e)}", level="error")
-            QMessageBox.critical(self, "运行错误", f"运行插件时发生错误：{str(e)}")
+        headers, columns = self.data_source.table_columns()
+        table = TableView(headers, columns)
+        environment = {"HSGUI_TABLE_HASH": data_hash(headers, columns), "HSGUI_TABLE_ROWS": len(table)}
+        job = self.scheduler.submit(plugin_info, table=table, options=self.data_source.table_options(),
+                                    output_dir=os.path.join(self.data_root, "output"), environment=environment)
+        if job.state != RUNNING:
+            self.log_message(f"插件已加入队列：{job.name}（任务 #{job.id}）")
+
+    def apply_python_result(self, job):
+        """Python插件运行完成：返回的列写回表格，生成的文件写入日志"""
+        if job.result is None:
+            return
+        columns, files = job.result
+        if columns:
+            self.data_source.apply_plugin_columns(columns)
+            self.log_message(f"插件 {job.name} 更新了表格列：{', '.join(columns)}")
+        for file_path in files:
+            self.log_message(f"插件 {job.name} 生成文件：{file_path}")
+
+    def on_job_added(self, job):
+        """任务表格中新增一行"""
+        row = self.job_table.rowCount()
+        self.job_table.insertRow(row)
+        self.job_rows[job.id] = row
+        self.update_job_row(job)
+
+    def on_job_changed(self, job):
+        """任务状态变化：更新表格并记录日志"""
+        self.update_job_row(job)
+        # 内置Python插件共用模块文件，用显示名称区分
+        if job.plugin_info.get('type') == PLUGIN_TYPE:
+            plugin_name = job.name
+        else:
+            plugin_name = os.path.basename(job.plugin_info.get('path', ''))
+
+        if job.state == RUNNING:
+            job.process.started.connect(lambda: self.start_monitor(job))
+            self.log_message(f"正在运行插件: {job.plugin_info.get('path', '')}（任务 #{job.id}）")
+            self.log_message(f"插件工作目录: {job.process.working_dir}")
+        elif job.state == DONE:
+            if job.plugin_info.get('type') == PLUGIN_TYPE:
+                self.apply_python_result(job)
+            self.log_message(f"插件运行完成：{plugin_name}，退出码 0，耗时 {job.duration:.2f} 秒")
+        elif job.state == FAILED:
+            if job.error:
+                self.log_message(f"运行插件时出错: {job.error}", level="error")
+                QMessageBox.critical(self, "运行错误", f"运行插件 '{plugin_name}' 时发生错误：{job.error}")
+            else:
+                self.log_message(f"插件运行失败：{plugin_name}，退出码 {job.exit_code}，耗时 {job.duration:.2f} 秒", level="error")
+        elif job.state == CANCELLED:
+            self.log_message(f"插件任务已取消：{plugin_name}（任务 #{job.id}）", level="warning")
+
+        if job.is_finished():
+            self.remove_table_handoff(job)
+            self.record_job_run(job)
+            self.store_cached_result(job)
+        if job.is_finished() and job.started_at:
+            metrics.add(f"plugin:{plugin_name}", job.started_at, (job.duration or 0) * 1000, ok=job.state == DONE)
+
+    def start_monitor(self, job):
+        """插件进程启动后开始采样内存和读写量"""
+        if job.process is not None:
+            # worker 模式的常驻进程在多次运行间共用，只统计本次运行期间的变化
+            shared = bool(job.plugin_info.get('worker'))
+            self.monitors[job.id] = ProcessMonitor(job.process.pid(), shared=shared, parent=self)
+
+    def record_job_run(self, job):
+        """把结束的任务写入运行历史"""
+        monitor = self.monitors.pop(job.id, None)
+        usage = {}
+        if monitor is not None:
+            monitor.stop()
+            usage = monitor.result()
+            monitor.deleteLater()
+        if self.history is None or not job.started_at:
+            return
+        environment = job.process_options.get("environment", {})
+        self.history.record(
+            plugin=job.name,
+            plugin_hash=job.plugin_info.get('hash'),
+            started_at=job.started_at,
+            duration=job.duration,
+            exit_code=job.exit_code,
+            state=job.state,
+            input_hash=environment.get("HSGUI_TABLE_HASH"),
+            rows=environment.get("HSGUI_TABLE_ROWS"),
+            **usage
+        )
+
+    def on_job_output(self, job, line, stream):
+        """显示插件的一行输出"""
+        if not line.strip():
+            return
+        self.log_message(f"[{job.name}] {line}", level="warning" if stream == "stderr" else "info")
+
+    def update_job_row(self, job):
+        row = self.job_rows.get(job.id)
+        if row is None:
+            return
+        submitted = time.strftime("%H:%M:%S", time.localtime(job.submitted_at))
+        duration = f"{job.duration:.2f}" if job.duration is not None else ""
+        exit_code = "" if job.exit_code is None else str(job.exit_code)
+        for col, value in enumerate([job.name, job.state_label, submitted, duration, exit_code]):
+            item = QTableWidgetItem(value)
+            item.setData(Qt.UserRole, job.id)
+            self.job_table.setItem(row, col, item)
+
+    def selected_job(self):
+        """任务表格中选中的任务"""
+        row = self.job_table.currentRow()
+        if row < 0:
+            return None
+        item = self.job_table.item(row, 0)
+        job_id = item.data(Qt.UserRole) if item else None
+        for job in self.scheduler.jobs():
+            if job.id == job_id:
+                return job
+        return None
+
+    def cancel_selected_job(self):
+        job = self.selected_job()
+        if job is not None and not job.is_finished():
+            self.scheduler.cancel(job)
+
+    def kill_selected_job(self):
+        job = self.selected_job()
+        if job is not None and job.state == RUNNING:
+            self.scheduler.kill(job)
+
+    def clear_job_history(self):
+        """清除已结束的任务，只保留排队中和运行中的任务"""
+        self.scheduler.history.clear()
+        self.job_table.setRowCount(0)
+        self.job_rows = {}
+        for job in self.scheduler.jobs():
+            self.on_job_added(job)
 
     def delete_plugin(self, plugin_info):
         """从列表中删除插件（不删除实际文件）"""
         plugin_path = plugin_info.get('path', '')
         plugin_name = plugin_info.get('name', os.path.basename(plugin_path))
 
+        if plugin_info.get('type') == PLUGIN_TYPE or plugin_info.get('discovered'):
+            QMessageBox.information(
+                self, "自动发现的插件",
+                f"插件 '{plugin_name}' 是从 extension 文件夹自动加载的，\n删除或移走对应文件后即可移除。"
+            )
+            return
+
         self.log_message(f"准备删除插件: {plugin_name}")
 
         # 确认是否删除
@@ -549,23 +751,12 @@ class PluginPage(QWidget):
             return
 
         # 删除插件记录
-        plugins = self.load_plugins_data()
-        updated_plugins = [p for p in plugins if p.get('path') != plugin_path]
-
-        # 将更新后的插件列表保存回文件
         try:
-            with open(self.plugin_data_file, "w", encoding='utf-8') as f:
-                json.dump(updated_plugins, f, ensure_ascii=False, indent=4)
+            self.registry.remove(plugin_path)
+            self.loaded_plugins = self.registry.plugins()
 
-            # 更新内存缓存
-            self.loaded_plugins = updated_plugins
-
-            # 从UI中删除所有项并重新加载
-            self.plugin_list.clear()
-            for plugin in updated_plugins:
-                self.add_plugin_to_list(plugin)
-
-            # 更新空状态显示
+            # 只从列表中移除这一项
+            self.plugin_model.remove_plugin(plugin_path)
             self.update_empty_state()
 
             self.log_message(f"插件已从列表中删除: {plugin_name}")
@@ -574,101 +765,42 @@ class PluginPage(QWidget):
             self.log_message(f"删除插件时出错: {str(e)}", level="error")
             QMessageBox.critical(self, "错误", f"删除插件时发生错误：{str(e)}")
 
-    def save_plugin(self, plugin_info):
-        """保存插件信息到文件"""
-        plugins = self.load_plugins_data()  # 获取已保存的插件列表
-
-        # 检查是否已存在
-        for plugin in plugins:
-            if plugin.get('path') == plugin_info.get('path'):
-                return  # 已存在则不添加
-
-        plugins.append(plugin_info)  # 添加新的插件信息
-        self.loaded_plugins = plugins  # 更新内存缓存
-
-        # 将插件列表保存到 JSON 文件中
-        try:
-            with open(self.plugin_data_file, "w", encoding='utf-8') as f:
-                json.dump(plugins, f, ensure_ascii=False, indent=4)
-            self.log_message(f"插件信息已保存到：{self.plugin_data_file}")
-        except Exception as e:
-            self.log_message(f"保存插件信息失败：{str(e)}", level="error")
-
     def load_plugins(self):
         """加载插件并显示在插件列表中"""
         self.loaded_plugins = self.load_plugins_data()
+        self.python_plugins = discover_python_plugins(self.extension_path)
+        self.extension_plugins = self.plugin_index.scan()
+
+        self.refresh_plugin_list()
 
-        # 清空当前列表
-        self.plugin_list.clear()
+        self.log_message(
+            f"已加载 {len(self.loaded_plugins)} 个插件，自动发现 {len(self.extension_plugins)} 个插件、"
+            f"{len(self.python_plugins)} 个Python插件"
+        )
 
-        # 添加到UI
-        for plugin_info in self.loaded_plugins:
-            self.add_plugin_to_list(plugin_info)
+    def refresh_plugin_list(self):
+        """按当前数据重建插件列表，手动添加的插件与自动发现的重复时只显示自动发现的"""
+        discovered = {os.path.normcase(os.path.abspath(p['path'])) for p in self.extension_plugins}
+        added = [p for p in self.loaded_plugins if os.path.normcase(os.path.abspath(p.get('path', ''))) not in discovered]
+        self.plugin_model.set_plugins(added + self.extension_plugins + self.python_plugins)
 
         # 更新空状态显示
         self.update_empty_state()
 
-        self.log_message(f"已加载 {len(self.loaded_plugins)} 个插件")
-
     def load_plugins_data(self):
-        """从文件中加载已保存的插件信息"""
-        if self.loaded_plugins:  # 优先使用内存中的缓存数据
-            return self.loaded_plugins
-
-        if os.path.exists(self.plugin_data_file):
-            try:
-                with open(self.plugin_data_file, "r", encoding='utf-8') as f:
-                    try:
-                        file_content = f.read()
-                        self.log_message(f"读取插件数据文件，大小：{len(file_content)} 字节")
-
-                        if not file_content.strip():
-                            self.log_message("插件数据文件为空，使用空列表")
-                            return []
-
-                        plugins = json.loads(file_content)
-
-                        # 兼容旧格式（如果是字符串列表则转为对象列表）
-                        if plugins and isinstance(plugins[0], str):
-                            self.log_message("检测到旧格式的插件数据，正在转换...")
-                            new_plugins = []
-                            for path in plugins:
-                                new_plugins.append({
-                                    'name': os.path.splitext(os.path.basename(path))[0],
-                                    'path': path,
-                                    'filename': os.path.basename(path)
-                                })
-                            plugins = new_plugins
-
-                            # 保存转换后的格式
-                            with open(self.plugin_data_file, "w", encoding='utf-8') as fw:
-                                json.dump(plugins, fw, ensure_ascii=False, indent=4)
-
-                        self.loaded_plugins = plugins
-                        self.log_message(f"成功加载 {len(plugins)} 个插件信息")
-
-                    except json.JSONDecodeError as e:
-                        self.log_message(f"JSON 解码错误: {str(e)}", level="error")
-                        self.show_error_message("插件数据格式错误", "插件配置文件格式不正确，已恢复为默认状态。")
-                        self.loaded_plugins = []  # 清空插件列表
-                        # 重新保存一个空的插件列表
-                        with open(self.plugin_data_file, "w", encoding='utf-8') as fw:
-                            json.dump(self.loaded_plugins, fw, ensure_ascii=False)
-            except Exception as e:
-                self.log_message(f"加载插件数据时出错: {str(e)}", level="error")
-                self.loaded_plugins = []
-
-            return self.loaded_plugins
-        else:
-            self.log_message(f"插件数据文件不存在，将创建: {self.plugin_data_file}")
-            # 创建空文件
+        """从插件配置文件读取已添加的插件，文件未变化时直接使用缓存"""
+        try:
+            return self.registry.plugins()
+        except PluginRegistryError as e:
+            self.log_message(str(e), level="error")
+            self.show_error_message("插件数据格式错误", "插件配置文件格式不正确，已备份原文件并恢复为默认状态。")
             try:
-                with open(self.plugin_data_file, "w", encoding='utf-8') as f:
-                    json.dump([], f)
-            except Exception as e:
-                self.log_message(f"创建插件数据文件失败: {str(e)}", level="error")
-
-            return []  # 返回空列表
+                self.registry.reset()
+            except (PluginRegistryError, OSError) as reset_error:
+                self.log_message(f"重置插件配置文件失败: {reset_error}", level="error")
+        except OSError as e:
+            self.log_message(f"加载插件数据时出错: {str(e)}", level="error")
+        return []
 
     def show_error_message(self, title, message):
         """显示错误提示框"""
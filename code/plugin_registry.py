@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import logging
+import tempfile
+from contextlib import contextmanager
+
+
+def write_json_atomic(path, data):
+    """先写入同目录下的临时文件，再原子替换目标文件，写到一半时退出也不会损坏原文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + "_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class PluginRegistryError(Exception):
+    """插件配置文件无法读取或写入"""
+
+
+class PluginRegistry:
+    """已添加插件的列表（plugins.json）
+
+    读取结果按文件的修改时间和大小缓存，文件未变化时不重复解析；
+    写入先写临时文件再替换，避免写到一半时程序退出导致文件损坏；
+    修改时持有锁文件，并在锁内重新读取最新内容，两个同时运行的程序不会互相覆盖。
+    """
+
+    LOCK_TIMEOUT = 5  # 等待锁的最长秒数
+    STALE_LOCK_SECONDS = 30  # 超过这个时间的锁文件视为异常退出遗留
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._plugins = []
+        self._stamp = None  # 缓存对应的 (修改时间, 大小)，None 表示尚未读取
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (0, -1)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def plugins(self):
+        """返回插件列表的副本，文件有变化时重新读取"""
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self._plugins = self._read()
+            self._stamp = self._file_stamp()
+        return [dict(p) for p in self._plugins]
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding='utf-8') as f:
+            content = f.read()
+        if not content.strip():
+            return []
+        try:
+            plugins = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise PluginRegistryError(f"插件配置文件格式不正确: {e}") from e
+        if not isinstance(plugins, list):
+            raise PluginRegistryError("插件配置文件格式不正确: 应为插件列表")
+
+        logging.info(f"读取插件数据文件，大小：{len(content.encode('utf-8'))} 字节，共 {len(plugins)} 个插件")
+        # 兼容旧格式（字符串路径列表），转换后的格式在下次写入时保存
+        return [self._from_path(p) if isinstance(p, str) else p for p in plugins]
+
+    @staticmethod
+    def _from_path(path):
+        return {
+            'name': os.path.splitext(os.path.basename(path))[0],
+            'path': path,
+            'filename': os.path.basename(path)
+        }
+
+    def _write(self, plugins):
+        write_json_atomic(self.path, plugins)
+        self._plugins = plugins
+        self._stamp = self._file_stamp()
+
+    @contextmanager
+    def locked(self):
+        """持有锁文件期间，其他程序实例不能修改插件列表"""
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > self.STALE_LOCK_SECONDS:
+                        logging.warning(f"删除遗留的插件配置锁文件: {self.lock_path}")
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise PluginRegistryError("插件配置文件正被其他程序修改，请稍后再试")
+                time.sleep(0.05)
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            yield
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    def add(self, plugin_info):
+        """添加插件，已存在相同路径的插件时返回 False"""
+        with self.locked():
+            self._stamp = None  # 在锁内重新读取，合并其他实例的修改
+            plugins = self.plugins()
+            if any(p.get('path') == plugin_info.get('path') for p in plugins):
+                return False
+            plugins.append(dict(plugin_info))
+            self._write(plugins)
+        logging.info(f"插件信息已保存到：{self.path}")
+        return True
+
+    def remove(self, plugin_path):
+        """按路径删除插件，不存在时返回 False"""
+        with self.locked():
+            self._stamp = None
+            plugins = self.plugins()
+            remaining = [p for p in plugins if p.get('path') != plugin_path]
+            if len(remaining) == len(plugins):
+                return False
+            self._write(remaining)
+        return True
+
+    def reset(self):
+        """配置文件损坏时备份原文件并重置为空列表"""
+        with self.locked():
+            if os.path.exists(self.path):
+                backup_path = self.path + ".bak"
+                os.replace(self.path, backup_path)
+                logging.warning(f"已将损坏的插件配置文件备份为: {backup_path}")
+            self._write([])
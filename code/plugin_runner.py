@@ -0,0 +1,112 @@
+import os
+import time
+import locale
+from PyQt5.QtCore import QObject, QProcess, QProcessEnvironment, pyqtSignal
+
+
+class PluginProcess(QObject):
+    """基于 QProcess 的插件进程，逐行转发输出，不阻塞事件循环，也不经过shell"""
+
+    output = pyqtSignal(str, str)  # (行内容, "stdout"/"stderr")
+    started = pyqtSignal()
+    finished = pyqtSignal(int, float)  # (退出码, 耗时秒数)
+    failed = pyqtSignal(str)  # 无法启动时的错误信息
+
+    # 插件多为Windows下打包的程序，输出使用系统默认编码
+    ENCODING = locale.getpreferredencoding(False)
+
+    def __init__(self, plugin_path, arguments=None, working_dir=None, environment=None, stdout_encoding=None,
+                 parent=None):
+        super().__init__(parent)
+        self.plugin_path = plugin_path
+        self.arguments = list(arguments or [])
+        self.working_dir = working_dir or os.path.dirname(os.path.abspath(plugin_path))
+        self.environment = environment or {}
+
+        self.start_time = None
+        self.exit_code = None
+        self.duration = None
+        self._buffers = {"stdout": b"", "stderr": b""}
+        # 标准输出有固定协议（如 worker 模式的 UTF-8 JSON 行）时按指定编码解码
+        self._encodings = {"stdout": stdout_encoding or self.ENCODING, "stderr": self.ENCODING}
+
+        self.process = QProcess(self)
+        self.process.setWorkingDirectory(self.working_dir)
+        self.process.readyReadStandardOutput.connect(lambda: self._read("stdout"))
+        self.process.readyReadStandardError.connect(lambda: self._read("stderr"))
+        self.process.started.connect(self.started)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+
+    def start(self):
+        """启动插件进程，立即返回"""
+        if self.environment:
+            env = QProcessEnvironment.systemEnvironment()
+            for key, value in self.environment.items():
+                env.insert(key, str(value))
+            self.process.setProcessEnvironment(env)
+
+        self.start_time = time.time()
+        self._start_counter = time.perf_counter()
+        self.process.start(self.plugin_path, self.arguments)
+
+    def is_running(self):
+        return self.process.state() != QProcess.NotRunning
+
+    def terminate(self):
+        """请求插件正常退出"""
+        if self.is_running():
+            self.process.terminate()
+
+    def kill(self):
+        """强制结束插件进程"""
+        if self.is_running():
+            self.process.kill()
+
+    def pid(self):
+        return int(self.process.processId()) if self.is_running() else None
+
+    def write_line(self, text):
+        """向插件的标准输入写入一行（worker 模式使用）"""
+        self.process.write((text + "\n").encode("utf-8"))
+
+    def close_input(self):
+        self.process.closeWriteChannel()
+
+    def _read(self, stream):
+        """读取新输出并按行转发，不完整的行留到下次"""
+        if stream == "stdout":
+            data = bytes(self.process.readAllStandardOutput())
+        else:
+            data = bytes(self.process.readAllStandardError())
+
+        buffer = self._buffers[stream] + data
+        *lines, self._buffers[stream] = buffer.split(b"\n")
+        for line in lines:
+            self.output.emit(self._decode(line, stream), stream)
+
+    def _flush(self):
+        for stream, rest in self._buffers.items():
+            if rest:
+                self.output.emit(self._decode(rest, stream), stream)
+            self._buffers[stream] = b""
+
+    def _decode(self, line, stream):
+        return line.rstrip(b"\r").decode(self._encodings[stream], errors="replace")
+
+    def _elapsed(self):
+        return time.perf_counter() - self._start_counter if self.start_time else 0.0
+
+    def _on_finished(self, exit_code, exit_status):
+        self._read("stdout")
+        self._read("stderr")
+        self._flush()
+        self.duration = self._elapsed()
+        self.exit_code = exit_code if exit_status == QProcess.NormalExit else -1
+        self.finished.emit(self.exit_code, self.duration)
+
+    def _on_error(self, error):
+        # 崩溃时 finished 仍会发出，这里只处理无法启动的情况
+        if error == QProcess.FailedToStart:
+            self.duration = self._elapsed()
+            self.failed.emit(f"无法启动插件：{self.process.errorString()}")
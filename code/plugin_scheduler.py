@@ -0,0 +1,222 @@
+import os
+import time
+import itertools
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from plugin_runner import PluginProcess
+from plugin_worker import WorkerManager
+from python_plugins import PLUGIN_TYPE, PythonRun
+from log_config import env_int
+
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+STATE_LABELS = {
+    QUEUED: "排队中",
+    RUNNING: "运行中",
+    DONE: "已完成",
+    FAILED: "失败",
+    CANCELLED: "已取消",
+}
+
+# 插件的并发类型（plugin.json 中的 concurrency）：
+# exclusive 独占运行，运行时不启动其他插件；其他值按输出目录判断冲突
+EXCLUSIVE = "exclusive"
+
+# 同时运行的插件数量上限，可通过环境变量 HSGUI_PLUGIN_PARALLEL 设置
+MAX_PARALLEL = env_int('HSGUI_PLUGIN_PARALLEL', os.cpu_count() or 2, minimum=1)
+
+
+class PluginJob:
+    """一次插件运行任务"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, plugin_info, outputs):
+        self.id = next(self._ids)
+        self.plugin_info = plugin_info
+        self.name = plugin_info.get('name') or os.path.splitext(os.path.basename(plugin_info.get('path', '')))[0]
+        self.outputs = outputs  # 规范化后的输出目录集合，用于判断冲突
+        self.state = QUEUED
+        self.process = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.exit_code = None
+        self.duration = None
+        self.error = None
+        self.process_options = {}  # 传给 PluginProcess 的参数（命令行参数、环境变量等）
+        self.result = None  # Python插件返回的 (列字典, 文件列表)
+        self.cancel_requested = False
+
+    @property
+    def state_label(self):
+        return STATE_LABELS.get(self.state, self.state)
+
+    def is_finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+
+class PluginScheduler(QObject):
+    """插件任务调度：排队、限制并发数，输出目录冲突的插件依次运行"""
+
+    job_added = pyqtSignal(object)
+    job_changed = pyqtSignal(object)
+    job_output = pyqtSignal(object, str, str)  # (任务, 行内容, 输出流)
+
+    KILL_TIMEOUT_MS = 3000  # 取消运行中的任务时，等待正常退出的时间
+
+    def __init__(self, default_outputs=None, max_parallel=MAX_PARALLEL, history_size=100, parent=None):
+        super().__init__(parent)
+        self.max_parallel = max(1, max_parallel)
+        # 未声明输出目录的插件视为写入这些默认目录（如 input/word_data、output）
+        self.default_outputs = [self.normalize(p) for p in (default_outputs or [])]
+        self.queue = deque()
+        self.running = []
+        self.history = deque(maxlen=history_size)
+        self.reserved = []  # 暂时占用的输出目录集合（如正在恢复或保存插件结果缓存），期间不启动写这些目录的任务
+        self.workers = WorkerManager(parent=self)  # 声明了 worker 模式的插件使用常驻进程
+
+    @staticmethod
+    def normalize(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def outputs_for(self, plugin_info):
+        """插件声明的输出目录；未声明时使用默认目录"""
+        declared = plugin_info.get('outputs')
+        if declared:
+            plugin_dir = os.path.dirname(os.path.abspath(plugin_info.get('path', '')))
+            return {self.normalize(os.path.join(plugin_dir, p)) for p in declared}
+        return set(self.default_outputs)
+
+    def submit(self, plugin_info, **process_options):
+        """提交任务，有空闲名额且无冲突时立即启动"""
+        job = PluginJob(plugin_info, self.outputs_for(plugin_info))
+        job.process_options = process_options
+        self.queue.append(job)
+        self.job_added.emit(job)
+        self.schedule()
+        return job
+
+    def reserve(self, outputs):
+        """占用输出目录，直到 release；返回传给 release 的对象"""
+        outputs = set(outputs)
+        self.reserved.append(outputs)
+        return outputs
+
+    def release(self, outputs):
+        if outputs in self.reserved:
+            self.reserved.remove(outputs)
+        self.schedule()
+
+    def outputs_busy(self, outputs):
+        """输出目录是否正被运行中、排队中的任务或其他占用使用"""
+        jobs = list(self.running) + list(self.queue)
+        return any(job.outputs & outputs for job in jobs) or any(r & outputs for r in self.reserved)
+
+    def jobs(self):
+        """全部任务：运行中、排队中、历史"""
+        return list(self.running) + list(self.queue) + list(self.history)
+
+    def conflicts(self, job):
+        """与正在运行的任务是否冲突：独占插件、同一插件或输出目录有交集（包括被占用的目录）"""
+        if self.running and job.plugin_info.get('concurrency') == EXCLUSIVE:
+            return True
+        if any(job.outputs & reserved for reserved in self.reserved):
+            return True
+        for other in self.running:
+            if other.plugin_info.get('concurrency') == EXCLUSIVE:
+                return True
+            if other.plugin_info.get('path') == job.plugin_info.get('path'):
+                return True
+            if job.outputs & other.outputs:
+                return True
+        return False
+
+    def schedule(self):
+        """按提交顺序启动可以运行的任务"""
+        for job in list(self.queue):
+            if len(self.running) >= self.max_parallel:
+                break
+            if self.conflicts(job):
+                if job.plugin_info.get('concurrency') == EXCLUSIVE:
+                    break  # 独占插件等待前面的任务结束，后面的任务也不越过它
+                continue
+            self.queue.remove(job)
+            self.start_job(job)
+
+    def start_job(self, job):
+        if job.plugin_info.get('type') == PLUGIN_TYPE:
+            process = PythonRun(job.plugin_info, parent=self, **job.process_options)
+        elif job.plugin_info.get('worker'):
+            process = self.workers.create_run(job.plugin_info, parent=self, **job.process_options)
+        else:
+            process = PluginProcess(job.plugin_info.get('path', ''), parent=self, **job.process_options)
+        job.process = process
+        process.output.connect(lambda line, stream: self.job_output.emit(job, line, stream))
+        process.finished.connect(lambda code, duration: self.on_finished(job, code, duration))
+        process.failed.connect(lambda error: self.on_failed(job, error))
+
+        job.state = RUNNING
+        job.started_at = time.time()
+        self.running.append(job)
+        self.job_changed.emit(job)
+        process.start()
+
+    def cancel(self, job):
+        """取消任务：排队中的直接移除，运行中的先请求退出，超时后强制结束"""
+        if job.state == QUEUED:
+            self.queue.remove(job)
+            self.finish(job, CANCELLED)
+        elif job.state == RUNNING:
+            job.cancel_requested = True
+            job.process.terminate()
+            QTimer.singleShot(self.KILL_TIMEOUT_MS, lambda: self.kill(job))
+
+    def kill(self, job):
+        """强制结束运行中的任务"""
+        if job.state == RUNNING and job.process is not None:
+            job.cancel_requested = True
+            job.process.kill()
+
+    def on_finished(self, job, exit_code, duration):
+        job.exit_code = exit_code
+        job.duration = duration
+        if job.cancel_requested:
+            state = CANCELLED
+        else:
+            state = DONE if exit_code == 0 else FAILED
+        self.finish(job, state)
+
+    def on_failed(self, job, error):
+        job.error = error
+        job.duration = job.process.duration if job.process else None
+        self.finish(job, FAILED)
+
+    def finish(self, job, state):
+        if job.is_finished():
+            return
+        job.state = state
+        job.finished_at = time.time()
+        if job in self.running:
+            self.running.remove(job)
+        if job.process is not None:
+            job.result = getattr(job.process, "result", None)
+            job.process.deleteLater()
+            job.process = None
+        self.history.appendleft(job)
+        self.job_changed.emit(job)
+        self.schedule()
+
+    def shutdown(self):
+        """退出程序时结束所有任务"""
+        self.queue.clear()
+        for job in list(self.running):
+            job.cancel_requested = True
+            job.process.kill()
+        self.workers.shutdown()
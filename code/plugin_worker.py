@@ -0,0 +1,225 @@
+"""常驻插件进程（worker 模式）
+
+打包成 exe 的插件每次启动都要解压和导入，耗时数秒。支持 worker 模式的插件
+只启动一次，之后通过标准输入输出逐行收发 JSON 消息，空闲超时后自动退出。
+在 plugin.json 中声明 "worker": true 即可启用，启动参数默认为 --worker（可用 "worker_args" 修改）。
+
+主程序发给插件（标准输入，每行一个 JSON 对象）：
+
+    {"type": "run", "id": 1, "env": {"HSGUI_TABLE_PATH": "...", ...}, "args": []}
+    {"type": "cancel", "id": 1}
+    {"type": "shutdown"}
+
+插件发给主程序（标准输出，每行一个 JSON 对象）：
+
+    {"type": "ready"}                                  # 可选，启动完成
+    {"type": "log", "id": 1, "message": "..."}         # 日志或进度，显示在插件页
+    {"type": "progress", "id": 1, "message": "..."}
+    {"type": "result", "id": 1, "exit_code": 0}        # 本次运行结束
+
+env 中是本次运行的环境变量（与普通模式下传给插件的相同）。不是 JSON 的输出行按普通日志显示。
+标准输入和标准输出的消息都使用 UTF-8 编码（与系统默认编码无关），标准错误仍按系统默认编码显示。
+"""
+import os
+import json
+import time
+import logging
+import itertools
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from plugin_runner import PluginProcess
+from log_config import env_int
+
+
+# worker 空闲多少秒后退出，可通过环境变量 HSGUI_PLUGIN_WORKER_IDLE 设置
+IDLE_TIMEOUT = env_int('HSGUI_PLUGIN_WORKER_IDLE', 300, minimum=1)
+DEFAULT_WORKER_ARGS = ["--worker"]
+
+
+class WorkerRun(QObject):
+    """在 worker 中的一次运行，接口与 PluginProcess 相同，可直接交给调度器"""
+
+    output = pyqtSignal(str, str)
+    started = pyqtSignal()
+    finished = pyqtSignal(int, float)
+    failed = pyqtSignal(str)
+
+    _ids = itertools.count(1)
+
+    def __init__(self, worker, arguments=None, environment=None, parent=None):
+        super().__init__(parent)
+        self.id = next(self._ids)
+        self.worker = worker
+        self.arguments = list(arguments or [])
+        self.environment = {key: str(value) for key, value in (environment or {}).items()}
+        self.working_dir = worker.working_dir
+        self.start_time = None
+        self.exit_code = None
+        self.duration = None
+        self._running = False
+
+    def start(self):
+        self.start_time = time.time()
+        self._start_counter = time.perf_counter()
+        self._running = True
+        self.worker.submit(self)
+
+    def is_running(self):
+        return self._running
+
+    def terminate(self):
+        """请求 worker 取消本次运行"""
+        if self._running:
+            self.worker.send({"type": "cancel", "id": self.id})
+
+    def kill(self):
+        """结束整个 worker 进程"""
+        if self._running:
+            self.worker.kill()
+
+    def pid(self):
+        return self.worker.pid()
+
+    def request(self):
+        return {"type": "run", "id": self.id, "env": self.environment, "args": self.arguments}
+
+    def complete(self, exit_code):
+        if not self._running:
+            return
+        self._running = False
+        self.duration = time.perf_counter() - self._start_counter
+        self.exit_code = exit_code
+        self.finished.emit(exit_code, self.duration)
+
+    def fail(self, error):
+        if not self._running:
+            return
+        self._running = False
+        self.duration = time.perf_counter() - self._start_counter
+        self.failed.emit(error)
+
+
+class PluginWorker(QObject):
+    """一个常驻的插件进程，同一时间只处理一次运行"""
+
+    stopped = pyqtSignal()
+
+    SHUTDOWN_TIMEOUT_MS = 3000
+
+    def __init__(self, plugin_path, arguments=None, idle_timeout=IDLE_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.plugin_path = plugin_path
+        self.process = PluginProcess(plugin_path, arguments=arguments, stdout_encoding="utf-8", parent=self)
+        self.working_dir = self.process.working_dir
+        self.process.output.connect(self.on_output)
+        self.process.finished.connect(self.on_exit)
+        self.process.failed.connect(self.on_failed)
+        self.current = None
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(idle_timeout * 1000)
+        self.idle_timer.timeout.connect(self.shutdown)
+
+    def pid(self):
+        return self.process.pid()
+
+    def is_alive(self):
+        return self.process.is_running()
+
+    def submit(self, run):
+        if self.current is not None:
+            run.fail("插件 worker 正在处理其他任务")
+            return
+        self.idle_timer.stop()
+        self.current = run
+        if not self.is_alive():
+            logging.info(f"启动插件 worker: {self.plugin_path}")
+            self.process.start()
+        run.started.emit()
+        self.send(run.request())
+
+    def send(self, message):
+        # 只使用 ASCII，插件无论使用何种编码读取都能正确解析
+        self.process.write_line(json.dumps(message))
+
+    def on_output(self, line, stream):
+        message = None
+        if stream == "stdout" and line.startswith("{"):
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+        if not isinstance(message, dict):
+            self._forward(line, stream)
+            return
+
+        kind = message.get("type")
+        if kind in ("log", "progress"):
+            self._forward(str(message.get("message", "")), stream)
+        elif kind == "result" and self.current is not None and message.get("id") == self.current.id:
+            run, self.current = self.current, None
+            run.complete(int(message.get("exit_code", 0)))
+            self.idle_timer.start()
+
+    def _forward(self, line, stream):
+        if self.current is not None:
+            self.current.output.emit(line, stream)
+        elif line.strip():
+            logging.info(f"[{os.path.basename(self.plugin_path)} worker] {line}")
+
+    def on_exit(self, exit_code, duration):
+        """worker 进程退出：正在处理的运行按失败结束"""
+        self.idle_timer.stop()
+        if self.current is not None:
+            run, self.current = self.current, None
+            run.complete(exit_code if exit_code != 0 else -1)
+        logging.info(f"插件 worker 已退出: {self.plugin_path}，退出码 {exit_code}")
+        self.stopped.emit()
+
+    def on_failed(self, error):
+        self.idle_timer.stop()
+        if self.current is not None:
+            run, self.current = self.current, None
+            run.fail(error)
+        self.stopped.emit()
+
+    def shutdown(self):
+        """请求 worker 正常退出，超时后强制结束"""
+        if not self.is_alive():
+            return
+        logging.info(f"插件 worker 空闲超时或程序退出，正在关闭: {self.plugin_path}")
+        self.send({"type": "shutdown"})
+        self.process.close_input()
+        QTimer.singleShot(self.SHUTDOWN_TIMEOUT_MS, self.kill)
+
+    def kill(self):
+        self.process.kill()
+
+
+class WorkerManager(QObject):
+    """按插件路径管理常驻 worker"""
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.idle_timeout = idle_timeout
+        self.workers = {}
+
+    def create_run(self, plugin_info, arguments=None, working_dir=None, environment=None, parent=None):
+        """为一次插件运行创建 WorkerRun，需要时启动 worker"""
+        path = plugin_info.get('path', '')
+        worker = self.workers.get(path)
+        if worker is None:
+            worker_args = plugin_info.get('worker_args', DEFAULT_WORKER_ARGS)
+            worker = PluginWorker(path, arguments=worker_args, idle_timeout=self.idle_timeout, parent=self)
+            worker.stopped.connect(lambda: self.remove(path, worker))
+            self.workers[path] = worker
+        return WorkerRun(worker, arguments=arguments, environment=environment, parent=parent)
+
+    def remove(self, path, worker):
+        if self.workers.get(path) is worker:
+            del self.workers[path]
+            worker.deleteLater()
+
+    def shutdown(self):
+        for worker in list(self.workers.values()):
+            worker.shutdown()
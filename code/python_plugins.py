@@ -0,0 +1,271 @@
+"""进程内Python插件
+
+约定：extension 目录下的 *.py 文件，或 extension/<目录>/plugin.py，
+也可以通过 entry point（组名 hsgui.plugins）注册。插件模块需要提供：
+
+    PLUGIN_NAME = "示例插件"          # 可选，显示名称
+
+    def run(table, options, context):
+        # table:   TableView，只读的列式表格数据，table["学院"] 返回该列所有值
+        # options: 只读字典，包含 year / month / day
+        # context: PluginContext，提供 output_dir 和 log(message)
+        return {"columns": {"新列": [...]}, "files": ["生成的文件路径"]}
+
+返回值中的 columns 会作为一次可撤回的操作写回表格（同名列覆盖，新列追加），
+files 会显示在日志中。插件在线程池中运行，不阻塞界面；和外部插件一样由调度器排队，
+未声明 outputs 的插件视为写入 input/word_data 和 output，与写这些目录的插件依次运行。
+"""
+import os
+import sys
+import time
+import logging
+import importlib.util
+from types import MappingProxyType
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # Python < 3.8
+    entry_points = None
+
+
+ENTRY_POINT_GROUP = "hsgui.plugins"
+PLUGIN_TYPE = "python"
+
+# 随程序提供的内置插件：(显示名称, 模块:函数)
+BUILTIN_PLUGINS = [
+    ("三联表生成（内置）", "receipt_generator:run"),
+    ("三联表生成（单文件，内置）", "receipt_generator:run_merged"),
+]
+
+# 已导入的插件模块缓存：路径 -> (修改时间, 模块)
+_module_cache = {}
+
+
+class TableView:
+    """只读的列式表格视图，各列为不可变的元组"""
+
+    def __init__(self, headers, columns):
+        self.headers = tuple(headers)
+        self._columns = {header: tuple(values) for header, values in zip(self.headers, columns)}
+        self.row_count = len(columns[0]) if columns else 0
+
+    def __len__(self):
+        return self.row_count
+
+    def __getitem__(self, header):
+        return self._columns[header]
+
+    def __contains__(self, header):
+        return header in self._columns
+
+    def rows(self):
+        """逐行遍历，每行为一个元组"""
+        return zip(*(self._columns[h] for h in self.headers))
+
+    def to_dict(self):
+        return dict(self._columns)
+
+    def to_dataframe(self):
+        """转换为 pandas.DataFrame（会复制数据）"""
+        import pandas as pd
+        return pd.DataFrame(self._columns, columns=list(self.headers))
+
+
+class PluginContext:
+    """传给插件的运行环境"""
+
+    def __init__(self, plugin_info, output_dir, log_callback):
+        self.plugin_info = plugin_info
+        self.output_dir = output_dir
+        self._log = log_callback
+
+    def log(self, message):
+        """输出一行日志（线程安全，会显示在插件页日志区域）"""
+        self._log(str(message))
+
+
+def discover_python_plugins(extension_path):
+    """扫描 extension 目录和 entry point，返回插件信息列表（不导入模块）"""
+    plugins = []
+    for name, entry_point in BUILTIN_PLUGINS:
+        module_name = entry_point.partition(':')[0]
+        plugins.append({
+            'name': name,
+            'path': os.path.join(os.path.dirname(os.path.abspath(__file__)), module_name + '.py'),
+            'filename': name,
+            'type': PLUGIN_TYPE,
+            'entry_point': entry_point,
+            'builtin': True,
+        })
+    if os.path.isdir(extension_path):
+        for entry in sorted(os.scandir(extension_path), key=lambda e: e.name):
+            if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('_'):
+                path = entry.path
+            elif entry.is_dir() and os.path.isfile(os.path.join(entry.path, 'plugin.py')):
+                path = os.path.join(entry.path, 'plugin.py')
+            else:
+                continue
+            name = os.path.splitext(entry.name)[0]
+            plugins.append({
+                'name': name,
+                'path': path,
+                'filename': entry.name,
+                'type': PLUGIN_TYPE,
+            })
+
+    if entry_points is not None:
+        try:
+            eps = entry_points()
+            group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+            for ep in group:
+                plugins.append({
+                    'name': ep.name,
+                    'path': ep.value,
+                    'filename': ep.name,
+                    'type': PLUGIN_TYPE,
+                    'entry_point': ep.value,
+                })
+        except Exception as e:
+            logging.error(f"读取插件 entry point 失败: {e}")
+
+    return plugins
+
+
+def load_plugin(plugin_info):
+    """导入插件并返回其 run 函数和显示名称；文件未修改时复用已导入的模块"""
+    if plugin_info.get('entry_point'):
+        module_name, _, attr = plugin_info['entry_point'].partition(':')
+        module = importlib.import_module(module_name)
+        target = getattr(module, attr) if attr else module
+    else:
+        path = plugin_info['path']
+        mtime = os.path.getmtime(path)
+        cached = _module_cache.get(path)
+        if cached and cached[0] == mtime:
+            target = cached[1]
+        else:
+            module_name = f"hsgui_plugin_{abs(hash(path))}"
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            target = importlib.util.module_from_spec(spec)
+            # 允许插件导入同目录下的辅助模块
+            plugin_dir = os.path.dirname(path)
+            if plugin_dir not in sys.path:
+                sys.path.append(plugin_dir)
+            spec.loader.exec_module(target)
+            _module_cache[path] = (mtime, target)
+
+    run = target if callable(target) and not hasattr(target, 'run') else getattr(target, 'run', None)
+    if not callable(run):
+        raise ValueError(f"插件 {plugin_info.get('name')} 没有可调用的 run(table, options, context) 函数")
+    return run, getattr(target, 'PLUGIN_NAME', plugin_info.get('name'))
+
+
+def normalize_result(result, row_count):
+    """校验插件返回值，返回 (列字典, 文件列表)"""
+    if result is None:
+        return {}, []
+    if not isinstance(result, dict):
+        raise ValueError("插件返回值必须是字典或 None")
+
+    columns = {}
+    for header, values in (result.get('columns') or {}).items():
+        values = ["" if v is None else str(v) for v in values]
+        if len(values) != row_count:
+            raise ValueError(f"返回的列 '{header}' 有 {len(values)} 行，与表格的 {row_count} 行不一致")
+        columns[str(header)] = values
+
+    files = [str(f) for f in (result.get('files') or [])]
+    return columns, files
+
+
+class PythonPluginSignals(QObject):
+    log = pyqtSignal(str)
+    finished = pyqtSignal(object, object, float)  # (列字典, 文件列表, 耗时秒数)
+    failed = pyqtSignal(str)
+
+
+class PythonPluginTask(QRunnable):
+    """在线程池中运行一个Python插件"""
+
+    def __init__(self, plugin_info, table, options, output_dir):
+        super().__init__()
+        self.plugin_info = plugin_info
+        self.table = table
+        self.options = MappingProxyType(dict(options))
+        self.output_dir = output_dir
+        self.signals = PythonPluginSignals()
+        self.start_time = None
+
+    def run(self):
+        self.start_time = time.time()
+        start = time.perf_counter()
+        try:
+            run, _ = load_plugin(self.plugin_info)
+            context = PluginContext(self.plugin_info, self.output_dir, self.signals.log.emit)
+            result = run(self.table, self.options, context)
+            columns, files = normalize_result(result, len(self.table))
+        except Exception as e:
+            logging.exception(f"Python插件运行出错: {self.plugin_info.get('name')}")
+            self.signals.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        self.signals.finished.emit(columns, files, time.perf_counter() - start)
+
+
+class PythonRun(QObject):
+    """一次Python插件运行，接口与 PluginProcess 相同，可直接交给调度器
+
+    插件在线程中运行，无法强制结束：取消后等待 run 返回，结果不再写回表格。
+    运行成功后返回的列和文件保存在 result 中：(列字典, 文件列表)。
+    """
+
+    output = pyqtSignal(str, str)
+    started = pyqtSignal()
+    finished = pyqtSignal(int, float)
+    failed = pyqtSignal(str)
+
+    def __init__(self, plugin_info, table, options, output_dir, environment=None, parent=None):
+        super().__init__(parent)
+        self.task = PythonPluginTask(plugin_info, table, options, output_dir)
+        self.task.setAutoDelete(False)
+        self.task.signals.log.connect(lambda line: self.output.emit(line, "stdout"))
+        self.task.signals.finished.connect(self.on_finished)
+        self.task.signals.failed.connect(self.on_failed)
+        self.working_dir = output_dir
+        self.environment = dict(environment or {})
+        self.start_time = None
+        self.exit_code = None
+        self.duration = None
+        self.result = None
+        self._running = False
+
+    def start(self):
+        self.start_time = time.time()
+        self._start_counter = time.perf_counter()
+        self._running = True
+        QThreadPool.globalInstance().start(self.task)
+        self.started.emit()
+
+    def is_running(self):
+        return self._running
+
+    def terminate(self):
+        """线程中的插件无法中断，由调度器按取消处理"""
+
+    def kill(self):
+        pass
+
+    def pid(self):
+        return None
+
+    def on_finished(self, columns, files, duration):
+        self._running = False
+        self.result = (columns, files)
+        self.exit_code = 0
+        self.duration = duration
+        self.finished.emit(0, duration)
+
+    def on_failed(self, error):
+        self._running = False
+        self.duration = time.perf_counter() - self._start_counter
+        self.failed.emit(error)
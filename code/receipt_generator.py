@@ -0,0 +1,433 @@
+"""内置的三联表生成
+
+按表格和选项页的年份、月份、落款日期，为每个学院生成一份三联表（存根、收据、记账三联），
+保存到 input/word_data/<序号><学院>.docx，再合并为 output/三联表.docx，与 combine_docx 插件的结果位置相同。
+行数较多时在多个进程中并行生成。再次生成时只重新生成内容有变化的行（见 generate_receipts）。
+也可以不生成单个文档，直接边生成边写入 output/三联表.docx（见 generate_merged），适合一次生成数千份。
+
+文档按模板生成（见 docx_template）：优先使用环境变量 HSGUI_RECEIPT_TEMPLATE 指定的模板，
+其次是 template/三联表模板.docx，都不存在时使用内置的版式。模板中可用的占位符为
+{{序号}} {{学院}} {{财务金额}} {{大写金额}} {{团费年份}} {{团费月份}} {{落款日期}}。
+
+作为Python插件运行（见 python_plugins），也可以直接调用 generate_receipts。
+"""
+import os
+import re
+import time
+import json
+import itertools
+import hashlib
+import zipfile
+import logging
+from decimal import Decimal, InvalidOperation
+from xml.sax.saxutils import escape
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from docx_template import CompiledTemplate
+from plugin_registry import write_json_atomic
+from plugin_discovery import file_stamp
+from log_config import env_int
+
+
+PLUGIN_NAME = "三联表生成（内置）"
+MERGED_PLUGIN_NAME = "三联表生成（单文件，内置）"
+
+# 并行生成使用的进程数，可通过环境变量 HSGUI_RECEIPT_WORKERS 设置；行数少于 MIN_PARALLEL_ROWS 时在当前进程生成
+MAX_WORKERS = env_int('HSGUI_RECEIPT_WORKERS', os.cpu_count() or 2, minimum=1)
+MIN_PARALLEL_ROWS = 64
+MERGED_NAME = "三联表.docx"
+TEMPLATE_NAME = os.path.join("template", "三联表模板.docx")
+MANIFEST_NAME = ".receipts_manifest.json"  # input/word_data 中记录各文档内容哈希的清单
+FIELD_NAMES = ["序号", "学院", "财务金额", "大写金额", "团费年份", "团费月份", "落款日期"]
+
+RECEIPT_PARTS = ["第一联 存根", "第二联 收据", "第三联 记账"]
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCUMENT_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:document xmlns:w="{W_NS}"><w:body>'
+)
+# A4 纵向，页边距 2 厘米
+DOCUMENT_TAIL = (
+    '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134" w:header="567" w:footer="567" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>'
+)
+PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def paragraph(text, align="left", size=24, bold=False, color=None, spacing_after=120):
+    """一个段落的 WordprocessingML，字号单位为半磅"""
+    run_props = f'<w:rFonts w:eastAsia="宋体"/><w:sz w:val="{size}"/><w:szCs w:val="{size}"/>'
+    if bold:
+        run_props = '<w:b/>' + run_props
+    if color:
+        run_props += f'<w:color w:val="{color}"/>'
+    return (
+        f'<w:p><w:pPr><w:jc w:val="{align}"/><w:spacing w:after="{spacing_after}"/></w:pPr>'
+        f'<w:r><w:rPr>{run_props}</w:rPr><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+    )
+
+
+DIGITS = "零壹贰叁肆伍陆柒捌玖"
+UNITS = ["", "拾", "佰", "仟"]
+SECTIONS = ["", "万", "亿", "万亿"]
+
+
+def amount_in_words(amount):
+    """金额转换为人民币大写，无法识别时返回空字符串"""
+    try:
+        value = Decimal(str(amount).replace(",", "").strip())
+        # pandas 把空单元格读成 NaN，Decimal 能创建但无法比较大小
+        if not value.is_finite():
+            raise ValueError(amount)
+        value = value.quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return ""
+    if value < 0:
+        return ""
+    integer = int(value)
+    cents = int((value - integer) * 100)
+    if integer == 0 and cents == 0:
+        return "零元整"
+
+    words = ""
+    digits = str(integer) if integer else ""
+    zero = False
+    for i, ch in enumerate(digits):
+        digit = int(ch)
+        position = len(digits) - 1 - i
+        if digit == 0:
+            zero = True
+        else:
+            if zero:
+                words += "零"
+                zero = False
+            words += DIGITS[digit] + UNITS[position % 4]
+        # 每四位一节，节内有非零数字时加上万、亿
+        if position % 4 == 0 and position > 0 and int(digits[max(0, i - 3):i + 1]):
+            words += SECTIONS[position // 4]
+    if words:
+        words += "元"
+
+    jiao, fen = divmod(cents, 10)
+    if cents == 0:
+        return words + "整"
+    if jiao:
+        words += DIGITS[jiao] + "角"
+    elif words:
+        words += "零"
+    if fen:
+        words += DIGITS[fen] + "分"
+    return words
+
+
+def receipt_rows(table, options):
+    """从表格数据整理每份三联表的字段，规则与"输出为Excel"相同：是否补交中含"补"时用其代替月份"""
+    rows = []
+    supplements = table["是否补交"] if "是否补交" in table else [""] * len(table)
+    for number, school, amount, supplement in zip(table["序号"], table["学院"], table["财务金额"], supplements):
+        if not str(school).strip():
+            continue
+        month = supplement if "补" in str(supplement) else options.get("month", "")
+        rows.append({
+            "序号": str(number).strip(),
+            "学院": str(school).strip(),
+            "财务金额": str(amount).strip(),
+            "大写金额": amount_in_words(amount),
+            "团费年份": str(options.get("year", "")),
+            "团费月份": str(month),
+            "落款日期": str(options.get("day", "")),
+        })
+    return rows
+
+
+def receipt_filename(fields):
+    """单个文档的文件名，与 combine_docx 插件一致：<序号><学院>.docx"""
+    name = re.sub(r'[\\/:*?"<>|]', "_", f"{fields['序号']}{fields['学院']}")
+    return name + ".docx"
+
+
+def render_receipt(fields):
+    """一份三联表的正文内容（不含文档头尾）"""
+    parts = []
+    for index, part_name in enumerate(RECEIPT_PARTS):
+        parts.append(paragraph("团费收缴凭证", align="center", size=32, bold=True))
+        parts.append(paragraph(f"{part_name}        No. {fields['序号']}", align="right", size=21, color="555555"))
+        parts.append(paragraph(
+            f"兹收到 {fields['学院']} 缴纳 {fields['团费年份']} 年 {fields['团费月份']} 团费。"))
+        parts.append(paragraph(
+            f"金额（大写）：人民币 {fields['大写金额']}        ￥{fields['财务金额']} 元"))
+        parts.append(paragraph("收款单位（盖章）：", align="right"))
+        parts.append(paragraph(fields["落款日期"], align="right", spacing_after=240))
+        if index < len(RECEIPT_PARTS) - 1:
+            parts.append(paragraph("- - - - - - - - - - - - 裁 剪 线 - - - - - - - - - - - -",
+                                   align="center", size=18, color="999999", spacing_after=240))
+    return "".join(parts)
+
+
+def default_template():
+    """内置版式：用占位符渲染一份三联表作为模板"""
+    placeholders = {name: "{{" + name + "}}" for name in FIELD_NAMES}
+    document = DOCUMENT_HEAD + render_receipt(placeholders) + DOCUMENT_TAIL
+    return CompiledTemplate({
+        "[Content_Types].xml": CONTENT_TYPES_XML.encode("utf-8"),
+        "_rels/.rels": RELS_XML.encode("utf-8"),
+        "word/document.xml": document.encode("utf-8"),
+    })
+
+
+# 每个进程只编译一次模板：(模板路径, 修改时间) -> CompiledTemplate
+_templates = {}
+
+
+def load_template(template_path=None):
+    key = (template_path, os.path.getmtime(template_path) if template_path else None)
+    template = _templates.get(key)
+    if template is None:
+        template = CompiledTemplate.from_docx(template_path) if template_path else default_template()
+        _templates.clear()
+        _templates[key] = template
+    return template
+
+
+def find_template(data_root):
+    """按顺序查找模板文件，没有时返回 None（使用内置版式）"""
+    for path in (os.environ.get('HSGUI_RECEIPT_TEMPLATE'), os.path.join(data_root, TEMPLATE_NAME)):
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def write_file(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_body(path):
+    """读取 docx 正文内容（去掉分节属性），用于合并"""
+    with zipfile.ZipFile(path) as package:
+        xml = package.read("word/document.xml")
+    start = xml.index(b"<w:body>") + len(b"<w:body>")
+    end = xml.rfind(b"<w:sectPr")
+    if end < start:
+        end = xml.rindex(b"</w:body>")
+    return xml[start:end]
+
+
+def generate_chunk(rows, output_dir, template_path=None):
+    """生成一组文档，返回生成的文件路径（在子进程中运行）"""
+    template = load_template(template_path)
+    paths = []
+    for fields in rows:
+        path = os.path.join(output_dir, receipt_filename(fields))
+        write_file(path, template.render(fields))
+        paths.append(path)
+    return paths
+
+
+def render_bodies(rows, template_path=None):
+    """生成一组文档的正文（字节），用于直接写入合并文档（在子进程中运行）"""
+    template = load_template(template_path)
+    return [template.render_body(fields) for fields in rows]
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def merge_documents(paths, merged_path, template_path=None):
+    """按顺序合并文档，每份之间分页；样式等部件与模板相同"""
+    template = load_template(template_path)
+    body = PAGE_BREAK.encode("utf-8").join(read_body(path) for path in paths)
+    write_file(merged_path, template.package(template.head + body + template.tail))
+
+
+def render_rows(rows, word_dir, workers, log, template_path=None):
+    """生成指定行的文档，行数较多时使用多个进程"""
+    if workers > 1 and len(rows) >= MIN_PARALLEL_ROWS:
+        # 每个进程分到若干组，减少进程间通信次数
+        chunks = chunked(rows, max(1, len(rows) // (workers * 4)))
+        paths = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_paths in executor.map(generate_chunk, chunks, [word_dir] * len(chunks),
+                                            [template_path] * len(chunks)):
+                paths.extend(chunk_paths)
+                log(f"已生成 {len(paths)}/{len(rows)} 份文档")
+        return paths
+    return generate_chunk(rows, word_dir, template_path)
+
+
+def iter_bodies(rows, workers, log, template_path=None):
+    """按顺序逐组产出正文，行数较多时在多个进程中生成
+
+    同时只提交少量组，写入跟不上生成时不会在内存中堆积结果。
+    """
+    if workers <= 1 or len(rows) < MIN_PARALLEL_ROWS:
+        yield from render_bodies(rows, template_path)
+        return
+    chunks = chunked(rows, max(1, min(256, len(rows) // (workers * 4))))
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        remaining = iter(chunks)
+        for chunk in itertools.islice(remaining, workers * 2):
+            pending.append(executor.submit(render_bodies, chunk, template_path))
+        while pending:
+            bodies = pending.popleft().result()
+            chunk = next(remaining, None)
+            if chunk is not None:
+                pending.append(executor.submit(render_bodies, chunk, template_path))
+            yield from bodies
+            done += len(bodies)
+            log(f"已写入 {done}/{len(rows)} 份")
+
+
+def generate_merged(rows, merged_path, workers=MAX_WORKERS, log=logging.info, template_path=None):
+    """不生成单个文档，把所有三联表直接写入一个合并文档，每份之间分页"""
+    os.makedirs(os.path.dirname(merged_path), exist_ok=True)
+    start = time.perf_counter()
+    template = load_template(template_path)
+    page_break = PAGE_BREAK.encode("utf-8")
+
+    def bodies():
+        for index, body in enumerate(iter_bodies(rows, workers, log, template_path)):
+            if index:
+                yield page_break
+            yield body
+
+    template.write_stream(merged_path, bodies())
+    log(f"生成合并文档完成：{merged_path}，共 {len(rows)} 份，耗时 {time.perf_counter() - start:.3f} 秒")
+    return merged_path
+
+
+def row_hash(fields, template):
+    """一份文档的内容哈希：字段值（含年月日和补交月份）加上模板指纹"""
+    data = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(template.fingerprint.encode("ascii") + b"\0" + data).hexdigest()
+
+
+def read_manifest(path):
+    try:
+        with open(path, "r", encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "merged": None}
+    manifest.setdefault("files", {})
+    manifest.setdefault("merged", None)
+    return manifest
+
+
+def generate_receipts(rows, word_dir, merged_path, workers=MAX_WORKERS, log=logging.info, template_path=None,
+                      incremental=True):
+    """生成所有三联表并合并，返回 (单个文档路径列表, 合并后的文档路径)
+
+    word_dir 中的清单文件记录每份文档的内容哈希和文件的修改时间、大小：只重新生成内容有变化的行，
+    或文件已被其他程序（如 combine_docx 插件）改写的行；删除已不在表格中的行对应的文档；
+    所有文档都未变化且合并结果存在时不再合并。
+    """
+    os.makedirs(word_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(merged_path), exist_ok=True)
+    start = time.perf_counter()
+
+    template = load_template(template_path)
+    manifest_path = os.path.join(word_dir, MANIFEST_NAME)
+    manifest = read_manifest(manifest_path) if incremental else {"files": {}, "merged": None}
+    old_files = manifest["files"]
+
+    digests = {}
+    paths = []
+    changed = []
+    for fields in rows:
+        filename = receipt_filename(fields)
+        digest = row_hash(fields, template)
+        digests[filename] = digest
+        path = os.path.join(word_dir, filename)
+        paths.append(path)
+        old = old_files.get(filename)
+        if not isinstance(old, dict) or old.get("hash") != digest or old.get("stamp") != file_stamp(path):
+            changed.append(fields)
+
+    # 删除已不在表格中的行生成的文档（只删除清单中记录、且之后未被其他程序改写的文件）
+    removed = []
+    for name, old in old_files.items():
+        if name in digests:
+            continue
+        path = os.path.join(word_dir, name)
+        if isinstance(old, dict) and old.get("stamp") == file_stamp(path):
+            os.remove(path)
+            removed.append(name)
+
+    if changed:
+        render_rows(changed, word_dir, workers, log, template_path)
+    log(f"生成 {len(changed)} 份文档，{len(rows) - len(changed)} 份未变化，删除 {len(removed)} 份，"
+        f"耗时 {time.perf_counter() - start:.3f} 秒")
+
+    files = {name: {"hash": digest, "stamp": file_stamp(os.path.join(word_dir, name))}
+             for name, digest in digests.items()}
+    merged_key = hashlib.sha1("\n".join(f"{name}:{digests[name]}" for name in map(os.path.basename, paths))
+                              .encode("utf-8")).hexdigest()
+    merged = manifest.get("merged") or {}
+    if (merged.get("key") == merged_key and merged.get("path") == merged_path
+            and merged.get("stamp") == file_stamp(merged_path)):
+        log(f"文档均未变化，沿用已合并的文档：{merged_path}")
+    else:
+        merge_start = time.perf_counter()
+        merge_documents(paths, merged_path, template_path)
+        log(f"合并文档完成：{merged_path}，耗时 {time.perf_counter() - merge_start:.3f} 秒")
+
+    # 合并文档可能被其他方式覆盖（如单文件模式），记录大小和修改时间用于确认
+    write_json_atomic(manifest_path, {"files": files, "merged": {"path": merged_path, "key": merged_key,
+                                                                 "stamp": file_stamp(merged_path)}})
+    return paths, merged_path
+
+
+def run(table, options, context):
+    """Python插件入口：生成到 input/word_data 和 output/三联表.docx"""
+    rows = receipt_rows(table, options)
+    if not rows:
+        context.log("表格中没有学院数据，未生成文档")
+        return None
+    data_root = os.path.dirname(os.path.abspath(context.output_dir))
+    word_dir = os.path.join(data_root, "input", "word_data")
+    merged_path = os.path.join(context.output_dir, MERGED_NAME)
+    template_path = find_template(data_root)
+    if template_path:
+        context.log(f"使用模板：{template_path}")
+    _, merged_path = generate_receipts(rows, word_dir, merged_path, log=context.log, template_path=template_path)
+    return {"files": [merged_path]}
+
+
+def run_merged(table, options, context):
+    """Python插件入口：只生成 output/三联表.docx，不生成单个文档"""
+    rows = receipt_rows(table, options)
+    if not rows:
+        context.log("表格中没有学院数据，未生成文档")
+        return None
+    data_root = os.path.dirname(os.path.abspath(context.output_dir))
+    merged_path = os.path.join(context.output_dir, MERGED_NAME)
+    template_path = find_template(data_root)
+    if template_path:
+        context.log(f"使用模板：{template_path}")
+    generate_merged(rows, merged_path, log=context.log, template_path=template_path)
+    return {"files": [merged_path]}
@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+import logging
+from PyQt5.QtCore import QDir
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QApplication
+
+
+# 编译后的Qt资源包（可选）：pyrcc5 resources.qrc -o resources_rc.py
+try:
+    import resources_rc  # noqa: F401  导入即注册 ":/image/..." 资源
+    HAS_COMPILED_RESOURCES = True
+except ImportError:
+    HAS_COMPILED_RESOURCES = False
+
+
+# 添加资源路径解析函数
+def get_resource_path(relative_path):
+    """获取资源的绝对路径，适用于开发环境和PyInstaller打包环境"""
+    # PyInstaller会创建临时文件夹并将路径存储在_MEIPASS中
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, relative_path)
+
+
+# create_button 使用的按钮样式模板，按 objectName 区分各按钮
+BUTTON_STYLE_TEMPLATE = """
+    QPushButton#{name} {{
+        background-color: {color};
+        color: white;
+        padding: 10px;
+        font-size: 16px;
+        border-radius: 4px;
+        min-width: 120px;
+        font-weight: 500;{extra}
+    }}
+    QPushButton#{name}:hover {{
+        background-color: {color}ee;  /* 使用透明度创建悬停效果 */
+    }}
+    QPushButton#{name}:pressed {{
+        background-color: {color}cc;  /* 使用透明度创建按下效果 */
+    }}
+"""
+
+# 带下拉菜单的按钮额外样式
+MENU_BUTTON_EXTRA = """
+        text-align: left;
+        padding-right: 15px;"""
+
+MENU_BUTTON_INDICATOR_TEMPLATE = """
+    QPushButton#{name}::menu-indicator {{
+        subcontrol-position: right center;
+        subcontrol-origin: padding;
+        right: 8px;
+    }}
+"""
+
+# 主页面下拉菜单样式
+MENU_STYLE = """
+    QMenu#file_menu {
+        background-color: white;
+        border: 1px solid #cccccc;
+        padding: 5px;
+        border-radius: 3px;
+    }
+    QMenu#file_menu::item {
+        padding: 6px 25px 6px 20px;
+        border-radius: 3px;
+    }
+    QMenu#file_menu::item:selected {
+        background-color: #f0f0f0;
+    }
+"""
+
+
+def build_button_style(name, color, with_menu=False):
+    """根据模板生成单个按钮的样式规则"""
+    style = BUTTON_STYLE_TEMPLATE.format(
+        name=name, color=color, extra=MENU_BUTTON_EXTRA if with_menu else ""
+    )
+    if with_menu:
+        style += MENU_BUTTON_INDICATOR_TEMPLATE.format(name=name)
+    return style
+
+
+class ResourceManager:
+    """统一管理图标和样式表，启动时加载一次，之后全部从缓存读取"""
+
+    ICON_SUFFIXES = ('.svg', '.ico', '.png')
+
+    def __init__(self, image_dir="image"):
+        self.image_dir = image_dir
+        self.icons = {}  # 文件名 -> QIcon
+        self.loaded = False
+
+    def load(self):
+        """一次性加载全部图标，优先使用编译后的Qt资源包"""
+        if self.loaded:
+            return
+
+        start = time.perf_counter()
+        if HAS_COMPILED_RESOURCES and QDir(f":/{self.image_dir}").exists():
+            source = f":/{self.image_dir}"
+            names = QDir(source).entryList(QDir.Files)
+        else:
+            source = get_resource_path(self.image_dir)
+            try:
+                names = [entry.name for entry in os.scandir(source) if entry.is_file()]
+            except OSError as e:
+                logging.error(f"读取图标目录失败: {e}")
+                names = []
+
+        for name in names:
+            if not name.lower().endswith(self.ICON_SUFFIXES):
+                continue
+            icon = QIcon(f"{source}/{name}")
+            if icon.isNull():
+                logging.warning(f"警告：图标加载失败（QIcon为空）: {name}")
+                continue
+            self.icons[name] = icon
+
+        self.loaded = True
+        elapsed = (time.perf_counter() - start) * 1000
+        logging.debug(f"已从 {source} 加载 {len(self.icons)} 个图标，耗时 {elapsed:.1f} ms")
+
+    def icon(self, name, fallback=None):
+        """获取缓存的图标，缺失时使用系统标准图标作为后备"""
+        if not self.loaded:
+            self.load()
+
+        icon = self.icons.get(name)
+        if icon is not None:
+            return icon
+
+        logging.warning(f"未找到图标文件: {name}")
+        if fallback is not None:
+            return QApplication.style().standardIcon(fallback)
+        return QIcon()
+
+    def has_icon(self, name):
+        """图标是否存在于缓存中"""
+        if not self.loaded:
+            self.load()
+        return name in self.icons
+
+    @staticmethod
+    def build_app_stylesheet(buttons):
+        """合并所有按钮样式为一份应用级样式表，Qt只需解析一次
+
+        buttons: {objectName: (颜色, 是否带下拉菜单)}
+        """
+        parts = [build_button_style(name, color, with_menu) for name, (color, with_menu) in buttons.items()]
+        parts.append(MENU_STYLE)
+        return "".join(parts)
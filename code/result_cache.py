@@ -0,0 +1,273 @@
+"""插件运行结果缓存
+
+以插件程序、传给插件的表格数据（含年月日）、input/data.xlsx、插件声明的输入文件和命令行参数计算缓存键；
+相同输入再次运行时，直接从缓存恢复上次生成的文件，不再启动插件。
+文件按内容哈希保存，多次运行生成的相同文件只存一份；总大小超过上限时按最近使用时间淘汰。
+
+只有在 plugin.json 中声明了 outputs 的插件才使用缓存：声明的输出目录视为归插件所有，
+恢复时目录内容与缓存的运行结果完全一致，声明的输出目录以外的文件不会被删除或覆盖。
+未声明 outputs 的插件写入共用的 input/word_data、output 目录，不缓存。
+结果依赖当前时间或网络的插件可声明 "cache": false。
+
+保存和恢复需要计算哈希、复制文件，通过 CacheTask 在线程池中执行，不阻塞界面。
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from plugin_discovery import file_hash, file_stamp
+from plugin_registry import write_json_atomic
+from log_config import env_int
+
+
+# 缓存总大小上限（MB），可通过环境变量 HSGUI_PLUGIN_CACHE_MB 设置，0 表示关闭缓存
+MAX_CACHE_MB = env_int('HSGUI_PLUGIN_CACHE_MB', 500, minimum=0)
+
+
+class ResultCache:
+    """内容寻址的插件结果缓存
+
+    目录结构：
+        objects/<哈希前两位>/<哈希>   文件内容
+        entries/<缓存键>.json         一次运行生成的文件列表和最近使用时间
+    """
+
+    def __init__(self, root, max_bytes=MAX_CACHE_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.entries_dir = os.path.join(root, "entries")
+        self._hashes = {}  # 文件路径 -> (修改时间和大小, 哈希)，文件未变化时不重新计算
+        # 保存、恢复和淘汰在线程池中执行，同一时间只进行一个
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def cacheable(self, plugin_info):
+        """插件是否使用缓存：声明了输出目录且未声明 "cache": false"""
+        return bool(plugin_info.get('outputs')) and plugin_info.get('cache') is not False
+
+    def cached_hash(self, path):
+        """文件哈希，按修改时间和大小缓存，文件不存在时返回 missing"""
+        stamp = file_stamp(path)
+        if stamp is None:
+            return "missing"
+        cached = self._hashes.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        digest = file_hash(path)
+        self._hashes[path] = (stamp, digest)
+        return digest
+
+    def key_for(self, plugin_info, table_hash, arguments=(), input_files=()):
+        """计算一次运行的缓存键，无法确定输入时返回 None（不使用缓存）
+
+        input_files 为插件可能读取的其他文件（如 HSGUI_TABLE_XLSX 指向的 data.xlsx）。
+        """
+        if not self.enabled or not table_hash or not self.cacheable(plugin_info):
+            return None
+        plugin_path = plugin_info.get('path', '')
+        try:
+            parts = ["plugin", plugin_info.get('hash') or self.cached_hash(plugin_path), "table", table_hash]
+            for path in input_files:
+                parts += ["file", os.path.normcase(os.path.abspath(path)), self.cached_hash(path)]
+            plugin_dir = os.path.dirname(os.path.abspath(plugin_path))
+            for input_path in plugin_info.get('inputs') or []:
+                path = os.path.normpath(os.path.join(plugin_dir, input_path))
+                parts += ["input", input_path, self.cached_hash(path) if os.path.isfile(path) else "missing"]
+        except OSError as e:
+            logging.warning(f"计算插件缓存键失败，本次不使用缓存: {e}")
+            return None
+        parts += ["args"] + [str(a) for a in arguments]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.entries_dir, key + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _read_entry(self, path):
+        try:
+            with open(path, "r", encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _inside(path, root):
+        """path 是否在 root 目录中（两者都已规范化）"""
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:  # 不在同一个盘符
+            return False
+
+    def lookup(self, key, output_roots):
+        """查找缓存，所有文件都在、并且都位于插件当前声明的输出目录 output_roots 中时返回缓存项"""
+        if key is None:
+            return None
+        entry = self._read_entry(self._entry_path(key))
+        if entry is None:
+            return None
+        roots = set(entry.get("roots", []))
+        if not roots or not roots <= set(output_roots):
+            return None
+        for item in entry["files"]:
+            target = os.path.normcase(os.path.abspath(os.path.join(item["root"], item["path"])))
+            if item["root"] not in roots or not self._inside(target, item["root"]):
+                return None
+            if not os.path.exists(self._object_path(item["sha256"])):
+                return None
+        return entry
+
+    def restore(self, key, entry, output_roots):
+        """把缓存的文件写回原位置，并删除声明的输出目录中不属于这次结果的文件，返回恢复的文件路径
+
+        只处理 output_roots（插件当前声明的输出目录）中的文件，应在 lookup 之后调用。
+        """
+        roots = [root for root in entry.get("roots", []) if root in set(output_roots)]
+        owned = {os.path.normcase(os.path.join(item["root"], item["path"])) for item in entry["files"]
+                 if item["root"] in roots}
+        with self._lock:
+            for root in roots:
+                if not os.path.isdir(root):
+                    continue
+                for dirpath, _, filenames in os.walk(root):
+                    for name in filenames:
+                        path = os.path.join(dirpath, name)
+                        if os.path.normcase(path) not in owned:
+                            os.remove(path)
+
+            restored = []
+            for item in entry["files"]:
+                if item["root"] not in roots:
+                    continue
+                target = os.path.join(item["root"], item["path"])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_path = target + ".cache_tmp"
+                shutil.copyfile(self._object_path(item["sha256"]), tmp_path)
+                os.replace(tmp_path, target)
+                restored.append(target)
+            entry["last_used"] = time.time()
+            write_json_atomic(self._entry_path(key), entry)
+        return restored
+
+    def _store_object(self, path):
+        """把文件存入 objects，返回 (哈希, 大小)"""
+        digest = file_hash(path, algorithm="sha256")
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = object_path + ".tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, object_path)
+        return digest, os.path.getsize(object_path)
+
+    def store(self, key, output_roots):
+        """保存运行结束后输出目录中的所有文件（输出目录归插件所有，未改动的文件也属于运行结果）"""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._store(key, output_roots)
+        if entry is not None:
+            self.evict()
+        return entry
+
+    def _store(self, key, output_roots):
+        files = []
+        for root in output_roots:
+            if not os.path.isdir(root):
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        digest, size = self._store_object(path)
+                    except OSError as e:
+                        logging.warning(f"缓存插件输出失败: {path} - {e}")
+                        return None
+                    files.append({"root": root, "path": os.path.relpath(path, root), "sha256": digest, "size": size})
+
+        os.makedirs(self.entries_dir, exist_ok=True)
+        entry = {"created": time.time(), "last_used": time.time(), "roots": sorted(output_roots), "files": files}
+        write_json_atomic(self._entry_path(key), entry)
+        return entry
+
+    def evict(self):
+        """总大小超过上限时，按最近使用时间从旧到新删除缓存项，并清理不再引用的文件"""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        if not os.path.isdir(self.entries_dir):
+            return
+        entries = []
+        for name in os.listdir(self.entries_dir):
+            path = os.path.join(self.entries_dir, name)
+            entry = self._read_entry(path)
+            if entry is None:
+                continue
+            entries.append((entry.get("last_used", 0), path, entry))
+        entries.sort(key=lambda e: e[0], reverse=True)
+
+        # 从最近使用的开始保留，直到超出上限
+        kept_objects = {}
+        total = 0
+        for _, path, entry in entries:
+            new_objects = {f["sha256"]: f["size"] for f in entry["files"] if f["sha256"] not in kept_objects}
+            size = sum(new_objects.values())
+            if total + size > self.max_bytes and total > 0:
+                try:
+                    os.remove(path)
+                    logging.info(f"插件缓存超出上限，已淘汰: {os.path.basename(path)}")
+                    continue
+                except OSError as e:
+                    # 删除失败（如文件被占用）的缓存项仍然有效，保留它引用的文件
+                    logging.warning(f"淘汰插件缓存失败: {path} - {e}")
+            kept_objects.update(new_objects)
+            total += size
+
+        if not os.path.isdir(self.objects_dir):
+            return
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if name not in kept_objects:
+                    try:
+                        os.remove(os.path.join(dirpath, name))
+                    except OSError:
+                        pass
+
+    def total_size(self):
+        size = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            size += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+        return size
+
+
+class CacheTaskSignals(QObject):
+    finished = pyqtSignal(object)  # 任务函数的返回值
+    failed = pyqtSignal(str)
+
+
+class CacheTask(QRunnable):
+    """在线程池中执行缓存的保存或恢复（计算哈希、复制文件）"""
+
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = CacheTaskSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
@@ -0,0 +1,178 @@
+"""插件运行历史
+
+每次插件运行结束后记录一条（插件、开始时间、耗时、退出码、内存峰值、读写字节数、输入数据哈希），
+保存在本地 SQLite 数据库中，用于查看耗时趋势和最慢的运行。
+安装了 psutil 时运行期间定时采样子进程的内存和读写量，否则这几项为空。
+"""
+import time
+import sqlite3
+import hashlib
+import logging
+import statistics
+from PyQt5.QtCore import QObject, QTimer
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plugin TEXT NOT NULL,
+    plugin_hash TEXT,
+    started_at REAL NOT NULL,
+    duration REAL,
+    exit_code INTEGER,
+    state TEXT,
+    peak_rss_kb INTEGER,
+    read_bytes INTEGER,
+    write_bytes INTEGER,
+    input_hash TEXT,
+    rows INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_plugin_started ON runs (plugin, started_at);
+"""
+
+RUN_FIELDS = ("plugin", "plugin_hash", "started_at", "duration", "exit_code", "state",
+              "peak_rss_kb", "read_bytes", "write_bytes", "input_hash", "rows")
+
+
+def data_hash(headers, columns):
+    """表格数据的哈希，列名和内容相同时结果相同"""
+    digest = hashlib.sha1()
+    for header, values in zip(headers, columns):
+        digest.update(str(header).encode("utf-8") + b"\0")
+        for value in values:
+            digest.update(str(value).encode("utf-8") + b"\x1f")
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class RunHistory:
+    """插件运行历史记录，保存在 SQLite 数据库中"""
+
+    def __init__(self, db_path, max_runs=10000):
+        self.db_path = db_path
+        self.max_runs = max_runs
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def record(self, **run):
+        """记录一次运行，超出上限时删除最早的记录"""
+        values = [run.get(field) for field in RUN_FIELDS]
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f"INSERT INTO runs ({', '.join(RUN_FIELDS)}) VALUES ({', '.join('?' * len(RUN_FIELDS))})", values)
+                self.conn.execute(
+                    "DELETE FROM runs WHERE id <= (SELECT MAX(id) FROM runs) - ?", (self.max_runs,))
+        except sqlite3.Error as e:
+            logging.error(f"记录插件运行历史失败: {e}")
+
+    def recent(self, limit=100, plugin=None):
+        query = "SELECT * FROM runs"
+        params = []
+        if plugin:
+            query += " WHERE plugin = ?"
+            params.append(plugin)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(r) for r in self.conn.execute(query, params)]
+
+    def slowest(self, limit=20):
+        return [dict(r) for r in self.conn.execute(
+            "SELECT * FROM runs WHERE duration IS NOT NULL ORDER BY duration DESC LIMIT ?", (limit,))]
+
+    def trends(self, window=20):
+        """每个插件最近 window 次成功运行的耗时趋势：最近一次与之前运行的中位数相比"""
+        result = []
+        plugins = [r[0] for r in self.conn.execute("SELECT DISTINCT plugin FROM runs ORDER BY plugin")]
+        for plugin in plugins:
+            runs = [dict(r) for r in self.conn.execute(
+                "SELECT duration, rows, started_at FROM runs WHERE plugin = ? AND state = 'done' "
+                "AND duration IS NOT NULL ORDER BY started_at DESC LIMIT ?", (plugin, window))]
+            if not runs:
+                continue
+            last = runs[0]
+            earlier = [r["duration"] for r in runs[1:]]
+            median = statistics.median(earlier) if earlier else None
+            result.append({
+                "plugin": plugin,
+                "count": len(runs),
+                "last_duration": last["duration"],
+                "median_duration": median,
+                "ratio": last["duration"] / median if median else None,
+                "last_rows": last["rows"],
+                "last_started_at": last["started_at"],
+            })
+        return result
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM runs")
+
+    def close(self):
+        self.conn.close()
+
+
+class ProcessMonitor(QObject):
+    """运行期间定时采样插件进程的内存峰值和读写字节数（需要 psutil）
+
+    shared=True 用于多次运行共用的常驻进程（worker 模式）：读写字节数记录相对运行开始时的增量，
+    内存取运行期间采样到的最大值，而不是进程启动以来的峰值。
+    """
+
+    def __init__(self, pid, interval_ms=200, shared=False, parent=None):
+        super().__init__(parent)
+        self.peak_rss_kb = None
+        self.read_bytes = None
+        self.write_bytes = None
+        self.process = None
+        self.shared = shared
+        self._baseline = None  # 运行开始时的 (读字节数, 写字节数)
+        if not HAS_PSUTIL or pid is None:
+            return
+        try:
+            self.process = psutil.Process(pid)
+        except psutil.Error:
+            return
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start()
+        self.sample()
+
+    def sample(self):
+        if self.process is None:
+            return
+        try:
+            with self.process.oneshot():
+                memory = self.process.memory_info()
+                # Windows 上直接提供进程的峰值工作集；常驻进程的峰值包含之前的运行，只用当前值
+                rss_kb = (memory.rss if self.shared else getattr(memory, "peak_wset", memory.rss)) // 1024
+                self.peak_rss_kb = max(self.peak_rss_kb or 0, rss_kb)
+                if hasattr(self.process, "io_counters"):
+                    io = self.process.io_counters()
+                    if self._baseline is None:
+                        self._baseline = (io.read_bytes, io.write_bytes) if self.shared else (0, 0)
+                    self.read_bytes = io.read_bytes - self._baseline[0]
+                    self.write_bytes = io.write_bytes - self._baseline[1]
+        except psutil.Error:
+            # 进程已退出，保留最后一次采样的结果
+            self.stop()
+
+    def stop(self):
+        if self.process is not None:
+            self.timer.stop()
+            self.process = None
+
+    def result(self):
+        return {"peak_rss_kb": self.peak_rss_kb, "read_bytes": self.read_bytes, "write_bytes": self.write_bytes}
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp else ""
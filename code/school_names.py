@@ -0,0 +1,243 @@
+"""学院名称规范化
+
+导入的数据中学院名称常有简称、省略"学院"、繁体字、全角字符等写法，会导致按学院汇总和生成文档出错。
+SchoolIndex 在导入时把学院列统一为标准名称：
+
+1. 规范化后精确匹配（去掉空白和标点、全角转半角、繁体转简体，也接受省略"学院"等后缀的写法）
+2. 别名表（如 "计算机学院" -> "计算机科学与技术学院"）
+3. 字符二元组索引做模糊匹配：按输入的二元组在标准名称中出现的比例打分，
+   分数不够、与名称长度相差太多（Dice 系数低于 min_dice）、只有一个二元组（如"中心" "化学"）
+   或有多个名称分数接近时不修改，标记为需要核对
+
+学院列表和别名可在程序目录的 schools.json 中配置，不存在时使用内置列表：
+
+    {"schools": ["社会学院", ...], "aliases": {"计算机学院": "计算机科学与技术学院"},
+     "min_score": 0.6, "min_dice": 0.4}
+"""
+import re
+import json
+import logging
+import unicodedata
+from collections import defaultdict
+
+try:
+    import opencc
+    _converter = opencc.OpenCC("t2s")
+except Exception:
+    _converter = None
+
+
+DEFAULT_SCHOOLS = [
+    "社会学院", "网络空间安全学院", "光学与电子信息学院", "人文学院", "未来技术学院", "机械科学与工程学院",
+    "土木与水利工程学院", "马克思主义学院", "口腔医学院", "能源与动力工程学院", "外国语学院", "护理学院",
+    "化学与化工学院", "新闻与信息传播学院", "生命科学与技术学院", "电子信息与通信学院", "法学院", "哲学学院",
+    "航空航天学院", "人工智能与自动化学院", "医药卫生管理学院", "物理学院", "管理学院", "环境科学与工程学院",
+    "公共管理学院", "第一临床学院", "计算机科学与技术学院", "艺术学院", "法医学系", "数学与统计学院",
+    "第二临床学院", "电气与电子工程学院", "经济学院", "集成电路学院", "药学院", "公共卫生学院", "基础医学院",
+    "材料科学与工程学院", "建筑与城市规划学院", "船舶与海洋工程学院", "武汉光电国家研究中心", "体育学院",
+    "教育科学研究院", "生殖健康研究所", "软件学院"
+]
+
+DEFAULT_ALIASES = {
+    "计算机学院": "计算机科学与技术学院",
+    "计科学院": "计算机科学与技术学院",
+    "网安学院": "网络空间安全学院",
+    "光电学院": "光学与电子信息学院",
+    "电信学院": "电子信息与通信学院",
+    "电气学院": "电气与电子工程学院",
+    "人工智能学院": "人工智能与自动化学院",
+    "自动化学院": "人工智能与自动化学院",
+    "机械学院": "机械科学与工程学院",
+    "土木学院": "土木与水利工程学院",
+    "能动学院": "能源与动力工程学院",
+    "化工学院": "化学与化工学院",
+    "新闻学院": "新闻与信息传播学院",
+    "生命学院": "生命科学与技术学院",
+    "生科院": "生命科学与技术学院",
+    "航天学院": "航空航天学院",
+    "医管学院": "医药卫生管理学院",
+    "环境学院": "环境科学与工程学院",
+    "公管学院": "公共管理学院",
+    "数学学院": "数学与统计学院",
+    "数统学院": "数学与统计学院",
+    "材料学院": "材料科学与工程学院",
+    "建规学院": "建筑与城市规划学院",
+    "船海学院": "船舶与海洋工程学院",
+    "光电国家研究中心": "武汉光电国家研究中心",
+    "教科院": "教育科学研究院",
+    "马院": "马克思主义学院",
+    "公卫学院": "公共卫生学院",
+    "基医学院": "基础医学院",
+}
+
+# 未安装 opencc 时使用的常见繁体字对照（覆盖学院名称中出现的字）
+TRADITIONAL = (
+    "學学 會会 與与 網网 絡络 間间 電电 資资 訊讯 機机 體体 藝艺 術术 軟软 國国 際际 語语 統统 計计 數数 "
+    "聞闻 傳传 氣气 動动 積积 馬马 義义 臨临 應应 線线 業业 設设 圖图 書书 實实 驗验 務务 財财 專专 醫医 "
+    "衛卫 礎础 漢汉 歷历 論论 員员 團团 費费 補补 級级 質质 態态 師师 範范 園园 區区 萬万 門门 開开 關关 "
+    "發发 風风 飛飞 號号 來来 時时 長长 場场 產产 現现 點点 總总 為为 預预 測测 檢检 輸输 運运 輔辅 導导 "
+    "綜综 維维 護护 環环 經经 濟济 築筑 規规 劃划 藥药 華华 廣广 東东 戰战 鐵铁 農农 館馆 類类 車车 衝冲 "
+    "聯联 剛刚 鋼钢 軍军 隊队 礦矿 紡纺 織织 療疗 復复 兒儿 婦妇 腦脑 齒齿 廳厅 處处 殺杀 纖纤"
+)
+_TRADITIONAL_TABLE = str.maketrans({pair[0]: pair[1] for pair in TRADITIONAL.split()})
+
+# 规范化时去掉的字符（全角已先转为半角）和可省略的后缀
+_STRIP = re.compile(r"[\s()\[\]{}【】<>《》\"'“”‘’:;,.。、·\-_/\\*]")
+SUFFIXES = ("学院", "学系", "研究院", "研究所", "院", "系")
+AMBIGUITY_MARGIN = 0.1
+
+
+def to_simplified(text):
+    if _converter is not None:
+        return _converter.convert(text)
+    return text.translate(_TRADITIONAL_TABLE)
+
+
+def normalize_name(name):
+    """规范化学院名称：全角转半角、繁体转简体、去掉空白和标点"""
+    text = unicodedata.normalize("NFKC", str(name))
+    return _STRIP.sub("", to_simplified(text))
+
+
+def strip_suffix(key):
+    """去掉"学院"等后缀，只剩一个字时保留原样（如"法学院"去掉"学院"后为"法"，仍可区分）"""
+    for suffix in SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)]
+    return key
+
+
+def grams(key):
+    """字符二元组，只有一个字时为该字本身"""
+    if len(key) < 2:
+        return {key} if key else set()
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class SchoolMatch:
+    """一个名称的匹配结果
+
+    status: exact（规范化后相同）、alias（别名）、fuzzy（模糊匹配）、
+            ambiguous（多个名称分数接近）、unknown（没有足够相似的名称）、empty（空）
+    """
+
+    __slots__ = ("name", "status", "score", "candidates")
+
+    def __init__(self, name, status, score=1.0, candidates=()):
+        self.name = name
+        self.status = status
+        self.score = score
+        self.candidates = list(candidates)
+
+    @property
+    def needs_review(self):
+        return self.status in ("ambiguous", "unknown")
+
+
+class SchoolIndex:
+    """学院名称索引：精确表 + 别名表 + 字符二元组倒排索引"""
+
+    def __init__(self, schools=None, aliases=None, min_score=0.6, min_dice=0.4):
+        self.schools = list(schools or DEFAULT_SCHOOLS)
+        self.min_score = min_score
+        self.min_dice = min_dice
+        self._exact = {}
+        self._grams = defaultdict(set)
+        self._gram_counts = []
+        self._cache = {}
+
+        # 完整名称优先，省略后缀的写法只在不冲突时加入
+        short_names = defaultdict(set)
+        for index, school in enumerate(self.schools):
+            key = normalize_name(school)
+            self._exact[key] = school
+            short_names[strip_suffix(key)].add(school)
+            core = grams(strip_suffix(key))
+            self._gram_counts.append(len(core))
+            for gram in core:
+                self._grams[gram].add(index)
+        for key, names in short_names.items():
+            if len(names) == 1 and key not in self._exact:
+                self._exact[key] = next(iter(names))
+
+        self._aliases = {}
+        for alias, school in (aliases if aliases is not None else DEFAULT_ALIASES).items():
+            if school not in self.schools:
+                logging.warning(f"学院别名 {alias} 对应的 {school} 不在学院列表中，已忽略")
+                continue
+            self._aliases[normalize_name(alias)] = school
+            self._aliases.setdefault(strip_suffix(normalize_name(alias)), school)
+
+    @classmethod
+    def from_config(cls, path):
+        """从 schools.json 读取学院列表和别名，文件不存在或格式错误时使用内置列表"""
+        try:
+            with open(path, "r", encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError) as e:
+            logging.error(f"读取学院配置失败，使用内置列表: {path} - {e}")
+            return cls()
+        return cls(config.get("schools"), config.get("aliases"), config.get("min_score", 0.6),
+                   config.get("min_dice", 0.4))
+
+    def match(self, name):
+        """匹配一个名称，结果按原始文本缓存"""
+        result = self._cache.get(name)
+        if result is None:
+            result = self._match(name)
+            self._cache[name] = result
+        return result
+
+    def _match(self, name):
+        key = normalize_name(name)
+        if not key:
+            return SchoolMatch(None, "empty")
+        # "法学" "药学" 这类写法补上"院"即为完整名称
+        school = self._exact.get(key) or self._exact.get(strip_suffix(key)) or self._exact.get(key + "院")
+        if school is not None:
+            return SchoolMatch(school, "exact")
+        school = self._aliases.get(key) or self._aliases.get(strip_suffix(key))
+        if school is not None:
+            return SchoolMatch(school, "alias")
+
+        # 模糊匹配：输入的二元组在候选名称中出现的比例为主，Dice 系数区分同分的候选
+        query = grams(strip_suffix(key))
+        overlap = defaultdict(int)
+        for gram in query:
+            for index in self._grams.get(gram, ()):
+                overlap[index] += 1
+        if not overlap:
+            return SchoolMatch(None, "unknown", 0.0)
+        scored = sorted(
+            ((count / len(query), 2 * count / (len(query) + self._gram_counts[index]), index)
+             for index, count in overlap.items()),
+            reverse=True)
+        best_score, best_dice, best = scored[0]
+        close = [self.schools[index] for score, dice, index in scored
+                 if score >= best_score - AMBIGUITY_MARGIN and dice >= best_dice - AMBIGUITY_MARGIN]
+        # 只覆盖了候选名称的一小部分（如"研究院"对应"武汉光电国家研究中心"），或只有一个二元组时
+        # 常见的词（"中心" "化学"）就能命中，这些情况都交给用户核对
+        if best_score < self.min_score or best_dice < self.min_dice or len(query) < 2:
+            return SchoolMatch(None, "unknown", best_score, close[:5])
+        if len(close) > 1:
+            return SchoolMatch(None, "ambiguous", best_score, close[:5])
+        return SchoolMatch(self.schools[best], "fuzzy", best_score, close)
+
+    def normalize_column(self, values):
+        """规范化一列学院名称，返回 (新的值列表, {行号: 匹配结果})
+
+        能确定的名称替换为标准名称，不确定的保留原文，并在第二个返回值中列出需要核对的行。
+        """
+        result = []
+        review = {}
+        for row, value in enumerate(values):
+            match = self.match(value)
+            if match.name is not None:
+                result.append(match.name)
+            else:
+                result.append(value)
+                if match.needs_review:
+                    review[row] = match
+        return result, review
@@ -0,0 +1,51 @@
+"""选择要导入的工作表"""
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton, QDialogButtonBox
+)
+
+
+class SheetPickerDialog(QDialog):
+    """列出工作簿中的工作表，勾选要导入的（默认全选）"""
+
+    def __init__(self, sheet_names, file_name="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("选择工作表")
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"{file_name} 中有 {len(sheet_names)} 个工作表，请选择要导入的："))
+
+        self.list_widget = QListWidget(self)
+        for name in sheet_names:
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.list_widget.addItem(item)
+        self.list_widget.itemChanged.connect(self.update_ok_button)
+        layout.addWidget(self.list_widget)
+
+        select_layout = QHBoxLayout()
+        select_all_btn = QPushButton("全选", self)
+        select_none_btn = QPushButton("全不选", self)
+        select_all_btn.clicked.connect(lambda: self.set_all(Qt.Checked))
+        select_none_btn.clicked.connect(lambda: self.set_all(Qt.Unchecked))
+        select_layout.addWidget(select_all_btn)
+        select_layout.addWidget(select_none_btn)
+        select_layout.addStretch(1)
+        layout.addLayout(select_layout)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+    def set_all(self, state):
+        for i in range(self.list_widget.count()):
+            self.list_widget.item(i).setCheckState(state)
+
+    def selected_sheets(self):
+        return [self.list_widget.item(i).text() for i in range(self.list_widget.count())
+                if self.list_widget.item(i).checkState() == Qt.Checked]
+
+    def update_ok_button(self):
+        self.buttons.button(QDialogButtonBox.Ok).setEnabled(bool(self.selected_sheets()))
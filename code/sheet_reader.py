@@ -0,0 +1,52 @@
+"""多工作表读取
+
+财务表常按月份或校区分成多个工作表。list_sheets 列出工作簿中的工作表，
+read_sheets 读取选中的多个工作表：文件较大时每个工作表在单独的进程中解析，
+总耗时接近最大的一个工作表。读取函数都是模块级函数，可以在子进程中运行。
+"""
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from openpyxl import load_workbook
+from log_config import env_int
+
+
+SOURCE_SHEET_COLUMN = "来源工作表"
+
+# 并行读取使用的进程数，可通过环境变量 HSGUI_IMPORT_WORKERS 设置；
+# 文件小于 PARALLEL_MIN_BYTES 时启动进程的开销比解析还大，在当前进程读取
+MAX_WORKERS = env_int('HSGUI_IMPORT_WORKERS', os.cpu_count() or 2, minimum=1)
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+
+def list_sheets(path):
+    """工作簿中的工作表名称（按工作簿中的顺序）"""
+    if path.lower().endswith('.xlsx'):
+        workbook = load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(path) as workbook:
+        return list(workbook.sheet_names)
+
+
+def read_sheet(path, sheet_name, header=0):
+    """读取一个工作表（在子进程中运行）；header=None 时第一行也作为数据"""
+    return pd.read_excel(path, sheet_name=sheet_name, header=header)
+
+
+def read_sheets(path, sheet_names, workers=MAX_WORKERS):
+    """读取多个工作表，返回按 sheet_names 顺序的 [(工作表名称, DataFrame)]"""
+    start = time.perf_counter()
+    workers = min(workers, len(sheet_names))
+    if workers > 1 and os.path.getsize(path) >= PARALLEL_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(read_sheet, [path] * len(sheet_names), sheet_names))
+    else:
+        frames = [read_sheet(path, name) for name in sheet_names]
+    logging.info(f"读取 {os.path.basename(path)} 的 {len(sheet_names)} 个工作表，"
+                 f"共 {sum(len(df) for df in frames)} 行，耗时 {time.perf_counter() - start:.3f} 秒")
+    return list(zip(sheet_names, frames))
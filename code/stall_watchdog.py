@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from collections import Counter
+from PyQt5.QtCore import QObject, QTimer
+from log_config import env_int
+
+
+# 卡顿判定阈值（毫秒），可通过环境变量 HSGUI_STALL_MS 设置，0 表示关闭
+STALL_THRESHOLD_MS = env_int('HSGUI_STALL_MS', 200, minimum=0)
+
+
+class StallWatchdog(QObject):
+    """GUI线程卡顿监测
+
+    主线程上的定时器持续更新心跳时间，后台线程检查心跳；
+    当事件循环超过阈值没有响应时，抓取主线程的Python调用栈并记录卡顿时长。
+    """
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, heartbeat_ms=50, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_ms = heartbeat_ms
+        self.main_thread_id = threading.main_thread().ident
+
+        self._last_beat = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(heartbeat_ms)
+        self._timer.timeout.connect(self._beat)
+
+        # 本次会话的卡顿统计
+        self.stall_count = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+        self.hot_spots = Counter()  # 卡顿时主线程所在的位置 -> 次数
+
+    def start(self):
+        if self.threshold <= 0 or self._thread is not None:
+            return
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+        self._thread.start()
+        logging.info(f"卡顿监测已启动，阈值 {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        """停止监测并输出本次会话的卡顿汇总"""
+        if self._thread is None:
+            return
+        self._timer.stop()
+        self._stop_event.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+        self.log_summary()
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+
+    def _watch(self):
+        """后台线程：检查心跳，发现卡顿时抓取主线程调用栈"""
+        interval = min(self.threshold / 4, self.heartbeat_ms / 1000)
+        stall_start = None
+        stack = None
+
+        while not self._stop_event.wait(interval):
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat
+            # 心跳本身有 heartbeat_ms 的间隔，超出部分才算卡顿
+            if lag - self.heartbeat_ms / 1000 > self.threshold:
+                if stall_start is None:
+                    stall_start = last_beat
+                    stack = self._capture_main_stack()
+            elif stall_start is not None:
+                self._record_stall(last_beat - stall_start, stack)
+                stall_start = None
+                stack = None
+
+    def _capture_main_stack(self):
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return []
+        return traceback.extract_stack(frame)
+
+    def _record_stall(self, duration, stack):
+        self.stall_count += 1
+        self.total_stall += duration
+        self.max_stall = max(self.max_stall, duration)
+
+        location = "未知位置"
+        if stack:
+            # 取最内层的项目代码帧作为卡顿位置，找不到时使用最内层帧
+            project_dir = os.path.dirname(os.path.abspath(__file__))
+            inner = next((f for f in reversed(stack) if f.filename.startswith(project_dir)), stack[-1])
+            location = f"{os.path.basename(inner.filename)}:{inner.lineno} {inner.name}"
+        self.hot_spots[location] += 1
+
+        logging.warning(
+            f"GUI线程卡顿 {duration * 1000:.0f} ms，位置：{location}\n{''.join(traceback.format_list(stack))}",
+            extra={"data": {"stall_ms": round(duration * 1000, 1), "location": location}}
+        )
+
+    def summary(self):
+        """返回本次会话的卡顿汇总"""
+        return {
+            "count": self.stall_count,
+            "total_ms": round(self.total_stall * 1000, 1),
+            "max_ms": round(self.max_stall * 1000, 1),
+            "hot_spots": self.hot_spots.most_common(10),
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        if summary["count"] == 0:
+            logging.info("本次会话未检测到GUI线程卡顿")
+            return
+        spots = "\n".join(f"  {count} 次  {location}" for location, count in summary["hot_spots"])
+        logging.info(
+            f"本次会话共检测到 {summary['count']} 次卡顿，累计 {summary['total_ms']} ms，"
+            f"最长 {summary['max_ms']} ms\n{spots}",
+            extra={"data": summary}
+        )
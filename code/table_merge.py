@@ -0,0 +1,148 @@
+"""多个表格按学院合并
+
+把多个文件（如各部门分别提交的表）合并到当前表格：以（规范化后的学院名称, 是否补交）为键
+建立哈希表，一次遍历各文件的所有行完成连接。同一键的财务金额按策略处理：
+
+    sum       累加金额
+    override  后导入的文件覆盖之前的值（空值不覆盖）
+
+表格没有单独的期间列，"是否补交"区分同一学院的正常缴纳和补交，作为期间参与连接：
+与程序其他地方一致，含"补"字的值为补交，其他值（空、"否"等）都是正常缴纳。
+当前表格和各文件中的其他列（如插件追加的列、"来源工作表"）一并保留。
+合并中发现的问题（金额不一致、金额无法识别、学院名称无法确定）作为冲突列出，供用户核对。
+"""
+from decimal import Decimal, InvalidOperation
+
+
+POLICY_SUM = "sum"
+POLICY_OVERRIDE = "override"
+POLICY_NAMES = {POLICY_SUM: "累加金额", POLICY_OVERRIDE: "覆盖金额（后导入的文件优先）"}
+
+KEY_COLUMNS = ["序号", "学院", "财务金额", "是否补交"]
+
+
+def period_key(text):
+    """是否补交的连接键：含"补"字为补交，其他为正常缴纳"""
+    return "补交" if "补" in str(text) else ""
+
+
+def parse_amount(text):
+    """解析金额，空值返回 None，无法识别时抛出 ValueError"""
+    text = str(text).strip().replace(",", "").replace("，", "").replace("￥", "").replace("元", "")
+    if not text:
+        return None
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        raise ValueError(text)
+
+
+def format_amount(amount):
+    """金额转为文本，去掉多余的小数位（123.40 -> 123.4，100.00 -> 100）"""
+    text = format(amount, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
+
+
+class Conflict:
+    """合并时发现的一个问题"""
+
+    __slots__ = ("school", "period", "source", "reason", "old", "new")
+
+    def __init__(self, school, period, source, reason, old="", new=""):
+        self.school = school
+        self.period = period
+        self.source = source
+        self.reason = reason
+        self.old = old
+        self.new = new
+
+    def __str__(self):
+        period = f"（{self.period}）" if self.period else ""
+        values = f"：{self.old} -> {self.new}" if self.old or self.new else ""
+        return f"[{self.source}] {self.school}{period} {self.reason}{values}"
+
+
+def merge_tables(base, sources, policy=POLICY_SUM):
+    """合并表格，返回 (合并后的各列 {列名: 值列表}, {行号: 需要核对的学院匹配结果}, 冲突列表)
+
+    base 为当前表格的各列；sources 为 [(来源名称, 各列, {行号: 学院匹配结果})]，
+    学院名称应已规范化。合并结果保持当前表格的行顺序，新的学院依次追加在后面；
+    其他列按列名合并，连接到已有行时保留已有行的值。
+    """
+    extra_headers = [h for h in base if h not in KEY_COLUMNS]
+    for _, columns, _ in sources:
+        extra_headers += [h for h in columns if h not in KEY_COLUMNS and h not in extra_headers]
+
+    rows = []  # [学院, 金额文本, 是否补交, {其他列: 值}]
+    amounts = []  # 与 rows 对应的金额（Decimal 或 None）
+    index = {}
+    review = {}
+    conflicts = []
+
+    def add_row(school, amount_text, period, extras, key, source):
+        rows.append([school, amount_text, period, extras])
+        try:
+            amounts.append(parse_amount(amount_text))
+        except ValueError:
+            conflicts.append(Conflict(school, period_key(period), source, "金额无法识别", new=amount_text))
+            amounts.append(None)
+        if key is not None:
+            index[key] = len(rows) - 1
+        return len(rows) - 1
+
+    base_extras = [h for h in base if h not in KEY_COLUMNS]
+    for row, (school, amount_text, period) in enumerate(zip(base["学院"], base["财务金额"], base["是否补交"])):
+        key = (school, period_key(period)) if school.strip() else None
+        if key is not None and key in index:
+            key = None  # 当前表格中本来就重复的行保持原样
+        add_row(school, amount_text, period, {h: base[h][row] for h in base_extras}, key, "当前表格")
+
+    for source, columns, source_review in sources:
+        source_extras = [h for h in columns if h not in KEY_COLUMNS]
+        for row, (school, amount_text, period) in enumerate(
+                zip(columns["学院"], columns["财务金额"], columns["是否补交"])):
+            if not school.strip():
+                continue
+            key = (school, period_key(period))
+            match = source_review.get(row)
+            if match is not None:
+                conflicts.append(Conflict(school, key[1], source, "学院名称无法确定"))
+
+            try:
+                amount = parse_amount(amount_text)
+            except ValueError:
+                conflicts.append(Conflict(school, key[1], source, "金额无法识别", new=amount_text))
+                amount = None
+
+            target = index.get(key)
+            if target is None:
+                extras = {h: columns[h][row] for h in source_extras}
+                target = add_row(school, amount_text if amount is not None else "", period, extras, key, source)
+                if match is not None:
+                    review[target] = match
+                continue
+            if amount is None:
+                continue
+
+            old = amounts[target]
+            if policy == POLICY_SUM:
+                new = amount if old is None else old + amount
+            else:
+                if old is not None and old != amount:
+                    conflicts.append(Conflict(school, key[1], source, "金额不一致，已覆盖",
+                                              format_amount(old), format_amount(amount)))
+                new = amount
+            amounts[target] = new
+            rows[target][1] = format_amount(new)
+
+    merged = {
+        "序号": [str(i + 1) for i in range(len(rows))],
+        "学院": [row[0] for row in rows],
+        "财务金额": [row[1] for row in rows],
+        "是否补交": [row[2] for row in rows],
+    }
+    for header in extra_headers:
+        merged[header] = [row[3].get(header, "") for row in rows]
+    return merged, review, conflicts